@@ -131,3 +131,16 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',  # Overridden per-view
     ],
 }
+
+# Seconds a read response (books, authors, facets) stays in the server-side
+# cache. Writes invalidate it immediately in every process: the catalog
+# version it is keyed on lives in the database (see api/caching.py).
+CATALOG_CACHE_SECONDS = 300
+
+# How GET /books/ computes "count" unless ?count= says otherwise:
+# 'exact', 'estimate' (planner estimate on PostgreSQL) or 'none'.
+BOOK_LIST_COUNT = 'exact'
+
+# Minimum seconds between rebuilds of the in-memory autocomplete index when
+# the catalog changed without it seeing the write (api/autocomplete.py).
+AUTOCOMPLETE_REFRESH_SECONDS = 30
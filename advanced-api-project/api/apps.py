@@ -1,5 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class ApiConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Any saved or deleted Book / Author invalidates cached responses.
+        # The autocomplete index is updated in place; its receivers must run
+        # after touch, whose new version they read.
+        from .autocomplete import index_deleted, index_saved
+        from .caching import touch
+        for model in (self.get_model('Author'), self.get_model('Book')):
+            post_save.connect(touch, sender=model, dispatch_uid=f'touch-{model.__name__}-save')
+            post_delete.connect(touch, sender=model, dispatch_uid=f'touch-{model.__name__}-delete')
+            post_save.connect(index_saved, sender=model, dispatch_uid=f'autocomplete-{model.__name__}-save')
+            post_delete.connect(index_deleted, sender=model, dispatch_uid=f'autocomplete-{model.__name__}-delete')
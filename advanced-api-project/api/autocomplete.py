@@ -0,0 +1,216 @@
+"""
+In-memory prefix index for autocomplete over Book titles and Author names.
+
+Typeahead clients used to call GET /books/?search= on every keystroke: a
+substring search joined to Author, paginated and serialized with nested
+bibliographies, just to show a few labels. GET /autocomplete/ answers from
+memory instead.
+
+Each PrefixIndex (one for books, one for authors) keeps two sorted lists of
+(normalized key, pk) pairs:
+
+- starts: the whole label ("silver storm");
+- words:  the label from each later word on ("storm"), so "sto" finds
+  "Silver Storm" too.
+
+A prefix lookup is a bisect to the first key >= the prefix plus a scan that
+stops after `limit` distinct labels, so it costs O(log n + limit) whatever
+the catalog size. Matches at the start of a label rank before matches at a
+later word, then alphabetically.
+
+Keeping it current:
+- The index is built on the first lookup in each process (two values_list
+  queries), not at startup, since the database isn't available while apps
+  load.
+- save() / delete() of a Book or Author update it in place through the
+  post_save / post_delete signals (connected in ApiConfig.ready, after the
+  catalog version bump). The index remembers the catalog version it covers
+  (api/caching.py); an in-place update moves that on to the write's new
+  version when the write directly followed it (CatalogVersion.previous), so
+  the process's own writes never cause a rebuild.
+- Writes that send no signals (batch views, `manage.py import_catalog`) and
+  writes from other processes only move the shared catalog version. Lookups
+  read it at most once every AUTOCOMPLETE_REFRESH_SECONDS; if it moved past
+  what the index covers, that lookup rebuilds the index, so those writes
+  show up within the interval.
+- A rebuild loads the rows without holding the lookup lock and swaps the new
+  indexes in at the end: other lookups keep answering from the old ones
+  meanwhile (only the very first build has to be waited for).
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+from . import caching
+from .models import Author, Book
+
+WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Case-folded text with runs of whitespace collapsed to one space."""
+    return ' '.join(text.casefold().split())
+
+
+class PrefixIndex:
+    """Sorted prefix index over the labels of one model (see module docstring)."""
+
+    def __init__(self, rows=()):
+        self.labels = {}
+        self.starts = []
+        self.words = []
+        for pk, label in rows:
+            self.labels[pk] = label
+            for entries, key in self.keys(label):
+                entries.append((key, pk))
+        self.starts.sort()
+        self.words.sort()
+
+    def keys(self, label):
+        """(sorted list, key) pairs for a label."""
+        key = normalize(label)
+        yield self.starts, key
+        for word in list(WORD.finditer(key))[1:]:
+            yield self.words, key[word.start():]
+
+    def add(self, pk, label):
+        self.discard(pk)
+        self.labels[pk] = label
+        for entries, key in self.keys(label):
+            entries.insert(bisect_left(entries, (key, pk)), (key, pk))
+
+    def discard(self, pk):
+        label = self.labels.pop(pk, None)
+        if label is None:
+            return
+        for entries, key in self.keys(label):
+            i = bisect_left(entries, (key, pk))
+            if i < len(entries) and entries[i] == (key, pk):
+                del entries[i]
+
+    def search(self, prefix, limit):
+        """
+        Up to `limit` (rank, key, pk, label) matches with distinct labels:
+        rank 0 for label-start matches, 1 for later-word matches.
+        """
+        found = {}
+        for rank, entries in enumerate((self.starts, self.words)):
+            i = bisect_left(entries, (prefix,))
+            while i < len(entries) and len(found) < limit:
+                key, pk = entries[i]
+                if not key.startswith(prefix):
+                    break
+                label = self.labels[pk]
+                label_key = normalize(label)
+                found.setdefault(label_key, (rank, label_key, pk, label))
+                i += 1
+        return list(found.values())
+
+
+class Autocomplete:
+    """The per-process book and author indexes, rebuilt when the catalog changes."""
+
+    # Index name (the model_name) -> (model, label field)
+    sources = {
+        'book': (Book, 'title'),
+        'author': (Author, 'name'),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()         # guards the indexes and version
+        self.build_lock = threading.Lock()   # one version check / rebuild at a time
+        self.reset()
+
+    def reset(self):
+        """Drop the indexes; the next lookup rebuilds them."""
+        with self.lock:
+            self.indexes = None
+            self.version = None
+            self.checked_at = 0.0
+            self.builds = 0
+
+    def check_due(self):
+        return (
+            self.indexes is None
+            or time.monotonic() - self.checked_at >= settings.AUTOCOMPLETE_REFRESH_SECONDS
+        )
+
+    def refresh(self):
+        """Rebuild the indexes if the catalog moved past the version they cover."""
+        if not self.check_due():
+            return
+        # Until the first build there is nothing to answer from, so wait for
+        # it; after that, lookups don't queue behind a check in progress.
+        if not self.build_lock.acquire(blocking=self.indexes is None):
+            return
+        try:
+            if not self.check_due():
+                return
+            # Read the version first: a write during the build makes it stale again.
+            version = caching.get_version()
+            self.checked_at = time.monotonic()
+            if self.indexes is not None and version == self.version:
+                return
+            indexes = {
+                kind: PrefixIndex(model.objects.values_list('pk', field).iterator())
+                for kind, (model, field) in self.sources.items()
+            }
+            with self.lock:
+                self.indexes, self.version = indexes, version
+                self.builds += 1
+        finally:
+            self.build_lock.release()
+
+    def suggest(self, query, limit=10, kinds=None):
+        """
+        The top `limit` suggestions for `query`:
+        [{"type": "book", "id": 3, "label": "Silver Storm"}, ...]
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        self.refresh()
+        with self.lock:
+            matches = [
+                (rank, key, kind, pk, label)
+                for kind in (kinds or self.sources)
+                for rank, key, pk, label in self.indexes[kind].search(prefix, limit)
+            ]
+        matches.sort()
+        return [
+            {'type': kind, 'id': pk, 'label': label}
+            for rank, key, kind, pk, label in matches[:limit]
+        ]
+
+    def update(self, kind, pk, label=None):
+        """Index (or, with no label, remove) one row, if the index is built."""
+        if self.indexes is None:
+            return
+        # The write has already bumped the version (see the module docstring).
+        previous, version = caching.last_touch()
+        with self.lock:
+            if self.indexes is None:
+                return
+            if label is None:
+                self.indexes[kind].discard(pk)
+            else:
+                self.indexes[kind].add(pk, label)
+            if previous is not None and previous == self.version:
+                self.version = version
+
+
+index = Autocomplete()
+
+
+def index_saved(sender, instance, **kwargs):
+    """post_save receiver for Book / Author."""
+    kind = sender._meta.model_name
+    index.update(kind, instance.pk, getattr(instance, Autocomplete.sources[kind][1]))
+
+
+def index_deleted(sender, instance, **kwargs):
+    """post_delete receiver for Book / Author."""
+    index.update(sender._meta.model_name, instance.pk)
@@ -0,0 +1,121 @@
+"""
+Catalog version, conditional GET and response caching for the read views.
+
+The whole catalog shares one version number (nanoseconds since the epoch
+of the last write), kept in the database (CatalogVersion, a single row) so
+that every process - each web worker, the shell, `manage.py import_catalog`
+- reads the same one. Any write to a Book or Author bumps it inside the
+writer's transaction:
+
+- save() / delete() through the post_save / post_delete signals
+  (connected in ApiConfig.ready, so the admin and the shell count too);
+- bulk writes, which send no signals, call touch() themselves (batch
+  create / update in api/views.py, `manage.py import_catalog`).
+
+The new version therefore becomes visible exactly when the write commits,
+and disappears with it on a rollback. Reading it costs one primary-key
+lookup per request; concurrent writers queue briefly on the row.
+
+A single version is coarse but correct: a book response embeds its
+author's whole bibliography, so almost any write can change almost any
+response.
+
+CatalogCacheMixin uses it for the read views:
+
+- ETag: the version, a digest of the request (path and normalized params)
+  and the rendered format, so the JSON and browsable-API bodies of a URL
+  never share one (responses also carry Vary: Accept). Last-Modified: the
+  version in whole seconds. A request whose If-None-Match /
+  If-Modified-Since still matches gets a 304 after only the version
+  lookup. The ETag is authoritative (If-Modified-Since is only checked when
+  If-None-Match is absent, and has one-second resolution).
+- Server-side: the serialized response data is cached for
+  CATALOG_CACHE_SECONDS under (view, version, normalized params). The cache
+  may be per process; a write changes the version and therefore every key,
+  so nothing is deleted explicitly and stale entries just expire.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import CatalogVersion
+
+
+def get_version():
+    """The current catalog version, starting one if there is none yet."""
+    row, _ = CatalogVersion.objects.get_or_create(pk=1, defaults={'version': time.time_ns()})
+    return row.version
+
+
+def touch(**kwargs):
+    """
+    Bump the catalog version (also usable as a signal receiver). Call it
+    inside the write's transaction so the two commit together.
+    """
+    if not CatalogVersion.objects.filter(pk=1).update(
+        previous=F('version'), version=time.time_ns()
+    ):
+        get_version()
+
+
+def last_touch():
+    """(previous, version) for the latest write, as seen by this connection."""
+    return (
+        CatalogVersion.objects.filter(pk=1).values_list('previous', 'version').first()
+        or (None, None)
+    )
+
+
+class CatalogCacheMixin:
+    """
+    Conditional GET and response caching for a read-only catalog view
+    (see the module docstring).
+    """
+    cache_prefix = 'catalog:response:'
+
+    def get_cache_params(self):
+        """The query params that shape the response, sorted and stripped."""
+        return sorted(
+            (name, value.strip())
+            for name, values in self.request.query_params.lists()
+            for value in values
+            if value.strip()
+        )
+
+    def get_request_digest(self):
+        key = [self.request.path, urlencode(self.get_cache_params())]
+        return hashlib.md5('?'.join(key).encode(), usedforsecurity=False).hexdigest()
+
+    def get_uncached_response(self, request, *args, **kwargs):
+        """The response to cache; views without a get() of their own override this."""
+        return super().get(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):
+        version = get_version()
+        digest = self.get_request_digest()
+        etag = quote_etag(f'{version}-{digest[:16]}-{request.accepted_renderer.format}')
+        last_modified = version // 10**9
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            key = f'{self.cache_prefix}{type(self).__name__}:{version}:{digest}'
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+            else:
+                response = self.get_uncached_response(request, *args, **kwargs)
+                if response.status_code == status.HTTP_200_OK:
+                    cache.set(key, response.data, settings.CATALOG_CACHE_SECONDS)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ['Accept'])
+        return response
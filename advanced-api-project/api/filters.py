@@ -5,12 +5,61 @@ Provides filtering, searching, and ordering capabilities for the Book list view.
 - BookFilter: DjangoFilterBackend filter set for title, author, publication_year
 - SearchFilter: Text search on title and author name
 - OrderingFilter: Sort by title, publication_year, author
+
+Substring matches on title and author name (?title=, ?author__name=,
+?search=) go through the trigram / FTS5 index when the database has one
+(IndexedCharFilter, IndexedSearchFilter; see api/search.py).
 """
+import operator
+from functools import reduce
+
 import django_filters
+from django_filters.constants import EMPTY_VALUES
+from rest_framework import filters
 
+from . import search
 from .models import Book
 
 
+class IndexedCharFilter(django_filters.CharFilter):
+    """CharFilter whose icontains lookups use the substring index."""
+
+    def filter(self, qs, value):
+        if (
+            self.lookup_expr != 'icontains'
+            or self.exclude
+            or value in EMPTY_VALUES
+        ):
+            return super().filter(qs, value)
+        qs = search.contains(qs, self.field_name, value)
+        return qs.distinct() if self.distinct else qs
+
+
+class IndexedSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter that matches plain (unprefixed) search_fields through the
+    substring index. Every term must match at least one field, as with
+    SearchFilter. Views whose search_fields use prefixes ('^title') or
+    lookups fall back to SearchFilter itself.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        terms = self.get_search_terms(request)
+        if not search_fields or not terms:
+            return queryset
+        if any(field not in search.INDEXED_FIELDS for field in search_fields):
+            return super().filter_queryset(request, queryset, view)
+        conditions = (
+            reduce(
+                operator.or_,
+                (search.contains_q(field, term, using=queryset.db) for field in search_fields),
+            )
+            for term in terms
+        )
+        return queryset.filter(reduce(operator.and_, conditions))
+
+
 class BookFilter(django_filters.FilterSet):
     """
     FilterSet for Book model.
@@ -24,9 +73,9 @@ class BookFilter(django_filters.FilterSet):
     - publication_year_before: Books published on or before this date
     """
 
-    title = django_filters.CharFilter(lookup_expr='icontains', label='Title (partial match)')
+    title = IndexedCharFilter(lookup_expr='icontains', label='Title (partial match)')
     author = django_filters.NumberFilter(field_name='author', label='Author ID')
-    author__name = django_filters.CharFilter(
+    author__name = IndexedCharFilter(
         field_name='author__name',
         lookup_expr='icontains',
         label='Author name (partial match)',
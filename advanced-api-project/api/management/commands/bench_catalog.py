@@ -0,0 +1,108 @@
+"""
+Management command to compare indexed substring search (api/search.py)
+with plain icontains on a large catalog.
+
+Seeds --books books (one million by default) by --authors authors with
+titles made of random words, then runs each search term both ways and
+reports the median time of a first page (20 rows ordered by title) plus
+the match count. The data is rolled back afterwards unless --keep is given.
+Point it at a scratch database, since seeding a million rows takes a while:
+
+    python manage.py migrate --database bench
+    python manage.py bench_catalog --database bench
+    python manage.py bench_catalog --database bench --books 100000 --term zephyr --term mo
+"""
+import random
+import statistics
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from api.models import Author, Book
+from api.search import contains_q
+
+WORDS = (
+    'amber ash autumn bitter blue broken candle castle cedar cinder clock cold '
+    'copper crimson crown dark dawn deep desert distant dream dust echo ember '
+    'empire evening fable falcon field fire forest frost garden ghost glass gold '
+    'grey harbor hidden hollow honey house hunter iron island ivory journey '
+    'kingdom lantern last light lion lost marble meadow mirror moon morning night '
+    'north ocean orchard paper pearl quiet raven red river rose salt scarlet '
+    'secret shadow silent silver sky small snow song stone storm summer sun '
+    'tide tower twilight valley velvet violet voyage war water whisper white '
+    'wild willow wind winter wolf wooden year zephyr'
+).split()
+
+DEFAULT_TERMS = ['zephyr', 'silver moon', 'storm', 'ow', 'Author 4242']
+
+
+class Command(BaseCommand):
+    help = 'Times indexed vs plain icontains search on a seeded catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=1_000_000,
+                            help='Books to seed (default: %(default)s)')
+        parser.add_argument('--authors', type=int, default=50_000,
+                            help='Authors to seed (default: %(default)s)')
+        parser.add_argument('--term', action='append', dest='terms',
+                            help='Search term (repeatable; default: a mix of rare, '
+                                 'common, multi-word and short terms)')
+        parser.add_argument('-n', '--repeat', type=int, default=5,
+                            help='Runs per term and mode (default: %(default)s)')
+        parser.add_argument('--database', default='default',
+                            help='Database alias (default: %(default)s)')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the seeded rows instead of rolling back')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        terms = options['terms'] or DEFAULT_TERMS
+        with transaction.atomic(using=alias):
+            start = time.perf_counter()
+            self.seed(alias, options['books'], options['authors'])
+            self.stdout.write(
+                f"Seeded {options['books']} books in {time.perf_counter() - start:.1f}s"
+            )
+            for term in terms:
+                self.stdout.write(f'{term!r}:')
+                for mode in ('indexed', 'icontains'):
+                    count, samples = self.time(alias, mode, term, options['repeat'])
+                    self.stdout.write(
+                        f'  {mode:>9}: median {statistics.median(samples) * 1000:8.2f} ms'
+                        f'  ({count} matches)'
+                    )
+            if not options['keep']:
+                transaction.set_rollback(True, using=alias)
+
+    def seed(self, alias, books, authors, batch_size=10_000):
+        rng = random.Random(0)
+        Author.objects.using(alias).bulk_create(
+            [Author(name=f'Author {i} {rng.choice(WORDS).title()}') for i in range(authors)],
+            batch_size=batch_size,
+        )
+        author_ids = list(Author.objects.using(alias).values_list('pk', flat=True))
+        for offset in range(0, books, batch_size):
+            Book.objects.using(alias).bulk_create([
+                Book(
+                    title=' '.join(rng.choices(WORDS, k=rng.randint(2, 4))).title(),
+                    publication_year=date(rng.randint(1800, 2024), 1, 1),
+                    author_id=rng.choice(author_ids),
+                )
+                for _ in range(min(batch_size, books - offset))
+            ])
+
+    def time(self, alias, mode, term, repeat):
+        if mode == 'indexed':
+            match = contains_q('title', term, alias) | contains_q('author__name', term, alias)
+        else:
+            match = Q(title__icontains=term) | Q(author__name__icontains=term)
+        queryset = Book.objects.using(alias).filter(match)
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(queryset.select_related('author').order_by('title', 'id')[:20])
+            samples.append(time.perf_counter() - start)
+        return queryset.count(), samples
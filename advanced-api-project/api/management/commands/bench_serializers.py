@@ -0,0 +1,90 @@
+"""
+Management command to measure the serializer CPU saved by the per-response
+representation cache (MemoizedSerializerMixin in api/serializers.py).
+
+Seeds --books books spread over --authors authors inside a transaction that
+is rolled back at the end, loads one page the way BookListView does (author
+and author__Books prefetched), then renders it repeatedly with the cache on
+and off.  Only serialization is timed; the queries run before the clock
+starts.  Fewer authors per page means more repetition and a bigger saving:
+
+    python manage.py bench_serializers --books 100 --authors 5
+    python manage.py bench_serializers --books 100 --authors 100   # no repetition
+"""
+import statistics
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+
+from api.models import Author, Book
+from api.serializers import REPRESENTATION_CACHE, BookSerializer
+
+
+class Command(BaseCommand):
+    help = 'Times BookSerializer on a page with repeated authors, with and without memoization'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=100,
+                            help='Books on the page (default: %(default)s)')
+        parser.add_argument('--authors', type=int, default=5,
+                            help='Distinct authors on the page (default: %(default)s)')
+        parser.add_argument('--bibliography', type=int, default=20,
+                            help="Books per author's nested list (default: %(default)s)")
+        parser.add_argument('-n', '--repeat', type=int, default=50,
+                            help='Renders per mode (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            page = self.seed(options['books'], options['authors'], options['bibliography'])
+            timings = {
+                'memoized': self.time(page, {}, options['repeat']),
+                'plain': self.time(page, {REPRESENTATION_CACHE: None}, options['repeat']),
+            }
+            transaction.set_rollback(True)
+
+        for mode, samples in timings.items():
+            self.stdout.write(
+                f'{mode:>9}: median {statistics.median(samples) * 1000:.2f} ms  '
+                f'min {min(samples) * 1000:.2f} ms  per page of {len(page)} books'
+            )
+        saved = 1 - statistics.median(timings['memoized']) / statistics.median(timings['plain'])
+        self.stdout.write(self.style.SUCCESS(f'CPU saved: {saved:.0%}'))
+
+    def seed(self, books, authors, bibliography):
+        """Create the data and return a fully prefetched page of books."""
+        created = Author.objects.bulk_create(
+            [Author(name=f'Bench author {i}') for i in range(authors)]
+        )
+        Book.objects.bulk_create(
+            [
+                Book(title=f'Backlist {i}', publication_year=date(2000, 1, 1), author=author)
+                for author in created
+                for i in range(max(bibliography - books // authors, 0))
+            ]
+            + [
+                Book(
+                    title=f'Bench book {i}',
+                    publication_year=date(2000 + i % 20, 1, 1),
+                    author=created[i % authors],
+                )
+                for i in range(books)
+            ]
+        )
+        return list(
+            Book.objects.filter(title__startswith='Bench book ')
+            .select_related('author')
+            .prefetch_related(Prefetch('author__Books'))
+            .order_by('id')
+        )
+
+    def time(self, page, context, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.process_time()
+            # A fresh context per render, as DRF does per request.
+            BookSerializer(page, many=True, context=dict(context)).data
+            samples.append(time.process_time() - start)
+        return samples
@@ -0,0 +1,191 @@
+"""
+Management command to bulk-import books (and their authors) from CSV or
+NDJSON files of any size.
+
+Each row needs a title, a publication_year (YYYY-MM-DD, or a bare YYYY for
+January 1st) and an author name:
+
+    title,publication_year,author
+    Pride and Prejudice,1813-01-28,Jane Austen
+
+    {"title": "Emma", "publication_year": "1815", "author": "Jane Austen"}
+
+The file is streamed and processed --chunk-size rows at a time, each chunk
+in its own transaction:
+
+1. Author names are resolved through an in-memory name -> id map, loaded
+   once up front. Names not seen before are checked against Author.name
+   (e.g. its max_length) and get a placeholder Author.
+2. Rows are validated by one BookSerializer with the authors in its context
+   (AuthorField), so validation runs no queries.
+3. Placeholder authors referenced by valid rows are bulk_created, then the
+   valid books are bulk_created.
+
+Rejected rows don't stop the import. They are reported with their line
+number and errors, and written as NDJSON to --rejects when given.
+
+    python manage.py import_catalog books.csv
+    python manage.py import_catalog books.ndjson --rejects rejects.ndjson --dry-run
+"""
+import csv
+import json
+import re
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework import serializers
+
+from api.caching import touch
+from api.models import Author, Book
+from api.serializers import BookSerializer
+
+YEAR_ONLY = re.compile(r'^\d{4}$')
+AUTHOR_NAME = Author._meta.get_field('name')
+
+
+def read_csv(fp):
+    # Line 1 is the header, so data starts on line 2.
+    for line, row in enumerate(csv.DictReader(fp), start=2):
+        yield line, row
+
+
+def read_ndjson(fp):
+    for line, text in enumerate(fp, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as exc:
+            yield line, {'_error': f'Invalid JSON: {exc}'}
+            continue
+        yield line, row if isinstance(row, dict) else {'_error': 'Expected a JSON object'}
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson, 'jsonl': read_ndjson}
+
+
+class Command(BaseCommand):
+    help = 'Streams books from a CSV or NDJSON file into the catalog in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import ('-' for stdin)")
+        parser.add_argument('--format', choices=sorted(READERS),
+                            help='File format (default: from the file extension)')
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help='Rows per transaction (default: %(default)s)')
+        parser.add_argument('--rejects', help='Write rejected rows here as NDJSON')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Validate everything, write nothing')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or Path(path).suffix.lstrip('.').lower()
+        if fmt not in READERS:
+            raise CommandError(f'Unknown format {fmt!r}; pass --format.')
+
+        self.author_ids = {}
+        for pk, name in Author.objects.order_by('pk').values_list('pk', 'name').iterator():
+            self.author_ids.setdefault(name, pk)
+        self.stats = {'read': 0, 'imported': 0, 'rejected': 0, 'authors': 0}
+        self.dry_run = options['dry_run']
+        self.shown = 0
+        self.new_names = set()
+
+        rejects = open(options['rejects'], 'w', encoding='utf-8') if options['rejects'] else None
+        fp = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        start = time.perf_counter()
+        try:
+            rows = READERS[fmt](fp)
+            while chunk := list(islice(rows, options['chunk_size'])):
+                for line, row, errors in self.import_chunk(chunk):
+                    self.reject(line, row, errors, rejects)
+        finally:
+            if fp is not sys.stdin:
+                fp.close()
+            if rejects:
+                rejects.close()
+        elapsed = time.perf_counter() - start
+
+        stats = self.stats
+        verb = 'Validated' if self.dry_run else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {stats['imported']} of {stats['read']} rows "
+            f"({stats['rejected']} rejected, {stats['authors']} new authors) "
+            f"in {elapsed:.1f}s, {stats['read'] / max(elapsed, 1e-9):,.0f} rows/s"
+        ))
+
+    def import_chunk(self, chunk):
+        """Import one chunk; returns the rejects as (line, row, errors)."""
+        self.stats['read'] += len(chunk)
+        rejects = []
+        authors = {}   # key -> Author (saved, or a placeholder with a negative key)
+        new_keys = {}  # new author name -> negative key
+        rows = []
+        for line, row in chunk:
+            if '_error' in row:
+                rejects.append((line, row, {'non_field_errors': [row['_error']]}))
+                continue
+            name = str(row.get('author') or '').strip()
+            if not name:
+                rejects.append((line, row, {'author': ['This field is required.']}))
+                continue
+            key = self.author_ids.get(name)
+            if key is None:
+                # A name the column can't hold would fail the whole chunk's
+                # bulk_create (DataError on PostgreSQL), so reject the row here.
+                try:
+                    AUTHOR_NAME.run_validators(name)
+                except ValidationError as exc:
+                    rejects.append((line, row, {'author': exc.messages}))
+                    continue
+                # Negative keys can't collide with real ids.
+                key = new_keys.setdefault(name, -len(new_keys) - 1)
+            if key not in authors:
+                authors[key] = Author(pk=key if key > 0 else None, name=name)
+            year = str(row.get('publication_year') or '').strip()
+            rows.append((line, row, {
+                'title': str(row.get('title') or '').strip(),
+                'publication_year': f'{year}-01-01' if YEAR_ONLY.match(year) else year,
+                'author': key,
+            }))
+
+        # One serializer for the whole chunk; AuthorField reads `authors`.
+        serializer = BookSerializer(context={'authors': authors})
+        valid = []
+        for line, row, data in rows:
+            try:
+                valid.append(serializer.run_validation(data))
+            except serializers.ValidationError as exc:
+                rejects.append((line, row, exc.detail))
+
+        # Only authors with at least one valid book are created.
+        new_authors = list({
+            attrs['author'].name: attrs['author']
+            for attrs in valid if attrs['author'].pk is None
+        }.values())
+        if not self.dry_run:
+            with transaction.atomic():
+                Author.objects.bulk_create(new_authors)
+                Book.objects.bulk_create([Book(**attrs) for attrs in valid])
+                touch()
+            for author in new_authors:
+                self.author_ids[author.name] = author.pk
+        # A dry run sees the same new name again in later chunks.
+        self.stats['authors'] += len({a.name for a in new_authors} - self.new_names)
+        self.new_names.update(a.name for a in new_authors)
+        self.stats['imported'] += len(valid)
+        self.stats['rejected'] += len(rejects)
+        return sorted(rejects, key=lambda reject: reject[0])
+
+    def reject(self, line, row, errors, rejects):
+        errors = json.loads(json.dumps(errors, default=str))
+        if rejects is not None:
+            rejects.write(json.dumps({'line': line, 'row': row, 'errors': errors}) + '\n')
+        elif self.shown < 20:
+            self.shown += 1
+            self.stderr.write(f'line {line}: {errors}')
@@ -0,0 +1,90 @@
+"""
+Substring indexes for title / author name search (see api/search.py).
+
+PostgreSQL gets pg_trgm GIN indexes; SQLite gets FTS5 trigram tables kept
+in sync by triggers. Other databases, and SQLite builds without the trigram
+tokenizer (older than 3.34), are left alone and keep using plain icontains.
+
+Note for later migrations: SQLite rebuilds a table for most ALTERs, which
+drops its triggers. A migration that does that to api_book or api_author
+must re-run create_search_indexes' trigger statements.
+"""
+from django.db import migrations
+
+# FTS5 table -> (base table, indexed column)
+FTS_TABLES = {
+    'api_book_fts': ('api_book', 'title'),
+    'api_author_fts': ('api_author', 'name'),
+}
+
+# Index name -> (table, column)
+TRGM_INDEXES = {
+    'api_book_title_trgm': ('api_book', 'title'),
+    'api_author_name_trgm': ('api_author', 'name'),
+}
+
+
+def sqlite_has_trigram(cursor):
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp.trigram_probe USING fts5(x, tokenize='trigram')")
+    except Exception:
+        return False
+    cursor.execute('DROP TABLE temp.trigram_probe')
+    return True
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for index, (table, column) in TRGM_INDEXES.items():
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {index} ON {table} USING gin ({column} gin_trgm_ops)'
+            )
+    elif vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            if not sqlite_has_trigram(cursor):
+                return
+        for fts, (table, column) in FTS_TABLES.items():
+            # External content table: the FTS index stores no copy of the text.
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {fts} USING fts5("
+                f"{column}, content='{table}', content_rowid='id', tokenize='trigram')"
+            )
+            schema_editor.execute(
+                f'CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN '
+                f'INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END'
+            )
+            schema_editor.execute(
+                f'CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN '
+                f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END"
+            )
+            schema_editor.execute(
+                f'CREATE TRIGGER {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN '
+                f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+                f'INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END'
+            )
+            schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for index in TRGM_INDEXES:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {index}')
+    elif vendor == 'sqlite':
+        for fts in FTS_TABLES:
+            for suffix in ('ai', 'ad', 'au'):
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+            schema_editor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['publication_year'], name='book_pub_year_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_catalogversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogversion',
+            name='previous',
+            field=models.BigIntegerField(null=True),
+        ),
+    ]
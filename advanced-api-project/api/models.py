@@ -7,10 +7,18 @@ from django.db import models
 # Purpose: Represents a person who writes books. Authors are the "one" side of
 # the Author-Book relationship. Each Author can have multiple Books associated
 # with them (accessed via the reverse relation: author.books.all()).
+#
+# Indexes: (name, id) for the cursor-paginated author list (api/pagination.py).
 # ------------------------------------------------------------------------------
 class Author(models.Model):
     name = models.CharField(max_length=100)  # The full name of the author
 
+    class Meta:
+        indexes = [
+            # Keyset pages of GET /authors/ in (name, id) order
+            models.Index(fields=['name', 'id'], name='author_name_id_idx'),
+        ]
+
 
 # ------------------------------------------------------------------------------
 # Book Model
@@ -23,8 +31,36 @@ class Author(models.Model):
 # - on_delete=CASCADE: When an Author is deleted, all their Books are deleted.
 # - related_name='Books': Enables reverse lookup; use author.Books.all() to get
 #   all books by an author (note: convention often uses lowercase 'books').
+#
+# Indexes: publication_year is indexed for the date-range filters, and
+# (title, id) for the cursor-paginated list (api/pagination.py).
 # ------------------------------------------------------------------------------
 class Book(models.Model):
     title = models.CharField(max_length=100)  # The title of the book
     publication_year = models.DateField()     # When the book was published
     author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name='Books')
+
+    class Meta:
+        indexes = [
+            # ?publication_year_after / _before range filters and decade facets
+            models.Index(fields=['publication_year'], name='book_pub_year_idx'),
+            # Keyset pages of GET /books/ in the default (title, id) order
+            models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+        ]
+
+
+# ------------------------------------------------------------------------------
+# CatalogVersion Model
+# ------------------------------------------------------------------------------
+# Purpose: A single row (pk=1) holding the catalog version behind the response
+# cache and the ETags (api/caching.py). Every Book / Author write updates it
+# in the writer's transaction, so every process - web workers, the shell,
+# `manage.py import_catalog` - sees the new version exactly when the write
+# commits, and a rolled-back write leaves it unchanged.
+#
+# previous: the version the last write replaced, so a process that applied
+# that write itself (the autocomplete index) can tell whether it missed any.
+# ------------------------------------------------------------------------------
+class CatalogVersion(models.Model):
+    version = models.BigIntegerField()  # Nanoseconds since the epoch of the last write
+    previous = models.BigIntegerField(null=True)  # The version it replaced
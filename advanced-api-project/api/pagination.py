@@ -0,0 +1,214 @@
+"""
+Book / Author API Pagination
+
+BookCursorPagination pages GET /books/ with a keyset ("seek") cursor: a page
+starts right after the last row of the previous one,
+
+    WHERE (title, id) > (<last title>, <last id>) ORDER BY title, id LIMIT n
+
+instead of OFFSET, so deep pages cost the same as the first one and rows
+added while a client pages don't shift or repeat results. It follows
+whatever ?ordering= the OrderingFilter applied (title, publication_year or
+author__name, ascending or descending), with id as the tiebreaker so every
+row has a unique position. AuthorCursorPagination pages GET /authors/ the
+same way over (name, id).
+
+Counts: COUNT(*) over a large filtered set can cost more than the page
+itself. ?count= (default: BOOK_LIST_COUNT setting) picks what "count" is:
+- exact    - COUNT(*)
+- estimate - the planner's row estimate on PostgreSQL when it is above
+             ESTIMATE_THRESHOLD (exact below it, and on other databases);
+             "count_is_estimate" says which one was returned
+- none     - no count at all
+"""
+import base64
+import json
+from datetime import date
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# ------------------------------------------------------------------------------
+# Count helpers
+# ------------------------------------------------------------------------------
+
+def estimate_count(queryset):
+    """
+    The planner's row estimate for ``queryset`` on PostgreSQL, or None on
+    other databases.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+# ------------------------------------------------------------------------------
+# BookCursorPagination
+# ------------------------------------------------------------------------------
+
+class BookCursorPagination(BasePagination):
+    """
+    Keyset pagination over (ordering field, id) for the Book list.
+
+    Response:
+    {"count": 1234, "count_is_estimate": false,   # unless ?count=none
+     "next": "...", "previous": "...",            # null at either end
+     "results": [...]}
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_modes = ('exact', 'estimate', 'none')
+    # Values read from a Book for each supported ordering field.
+    ordering_fields = {
+        'title': lambda book: book.title,
+        'publication_year': lambda book: book.publication_year.isoformat(),
+        'author__name': lambda book: book.author.name,
+    }
+    default_ordering = 'title'
+    invalid_cursor_message = 'Invalid cursor'
+    ESTIMATE_THRESHOLD = 10000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.count, self.count_is_estimate = self.get_count(queryset, request)
+
+        field = self.ordering.lstrip('-')
+        descending = self.ordering.startswith('-')
+        cursor = request.query_params.get(self.cursor_query_param)
+        reverse = False
+        if cursor:
+            cursor_field, value, pk, reverse = self.decode_cursor(cursor)
+            if cursor_field != self.ordering:
+                raise NotFound(self.invalid_cursor_message)
+            if field == 'publication_year':
+                value = date.fromisoformat(value)
+            # Forward pages continue in the ordering's direction, previous
+            # pages ("reverse" cursors) go the other way and are flipped back.
+            op = 'lt' if descending != reverse else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'pk__{op}': pk})
+            )
+
+        order = [self.ordering, '-pk' if descending else 'pk']
+        if reverse:
+            order = [o[1:] if o.startswith('-') else f'-{o}' for o in order]
+        rows = list(queryset.order_by(*order)[:self.page_size_value + 1])
+        has_more = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, bool(cursor)
+        self.page = rows
+        return rows
+
+    def get_ordering(self, queryset):
+        """The primary ordering applied by OrderingFilter (or the default)."""
+        for ordering in queryset.query.order_by:
+            if isinstance(ordering, str) and ordering.lstrip('-') in self.ordering_fields:
+                return ordering
+        return self.default_ordering
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(
+            self.count_query_param, getattr(settings, 'BOOK_LIST_COUNT', 'exact')
+        )
+        if mode not in self.count_modes:
+            raise ValidationError({self.count_query_param: [
+                f'Must be one of: {", ".join(self.count_modes)}.'
+            ]})
+        if mode == 'none':
+            return None, False
+        if mode == 'estimate':
+            estimate = estimate_count(queryset)
+            if estimate is not None and estimate > self.ESTIMATE_THRESHOLD:
+                return estimate, True
+        return queryset.order_by().count(), False
+
+    def encode_cursor(self, book, reverse=False):
+        value = self.ordering_fields[self.ordering.lstrip('-')](book)
+        raw = json.dumps([self.ordering, value, book.pk, int(reverse)])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            ordering, value, pk, reverse = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return str(ordering), str(value), int(pk), bool(reverse)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def cursor_url(self, cursor):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        payload = {}
+        if self.count is not None:
+            payload['count'] = self.count
+            payload['count_is_estimate'] = self.count_is_estimate
+        payload['next'] = (
+            self.cursor_url(self.encode_cursor(self.page[-1]))
+            if self.has_next and self.page else None
+        )
+        if self.has_previous and self.page:
+            payload['previous'] = self.cursor_url(self.encode_cursor(self.page[0], reverse=True))
+        elif self.has_previous:
+            # Paged past the end: go back to the first page.
+            payload['previous'] = remove_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param
+            )
+        else:
+            payload['previous'] = None
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['next', 'previous', 'results'],
+            'properties': {
+                'count': {'type': 'integer'},
+                'count_is_estimate': {'type': 'boolean'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+# ------------------------------------------------------------------------------
+# AuthorCursorPagination
+# ------------------------------------------------------------------------------
+
+class AuthorCursorPagination(BookCursorPagination):
+    """Keyset pagination over (name, id) for the Author list."""
+    ordering_fields = {
+        'name': lambda author: author.name,
+    }
+    default_ordering = 'name'
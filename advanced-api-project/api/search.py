@@ -0,0 +1,93 @@
+"""
+Indexed substring search for Book titles and Author names.
+
+`title__icontains` / `author__name__icontains` (BookFilter and SearchFilter)
+compile to LIKE '%term%', which no B-tree index can serve: every lookup
+scans the whole book table and joins every row to Author. Migration
+0002_search_indexes adds a substring index that fits the database in use:
+
+- PostgreSQL: pg_trgm GIN indexes on api_book.title and api_author.name.
+  They serve `ILIKE '%term%'`, so contains() filters with the
+  `trgm_icontains` lookup below (Django's own icontains is
+  `UPPER(col) LIKE UPPER(...)`, which the index can't serve).
+- SQLite (3.34+): FTS5 tables with the trigram tokenizer, api_book_fts and
+  api_author_fts, kept in sync with the base tables by triggers. A term is
+  matched as a quoted phrase, which the trigram tokenizer treats as a
+  case-insensitive substring match.
+- Anything else, or an SQLite build without the trigram tokenizer: plain
+  icontains.
+
+Trigram indexes can't look up terms shorter than three characters; those
+fall back to icontains on every backend (results are the same, only
+slower).
+"""
+from django.db import connections
+from django.db.models import CharField, Q, lookups
+from django.db.models.expressions import RawSQL
+
+MIN_TERM_LENGTH = 3
+
+# Field path (from Book) -> (FTS5 table, Book field holding the rowid it indexes)
+INDEXED_FIELDS = {
+    'title': ('api_book_fts', 'pk'),
+    'author__name': ('api_author_fts', 'author_id'),
+}
+
+
+@CharField.register_lookup
+class TrigramIContains(lookups.IContains):
+    """
+    icontains that compiles to ILIKE on PostgreSQL, so a gin_trgm_ops index
+    on the bare column can serve it. Other backends get plain icontains.
+    """
+    lookup_name = 'trgm_icontains'
+
+    def as_sql(self, compiler, connection):
+        return lookups.IContains(self.lhs, self.rhs).as_sql(compiler, connection)
+
+    def as_postgresql(self, compiler, connection):
+        # lookup_cast() only adds UPPER(...::text) for the built-in names,
+        # so the left-hand side stays the bare (indexed) column.
+        lhs_sql, lhs_params = self.process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs_sql} ILIKE {rhs_sql}', (*lhs_params, *rhs_params)
+
+
+_tables = {}
+
+
+def fts_available(connection, table):
+    """Whether the FTS5 ``table`` exists (tables are listed once per database)."""
+    key = (connection.alias, str(connection.settings_dict['NAME']))
+    if key not in _tables:
+        _tables[key] = set(connection.introspection.table_names())
+    return table in _tables[key]
+
+
+def fts_phrase(term):
+    """``term`` as an FTS5 phrase (double quotes doubled)."""
+    return '"{}"'.format(term.replace('"', '""'))
+
+
+def contains_q(field, term, using='default'):
+    """
+    Q() for ``field`` containing ``term`` (case-insensitive), through the
+    substring index when ``field`` has one.
+    """
+    connection = connections[using]
+    if field not in INDEXED_FIELDS or len(term) < MIN_TERM_LENGTH:
+        return Q(**{f'{field}__icontains': term})
+    fts_table, key_field = INDEXED_FIELDS[field]
+    if connection.vendor == 'postgresql':
+        return Q(**{f'{field}__trgm_icontains': term})
+    if connection.vendor == 'sqlite' and fts_available(connection, fts_table):
+        rowids = RawSQL(
+            f'SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s', [fts_phrase(term)]
+        )
+        return Q(**{f'{key_field}__in': rowids})
+    return Q(**{f'{field}__icontains': term})
+
+
+def contains(queryset, field, term):
+    """``queryset`` filtered to rows whose ``field`` contains ``term``."""
+    return queryset.filter(contains_q(field, term, using=queryset.db))
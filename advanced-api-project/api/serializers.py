@@ -5,6 +5,33 @@ from rest_framework import serializers
 from .models import Author, Book
 
 
+REPRESENTATION_CACHE = 'representation_cache'
+
+
+# ------------------------------------------------------------------------------
+# MemoizedSerializerMixin
+# ------------------------------------------------------------------------------
+# Purpose: Per-response serialization cache. A page of books usually repeats
+# the same few authors; rendering each of them once and reusing the result
+# saves most of the serializer CPU on such pages.
+#
+# The cache is a dict in the serializer context keyed on
+# (serializer class, model, pk). DRF builds a fresh context for every request
+# and shares it with nested serializers, so the cache lives exactly as long as
+# one response. context={REPRESENTATION_CACHE: None} turns it off (used by
+# `manage.py bench_serializers`). Unsaved instances are always rendered.
+# ------------------------------------------------------------------------------
+class MemoizedSerializerMixin:
+    def to_representation(self, instance):
+        cache = self.context.setdefault(REPRESENTATION_CACHE, {})
+        if cache is None or instance.pk is None:
+            return super().to_representation(instance)
+        key = (type(self), instance._meta.label_lower, instance.pk)
+        if key not in cache:
+            cache[key] = super().to_representation(instance)
+        return cache[key]
+
+
 # ------------------------------------------------------------------------------
 # BookListSerializer
 # ------------------------------------------------------------------------------
@@ -22,14 +49,118 @@ class BookListSerializer(serializers.ModelSerializer):
 # Purpose: Serializes/deserializes Author model instances for API requests and
 # responses. Used when returning author data (e.g., in list/detail views) and
 # as a nested representation inside BookSerializer.
+#
+# Nested bibliography: 'Books' reads author.Books.all(), so views prefetch it
+# (one query per page, see api/views.py). Callers that don't need it pass
+# include_books=False in the serializer context and the field is dropped.
+# Each author is rendered once per response (MemoizedSerializerMixin).
 # ------------------------------------------------------------------------------
-class AuthorSerializer(serializers.ModelSerializer):
+class AuthorSerializer(MemoizedSerializerMixin, serializers.ModelSerializer):
     name = serializers.CharField(max_length=100)
     Books = BookListSerializer(many=True, read_only=True)
 
     class Meta:
         model = Author
-        fields = ['name', 'Books']
+        fields = ['id', 'name', 'Books']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get('include_books', True):
+            fields.pop('Books')
+        return fields
+
+
+# ------------------------------------------------------------------------------
+# AuthorField
+# ------------------------------------------------------------------------------
+# Purpose: PrimaryKeyRelatedField that resolves ids from an {id: Author} map in
+# the serializer context ('authors') before falling back to one query per
+# value. Batch writers (e.g. `manage.py import_catalog`) load the authors once
+# and put them in the context, so validating N books doesn't cost N queries.
+# ------------------------------------------------------------------------------
+class AuthorField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        authors = self.context.get('authors')
+        if authors is not None and not isinstance(data, bool):
+            try:
+                return authors[int(data)]
+            except (TypeError, ValueError):
+                pass
+            except KeyError:
+                # The map holds every id the batch refers to.
+                self.fail('does_not_exist', pk_value=data)
+        return super().to_internal_value(data)
+
+
+def item_ids(data, key):
+    """The integer ``key`` values of the dicts in ``data``, skipping bad ones."""
+    ids = set()
+    for item in data:
+        try:
+            ids.add(int(item[key]))
+        except (KeyError, TypeError, ValueError):
+            pass
+    return ids
+
+
+# ------------------------------------------------------------------------------
+# BookBulkListSerializer
+# ------------------------------------------------------------------------------
+# Purpose: many=True write path for BookSerializer (batch create / update).
+#
+# - Authors: every author id in the batch is loaded with one in_bulk() query
+#   and handed to AuthorField through the context, so N books cost one author
+#   query, not N. Unknown ids are reported per item ('Invalid pk "9" - object
+#   does not exist.'), keyed by the item's index like any list error.
+# - Create: bulk_create of the validated books.
+# - Update: `instance` is a queryset of the books that may be changed; every
+#   item must carry the "id" of one of them. Only the ids in the batch are
+#   loaded (one in_bulk() query), and changes are written with bulk_update.
+# - Nothing is queried until the list itself is valid: a payload that is not
+#   a list or is longer than max_length is rejected first.
+# ------------------------------------------------------------------------------
+class BookBulkListSerializer(serializers.ListSerializer):
+    batch_size = 500
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and (self.max_length is None or len(data) <= self.max_length):
+            self.context['authors'] = Author.objects.in_bulk(item_ids(data, 'author'))
+            if self.instance is not None:
+                self.books = self.instance.in_bulk(item_ids(data, 'id'))
+            self.targets = []
+        # Otherwise super() rejects the payload before any item is looked at.
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+        try:
+            pk = int(data['id'])
+        except (KeyError, TypeError, ValueError):
+            raise serializers.ValidationError({'id': ['A valid book id is required.']})
+        book = self.books.pop(pk, None)
+        if book is None:
+            # Unknown, or already changed by an earlier item of the batch.
+            raise serializers.ValidationError({'id': [f'Book {pk} does not exist or is repeated.']})
+        self.child.instance = book
+        self.child.initial_data = data
+        validated = super().run_child_validation(data)
+        self.targets.append(book)
+        return validated
+
+    def create(self, validated_data):
+        books = [Book(**attrs) for attrs in validated_data]
+        return Book.objects.bulk_create(books, batch_size=self.batch_size)
+
+    def update(self, instance, validated_data):
+        fields = set()
+        for book, attrs in zip(self.targets, validated_data):
+            for name, value in attrs.items():
+                setattr(book, name, value)
+            fields.update(attrs)
+        if fields:
+            Book.objects.bulk_update(self.targets, sorted(fields), batch_size=self.batch_size)
+        return self.targets
 
 
 # ------------------------------------------------------------------------------
@@ -40,20 +171,28 @@ class AuthorSerializer(serializers.ModelSerializer):
 #
 # Relationship handling (Author <-> Book):
 # - READ: Returns full author object via to_representation().
-# - WRITE: Accepts author by ID (PrimaryKeyRelatedField) for create/update.
+# - WRITE: Accepts author by ID (AuthorField, a PrimaryKeyRelatedField) for
+#   create/update.
 # ------------------------------------------------------------------------------
 class BookSerializer(serializers.ModelSerializer):
     title = serializers.CharField(max_length=100)
     publication_year = serializers.DateField()
-    author = serializers.PrimaryKeyRelatedField(
+    author = AuthorField(
         queryset=Author.objects.all(),
         write_only=False,
     )
 
     def to_representation(self, instance):
-        """Return nested author object on read for richer API responses."""
+        """
+        Return nested author object on read for richer API responses.
+
+        AuthorSerializer shares this serializer's context, so an author
+        repeated across a page is rendered once and reused.
+        """
         rep = super().to_representation(instance)
-        rep['author'] = AuthorSerializer(instance.author).data
+        rep['author'] = AuthorSerializer(context=self.context).to_representation(
+            instance.author
+        )
         return rep
 
     def validate_publication_year(self, value):
@@ -67,3 +206,4 @@ class BookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = ['id', 'title', 'publication_year', 'author']
+        list_serializer_class = BookBulkListSerializer
@@ -0,0 +1,180 @@
+"""
+Performance regression tests for the Book API endpoints.
+
+api/test_views.py checks behaviour on a handful of rows; this module seeds a
+catalog of tens of thousands of books and checks how the endpoints scale:
+
+- Query counts: every read endpoint must run a fixed number of queries,
+  whatever the catalog size. A serializer or filter change that introduces
+  an N+1 (e.g. a nested field that isn't prefetched) fails here.
+- Timings: each endpoint's best-of-three time is compared with
+  api/perf_baselines.json. Timings depend on the machine, so they are only
+  enforced when PERF_ENFORCE=1 (allowing PERF_TOLERANCE times the baseline,
+  default 2.0); PERF_RECORD=1 rewrites the baselines instead.
+
+The server-side response cache is cleared before every measured request,
+and each endpoint is called once beforehand to warm up.
+
+Run tests:
+    python manage.py test api.test_performance
+    PERF_ENFORCE=1 python manage.py test api.test_performance
+    PERF_RECORD=1 PERF_BOOKS=20000 python manage.py test api.test_performance
+    python manage.py test api --exclude-tag performance      # skip them
+"""
+import json
+import os
+import random
+import time
+from datetime import date
+from pathlib import Path
+
+from django.core.cache import cache
+from django.test import tag
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api import autocomplete
+from api.models import Author, Book
+
+BOOKS = int(os.environ.get('PERF_BOOKS', 20000))
+AUTHORS = max(BOOKS // 10, 1)
+BASELINES = Path(__file__).with_name('perf_baselines.json')
+ENFORCE = os.environ.get('PERF_ENFORCE') == '1'
+RECORD = os.environ.get('PERF_RECORD') == '1'
+TOLERANCE = float(os.environ.get('PERF_TOLERANCE', 2.0))
+
+WORDS = (
+    'amber autumn castle cedar crimson dawn desert ember falcon forest frost '
+    'garden harbor hollow iron island lantern meadow mirror night ocean raven '
+    'river shadow silver storm summer tide valley velvet willow winter'
+).split()
+
+
+@tag('performance')
+class EndpointPerformanceTests(APITestCase):
+    """Query counts and timings for the read endpoints on a large catalog."""
+
+    # name -> (url name, url kwargs, query params, expected queries)
+    # Every cached read starts with the catalog version lookup. List
+    # endpoints (books and authors) then run COUNT(*) + one keyset page + the
+    # bibliography prefetch.
+    ENDPOINTS = {
+        'list': ('api:book-list', {}, {}, 4),
+        'list_without_books': ('api:book-list', {}, {'include_books': 'false'}, 3),
+        'detail': ('api:book-detail', {'pk': 'first'}, {}, 3),
+        'filtered': (
+            'api:book-list', {},
+            {'publication_year_after': '1950-01-01', 'author__name': 'author 1'}, 4,
+        ),
+        'searched': ('api:book-list', {}, {'search': 'silver storm'}, 4),
+        'ordered_by_author': ('api:book-list', {}, {'ordering': '-author__name'}, 4),
+        'facets': ('api:book-facets', {}, {'search': 'river'}, 2),
+        'authors': ('api:author-list', {}, {}, 4),
+        # Served from the in-memory index once the warm-up request has built it.
+        'autocomplete': ('api:autocomplete', {}, {'q': 'silver st'}, 0),
+    }
+
+    timings = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        authors = Author.objects.bulk_create(
+            [Author(name=f'Author {i} {rng.choice(WORDS).title()}') for i in range(AUTHORS)]
+        )
+        Book.objects.bulk_create(
+            [
+                Book(
+                    title=' '.join(rng.choices(WORDS, k=3)).title(),
+                    publication_year=date(rng.randint(1900, 2020), 1, 1),
+                    author=rng.choice(authors),
+                )
+                for _ in range(BOOKS)
+            ],
+            batch_size=5000,
+        )
+        cls.first_book = Book.objects.order_by('pk').first()
+        autocomplete.index.reset()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if RECORD and cls.timings:
+            baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+            baselines.update({name: round(ms, 1) for name, ms in cls.timings.items()})
+            BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+
+    def measure(self, name):
+        url_name, kwargs, params, queries = self.ENDPOINTS[name]
+        kwargs = {k: self.first_book.pk if v == 'first' else v for k, v in kwargs.items()}
+        url = reverse(url_name, kwargs=kwargs)
+
+        # Warm-up: one-off work (e.g. api.search listing the FTS tables)
+        # isn't what is being measured.
+        self.client.get(url, params)
+        cache.clear()
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        samples = []
+        for _ in range(3):
+            cache.clear()
+            start = time.perf_counter()
+            self.client.get(url, params)
+            samples.append((time.perf_counter() - start) * 1000)
+        elapsed = min(samples)
+        type(self).timings[name] = elapsed
+
+        if ENFORCE:
+            baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+            if name in baselines:
+                self.assertLessEqual(
+                    elapsed, baselines[name] * TOLERANCE,
+                    f'{name}: {elapsed:.1f} ms vs baseline {baselines[name]} ms',
+                )
+        return response
+
+    def test_list(self):
+        response = self.measure('list')
+        self.assertEqual(response.data['count'], BOOKS)
+        self.assertTrue(response.data['results'])
+
+    def test_list_deep_page(self):
+        """A page far into the catalog costs the same queries as the first one."""
+        url = reverse('api:book-list')
+        params = {'page_size': 100, 'count': 'none'}
+        response = self.client.get(url, params)
+        for _ in range(20):
+            response = self.client.get(response.data['next'])
+        cache.clear()
+        with self.assertNumQueries(3):
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 100)
+
+    def test_list_without_books(self):
+        self.measure('list_without_books')
+
+    def test_detail(self):
+        self.measure('detail')
+
+    def test_filtered(self):
+        self.measure('filtered')
+
+    def test_searched(self):
+        self.measure('searched')
+
+    def test_ordered_by_author_name(self):
+        self.measure('ordered_by_author')
+
+    def test_facets(self):
+        response = self.measure('facets')
+        self.assertGreater(response.data['count'], 0)
+
+    def test_author_list(self):
+        self.measure('authors')
+
+    def test_autocomplete(self):
+        response = self.measure('autocomplete')
+        self.assertEqual(len(response.data['results']), 10)
@@ -6,6 +6,7 @@ Testing strategy:
 - Filtering: title, author, author__name, publication_year
 - Search: search parameter across title and author name
 - Ordering: ordering by title, publication_year, author__name
+- Autocomplete: prefix suggestions over titles and author names
 - Permissions: AllowAny for list/detail, IsAuthenticated for create/update/delete
 - Validation: publication_year not in future
 
@@ -14,11 +15,16 @@ Run tests: python manage.py test api.test_views
 from datetime import date
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from api import autocomplete, caching, search
 from api.models import Author, Book
+from api.serializers import REPRESENTATION_CACHE, AuthorSerializer, BookSerializer
 
 User = get_user_model()
 
@@ -70,17 +76,17 @@ class BookListTests(BookAPITestCase):
         """List returns all books with correct structure."""
         url = reverse('api:book-list')
         response = self.client.get(url)
-        self.assertEqual(len(response.data), 3)
-        self.assertIn('id', response.data[0])
-        self.assertIn('title', response.data[0])
-        self.assertIn('publication_year', response.data[0])
-        self.assertIn('author', response.data[0])
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIn('id', response.data['results'][0])
+        self.assertIn('title', response.data['results'][0])
+        self.assertIn('publication_year', response.data['results'][0])
+        self.assertIn('author', response.data['results'][0])
 
     def test_list_books_author_nested(self):
         """Each book includes nested author object."""
         url = reverse('api:book-list')
         response = self.client.get(url)
-        first_book = response.data[0]
+        first_book = response.data['results'][0]
         self.assertIn('author', first_book)
         self.assertIn('name', first_book['author'])
 
@@ -198,6 +204,80 @@ class BookDeleteTests(BookAPITestCase):
         self.assertFalse(Book.objects.filter(pk=self.book1.pk).exists())
 
 
+class BookBatchWriteTests(BookAPITestCase):
+    """Tests for batch create (POST a list) and batch update (/books/update/, 'book-batch-update')."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_batch_create_resolves_authors_in_one_query(self):
+        """A list of books is validated with one author query and bulk inserted."""
+        data = [
+            {'title': f'Book {i}', 'publication_year': '1900-01-01',
+             'author': (self.author1, self.author2)[i % 2].pk}
+            for i in range(10)
+        ]
+        # session, user, authors (in_bulk), savepoint + INSERT + catalog
+        # version + release, authors' books for the response
+        with self.assertNumQueries(8):
+            response = self.client.post(reverse('api:book-create'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 10)
+        self.assertEqual(response.data[1]['author']['name'], 'Charles Dickens')
+        self.assertEqual(Book.objects.count(), 13)
+
+    def test_batch_create_reports_missing_authors(self):
+        """Unknown author ids are reported per item and nothing is created."""
+        data = [
+            {'title': 'Ok', 'publication_year': '1900-01-01', 'author': self.author1.pk},
+            {'title': 'Orphan', 'publication_year': '1900-01-01', 'author': 9999},
+        ]
+        response = self.client.post(reverse('api:book-create'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # Errors are keyed by item index.
+        self.assertIn('9999', str(response.data[1]['author']))
+        self.assertEqual(Book.objects.count(), 3)
+
+    def test_batch_update(self):
+        """PATCH /books/update/ changes each listed book by id."""
+        data = [
+            {'id': self.book1.pk, 'title': 'Pride & Prejudice'},
+            {'id': self.book3.pk, 'author': self.author1.pk},
+        ]
+        response = self.client.patch(reverse('api:book-batch-update'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.book1.refresh_from_db()
+        self.book3.refresh_from_db()
+        self.assertEqual(self.book1.title, 'Pride & Prejudice')
+        self.assertEqual(self.book3.author, self.author1)
+        self.assertEqual(self.book2.title, 'Sense and Sensibility')
+
+    def test_batch_update_rejects_unknown_and_repeated_ids(self):
+        data = [
+            {'id': self.book1.pk, 'title': 'A'},
+            {'id': self.book1.pk, 'title': 'B'},
+            {'id': 9999, 'title': 'C'},
+        ]
+        response = self.client.patch(reverse('api:book-batch-update'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.book1.refresh_from_db()
+        self.assertEqual(self.book1.title, 'Pride and Prejudice')
+
+    def test_batch_update_requires_a_list(self):
+        response = self.client.patch(reverse('api:book-batch-update'), {'title': 'X'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_oversized_batch_update_is_rejected_before_loading_books(self):
+        """A list longer than max_batch_size costs no book or author query."""
+        data = [{'id': self.book1.pk, 'author': self.author1.pk}] * 1001
+        # session, user
+        with self.assertNumQueries(2):
+            response = self.client.patch(reverse('api:book-batch-update'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('1000', str(response.data))
+
+
 # ------------------------------------------------------------------------------
 # Filtering Tests
 # ------------------------------------------------------------------------------
@@ -210,39 +290,39 @@ class BookFilterTests(BookAPITestCase):
         url = reverse('api:book-list')
         response = self.client.get(url, {'title': 'Pride'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['title'], 'Pride and Prejudice')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['title'], 'Pride and Prejudice')
 
     def test_filter_by_author(self):
         """?author=<id> returns books by that author."""
         url = reverse('api:book-list')
         response = self.client.get(url, {'author': self.author1.pk})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
 
     def test_filter_by_author_name(self):
         """?author__name=Austen returns books by authors with that name."""
         url = reverse('api:book-list')
         response = self.client.get(url, {'author__name': 'Austen'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
 
     def test_filter_by_publication_year(self):
         """?publication_year= returns books with exact date."""
         url = reverse('api:book-list')
         response = self.client.get(url, {'publication_year': '1813-01-28'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['title'], 'Pride and Prejudice')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['title'], 'Pride and Prejudice')
 
     def test_filter_publication_year_after(self):
         """?publication_year_after= returns books published on or after date."""
         url = reverse('api:book-list')
         response = self.client.get(url, {'publication_year_after': '1812-01-01'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)  # Pride (1813), Sense (1811)? No - 1811 is before 1812
+        self.assertEqual(len(response.data['results']), 2)  # Pride (1813), Sense (1811)? No - 1811 is before 1812
         # 1813, 1861 are after 1812. 1811 is before. So 2 books.
-        titles = [b['title'] for b in response.data]
+        titles = [b['title'] for b in response.data['results']]
         self.assertIn('Pride and Prejudice', titles)
         self.assertIn('Great Expectations', titles)
 
@@ -259,15 +339,368 @@ class BookSearchTests(BookAPITestCase):
         url = reverse('api:book-list')
         response = self.client.get(url, {'search': 'Pride'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['title'], 'Pride and Prejudice')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['title'], 'Pride and Prejudice')
 
     def test_search_matches_author_name(self):
         """?search=Austen returns books by authors with 'Austen' in name."""
         url = reverse('api:book-list')
         response = self.client.get(url, {'search': 'Austen'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_search_terms_must_all_match(self):
+        """Each term must match the title or the author name."""
+        url = reverse('api:book-list')
+        response = self.client.get(url, {'search': 'sense austen'})
+        self.assertEqual([b['title'] for b in response.data['results']], ['Sense and Sensibility'])
+
+    def test_search_short_and_special_terms(self):
+        """Terms too short for the index and quote characters still work."""
+        Book.objects.create(
+            title='Say "Hi" 100%', publication_year=date(2000, 1, 1), author=self.author2,
+        )
+        url = reverse('api:book-list')
+        self.assertEqual(len(self.client.get(url, {'search': 'Gr'}).data['results']), 1)
+        response = self.client.get(url, {'search': '"hi"'})
+        self.assertEqual([b['title'] for b in response.data['results']], ['Say "Hi" 100%'])
+        response = self.client.get(url, {'title': '100%'})
+        self.assertEqual([b['title'] for b in response.data['results']], ['Say "Hi" 100%'])
+
+
+class SearchIndexTests(BookAPITestCase):
+    """The substring index (api/search.py) stays in sync with the tables."""
+
+    def test_lookups_use_the_index(self):
+        """On SQLite the title lookup reads the FTS5 table."""
+        qs = search.contains(Book.objects.all(), 'title', 'pride')
+        if connection.vendor == 'sqlite':
+            self.assertIn('api_book_fts', str(qs.query))
+        self.assertEqual(list(qs), [self.book1])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Renamed and deleted rows are found under their new state only."""
+        url = reverse('api:book-list')
+        self.book3.title = 'Bleak House'
+        self.book3.save()
+        self.author2.name = 'Charles John Huffam Dickens'
+        self.author2.save()
+        self.assertEqual(len(self.client.get(url, {'search': 'expectations'}).data['results']), 0)
+        self.assertEqual(len(self.client.get(url, {'title': 'bleak'}).data['results']), 1)
+        self.assertEqual(len(self.client.get(url, {'author__name': 'huffam'}).data['results']), 1)
+        self.book1.delete()
+        self.assertEqual(len(self.client.get(url, {'search': 'pride'}).data['results']), 0)
+
+
+# ------------------------------------------------------------------------------
+# Pagination Tests
+# ------------------------------------------------------------------------------
+
+class BookPaginationTests(BookAPITestCase):
+    """Tests for cursor pagination on GET /books/ (api/pagination.py)."""
+
+    def setUp(self):
+        super().setUp()
+        # Duplicate titles, years and authors so the id tiebreak matters.
+        for i in range(12):
+            Book.objects.create(
+                title=f'Volume {i % 3}',
+                publication_year=date(1900 + i % 2, 1, 1),
+                author=(self.author1, self.author2)[i % 2],
+            )
+
+    def walk(self, params):
+        """Follow "next" links to the end; return the ids and the last response."""
+        ids = []
+        response = self.client.get(reverse('api:book-list'), {'page_size': 4, **params})
+        while True:
+            ids += [b['id'] for b in response.data['results']]
+            if not response.data['next']:
+                return ids, response
+            response = self.client.get(response.data['next'])
+
+    def test_pages_cover_every_ordering_exactly_once(self):
+        """Each supported ordering pages through all 15 books without gaps or repeats."""
+        for ordering in ['title', '-title', 'publication_year', '-publication_year',
+                         'author__name', '-author__name']:
+            with self.subTest(ordering=ordering):
+                ids, _ = self.walk({'ordering': ordering})
+                expected = list(
+                    Book.objects.order_by(ordering, '-pk' if ordering[0] == '-' else 'pk')
+                    .values_list('pk', flat=True)
+                )
+                self.assertEqual(ids, expected)
+
+    def test_previous_link(self):
+        """"previous" returns the page before, in order."""
+        url = reverse('api:book-list')
+        first = self.client.get(url, {'page_size': 4})
+        self.assertIsNone(first.data['previous'])
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    def test_count_modes(self):
+        url = reverse('api:book-list')
+        response = self.client.get(url, {'page_size': 4})
+        self.assertEqual(response.data['count'], 15)
+        self.assertFalse(response.data['count_is_estimate'])
+        # No planner estimate on SQLite: falls back to the exact count.
+        self.assertEqual(self.client.get(url, {'count': 'estimate'}).data['count'], 15)
+        self.assertNotIn('count', self.client.get(url, {'count': 'none'}).data)
+        self.assertEqual(
+            self.client.get(url, {'count': 'bogus'}).status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_invalid_or_mismatched_cursor(self):
+        """Garbage cursors and cursors from another ordering are rejected."""
+        url = reverse('api:book-list')
+        self.assertEqual(
+            self.client.get(url, {'cursor': 'garbage'}).status_code, status.HTTP_404_NOT_FOUND
+        )
+        next_url = self.client.get(url, {'page_size': 4}).data['next']
+        response = self.client.get(f'{next_url}&ordering=-publication_year')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# ------------------------------------------------------------------------------
+# Facet Tests
+# ------------------------------------------------------------------------------
+
+class BookFacetsTests(BookAPITestCase):
+    """Tests for GET /books/facets/."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_facets_for_whole_catalog(self):
+        """Counts per decade and per author, in one query (plus the catalog version)."""
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('api:book-facets'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            response.data['decades'],
+            [{'decade': 1810, 'count': 2}, {'decade': 1860, 'count': 1}],
+        )
+        self.assertEqual(
+            response.data['authors'],
+            [
+                {'id': self.author1.pk, 'name': 'Jane Austen', 'count': 2},
+                {'id': self.author2.pk, 'name': 'Charles Dickens', 'count': 1},
+            ],
+        )
+
+    def test_facets_follow_filters(self):
+        """Filters and search narrow the facets like they narrow the list."""
+        response = self.client.get(
+            reverse('api:book-facets'),
+            {'publication_year_after': '1812-01-01', 'search': 'e'},
+        )
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([d['decade'] for d in response.data['decades']], [1810, 1860])
+
+    def test_facets_are_cached_per_normalized_filters(self):
+        """Parameter order and ordering/paging params don't change the key."""
+        url = reverse('api:book-facets')
+        self.client.get(url, {'title': 'and', 'author__name': 'austen'})
+        # Only the catalog version is read.
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                f'{url}?author__name=austen&ordering=-title&title=and'
+            )
+        self.assertEqual(response.data['count'], 2)
+        with self.assertNumQueries(2):
+            self.client.get(url, {'title': 'great'})
+
+    def test_invalid_filter_returns_400(self):
+        response = self.client.get(
+            reverse('api:book-facets'), {'publication_year_after': 'not-a-date'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# ------------------------------------------------------------------------------
+# Conditional GET & Response Caching Tests
+# ------------------------------------------------------------------------------
+
+class CatalogCacheTests(BookAPITestCase):
+    """Tests for ETag / Last-Modified and server-side caching (api/caching.py)."""
+
+    def test_etag_and_304(self):
+        """A matching If-None-Match gets 304 after only the version lookup."""
+        url = reverse('api:book-list')
+        response = self.client.get(url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        with self.assertNumQueries(1):
+            response = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_responses_are_cached_per_normalized_params(self):
+        """Repeated reads, in any parameter order, are served from the cache."""
+        url = reverse('api:book-list')
+        first = self.client.get(url, {'ordering': '-title', 'search': 'and'})
+        with self.assertNumQueries(1):
+            second = self.client.get(f'{url}?search=and&ordering=-title')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertNotEqual(self.client.get(url, {'search': 'great'})['ETag'], first['ETag'])
+
+    def test_writes_invalidate(self):
+        """Single and batch writes change the ETag and the cached data."""
+        self.client.login(username='testuser', password='testpass123')
+        detail = reverse('api:book-detail', kwargs={'pk': self.book1.pk})
+        etag = self.client.get(detail)['ETag']
+
+        self.client.patch(
+            reverse('api:book-update', kwargs={'pk': self.book1.pk}),
+            {'title': 'First Impressions'}, format='json',
+        )
+        response = self.client.get(detail, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'First Impressions')
+
+        etag = response['ETag']
+        self.client.patch(
+            reverse('api:book-batch-update'),
+            [{'id': self.book1.pk, 'title': 'Pride and Prejudice'}], format='json',
+        )
+        response = self.client.get(detail, headers={'If-None-Match': etag})
+        self.assertEqual(response.data['title'], 'Pride and Prejudice')
+
+        self.client.delete(reverse('api:book-delete', kwargs={'pk': self.book1.pk}))
+        self.assertEqual(self.client.get(detail).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_version_is_shared_through_the_database(self):
+        """
+        A process with an empty cache sees the same version, and a write that
+        only bumps the version row (as another process would) moves it.
+        """
+        url = reverse('api:book-list')
+        etag = self.client.get(url)['ETag']
+        cache.clear()
+        self.assertEqual(self.client.get(url)['ETag'], etag)
+
+        Book.objects.filter(pk=self.book1.pk).update(title='First Impressions')
+        caching.touch()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('First Impressions', [b['title'] for b in response.data['results']])
+
+    def test_etag_depends_on_format(self):
+        """The JSON and browsable-API bodies of one URL get different ETags."""
+        url = reverse('api:book-list')
+        json_response = self.client.get(url, headers={'Accept': 'application/json'})
+        html_response = self.client.get(url, headers={'Accept': 'text/html'})
+        self.assertIn('Accept', json_response['Vary'])
+        self.assertNotEqual(json_response['ETag'], html_response['ETag'])
+        response = self.client.get(
+            url, headers={'Accept': 'text/html', 'If-None-Match': json_response['ETag']}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+# ------------------------------------------------------------------------------
+# Autocomplete Tests
+# ------------------------------------------------------------------------------
+
+class AutocompleteTests(BookAPITestCase):
+    """Tests for GET /autocomplete/ (api/autocomplete.py)."""
+
+    def setUp(self):
+        super().setUp()
+        # The index is per process; start from this test's data.
+        autocomplete.index.reset()
+        self.addCleanup(autocomplete.index.reset)
+        self.url = reverse('api:autocomplete')
+
+    def labels(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(r['type'], r['label']) for r in response.data['results']]
+
+    def test_prefix_matches_titles_and_authors(self):
+        """Label-start matches rank first; later words match too, case-insensitively."""
+        Book.objects.create(
+            title='Sensible Shoes', publication_year=date(2000, 1, 1), author=self.author2
+        )
+        self.assertEqual(
+            self.labels(q='SENS'),
+            [('book', 'Sense and Sensibility'), ('book', 'Sensible Shoes')],
+        )
+        self.assertEqual(
+            self.labels(q='ja'), [('author', 'Jane Austen')],
+        )
+        self.assertEqual(
+            self.labels(q='exp'), [('book', 'Great Expectations')],
+        )
+        self.assertEqual(self.labels(q='  '), [])
+        self.assertEqual(self.labels(q='zzz'), [])
+
+    def test_limit_type_and_duplicates(self):
+        """?limit and ?type narrow the results; repeated titles appear once."""
+        for _ in range(2):
+            Book.objects.create(
+                title='Emma', publication_year=date(1815, 1, 1), author=self.author1
+            )
+        Author.objects.create(name='Emma Donoghue')
+        self.assertEqual(
+            self.labels(q='emma'), [('book', 'Emma'), ('author', 'Emma Donoghue')],
+        )
+        self.assertEqual(self.labels(q='emma', type='author'), [('author', 'Emma Donoghue')])
+        self.assertEqual(self.labels(q='emma', limit=1), [('book', 'Emma')])
+        for params in ({'limit': 'x'}, {'type': 'publisher'}):
+            response = self.client.get(self.url, {'q': 'emma', **params})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_served_from_memory(self):
+        """Only the first lookup loads the index (and reads the catalog version)."""
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {'q': 'p'})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.labels(q='pride'), [('book', 'Pride and Prejudice')])
+
+    @override_settings(AUTOCOMPLETE_REFRESH_SECONDS=0)
+    def test_saves_and_deletes_update_the_index(self):
+        """save() / delete() are applied in place and never cause a rebuild."""
+        self.labels(q='p')
+        self.book1.title = 'First Impressions'
+        self.book1.save()
+        self.author2.delete()
+        # Every lookup checks the version (interval 0) but finds it covered.
+        with self.assertNumQueries(4):
+            self.assertEqual(self.labels(q='first'), [('book', 'First Impressions')])
+            self.assertEqual(self.labels(q='pride'), [])
+            self.assertEqual(self.labels(q='great'), [])
+            self.assertEqual(self.labels(q='charles'), [])
+        self.assertEqual(autocomplete.index.builds, 1)
+
+    @override_settings(AUTOCOMPLETE_REFRESH_SECONDS=0)
+    def test_missed_write_between_saves_forces_a_rebuild(self):
+        """A save that follows a write the index didn't see doesn't mask it."""
+        self.labels(q='p')
+        # As another process would: no signals, only the version moves.
+        Book.objects.bulk_create([
+            Book(title='Persuasion', publication_year=date(1817, 1, 1), author=self.author1)
+        ])
+        caching.touch()
+        self.book1.title = 'First Impressions'
+        self.book1.save()
+        self.assertEqual(self.labels(q='pers'), [('book', 'Persuasion')])
+        self.assertEqual(autocomplete.index.builds, 2)
+
+    def test_bulk_writes_rebuild_after_refresh_interval(self):
+        """Writes without signals show up once the catalog version changes."""
+        self.client.login(username='testuser', password='testpass123')
+        self.labels(q='p')
+        batch = [{'title': 'Persuasion', 'publication_year': '1817-01-01', 'author': self.author1.pk}]
+        with override_settings(AUTOCOMPLETE_REFRESH_SECONDS=3600):
+            self.client.post(reverse('api:book-create'), batch, format='json')
+            self.assertEqual(self.labels(q='pers'), [])
+        with override_settings(AUTOCOMPLETE_REFRESH_SECONDS=0):
+            self.assertEqual(self.labels(q='pers'), [('book', 'Persuasion')])
 
 
 # ------------------------------------------------------------------------------
@@ -282,7 +715,7 @@ class BookOrderingTests(BookAPITestCase):
         url = reverse('api:book-list')
         response = self.client.get(url, {'ordering': 'title'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        titles = [b['title'] for b in response.data]
+        titles = [b['title'] for b in response.data['results']]
         self.assertEqual(titles, sorted(titles))
 
     def test_ordering_by_title_desc(self):
@@ -290,7 +723,7 @@ class BookOrderingTests(BookAPITestCase):
         url = reverse('api:book-list')
         response = self.client.get(url, {'ordering': '-title'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        titles = [b['title'] for b in response.data]
+        titles = [b['title'] for b in response.data['results']]
         self.assertEqual(titles, sorted(titles, reverse=True))
 
     def test_ordering_by_publication_year_desc(self):
@@ -298,7 +731,7 @@ class BookOrderingTests(BookAPITestCase):
         url = reverse('api:book-list')
         response = self.client.get(url, {'ordering': '-publication_year'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data[0]['title'], 'Great Expectations')
+        self.assertEqual(response.data['results'][0]['title'], 'Great Expectations')
 
 
 # ------------------------------------------------------------------------------
@@ -337,3 +770,74 @@ class BookPermissionTests(BookAPITestCase):
         self.assertEqual(create_resp.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(update_resp.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(delete_resp.status_code, status.HTTP_403_FORBIDDEN)
+
+
+# ------------------------------------------------------------------------------
+# Author endpoints & nested author representation
+# ------------------------------------------------------------------------------
+
+class AuthorAPITests(BookAPITestCase):
+    """Tests for /authors/ and the author embedded in book responses."""
+
+    def test_author_list_includes_books(self):
+        """Author list returns each author with their books."""
+        response = self.client.get(reverse('api:author-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [a['name'] for a in response.data['results']]
+        self.assertEqual(names, ['Charles Dickens', 'Jane Austen'])
+        self.assertEqual(len(response.data['results'][1]['Books']), 2)
+
+    def test_author_list_is_paginated_by_name_and_id(self):
+        """Pages follow (name, id), so authors sharing a name aren't skipped."""
+        for _ in range(3):
+            Author.objects.create(name='Anne Brontë')
+        url = reverse('api:author-list')
+        ids = []
+        response = self.client.get(url, {'page_size': 2, 'include_books': 'false'})
+        while True:
+            self.assertLessEqual(len(response.data['results']), 2)
+            ids += [a['id'] for a in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(ids, list(Author.objects.order_by('name', 'id').values_list('pk', flat=True)))
+        self.assertEqual(response.data['count'], 5)
+
+    def test_author_detail_can_omit_books(self):
+        """?include_books=false drops the bibliography."""
+        url = reverse('api:author-detail', kwargs={'pk': self.author1.pk})
+        response = self.client.get(url, {'include_books': 'false'})
+        self.assertEqual(response.data, {'id': self.author1.pk, 'name': 'Jane Austen'})
+
+    def test_book_list_query_count_is_constant(self):
+        """A page of books and their authors' bibliographies load in two queries
+        (plus the catalog version)."""
+        for i in range(20):
+            Book.objects.create(
+                title=f'Book {i}', publication_year=date(1900, 1, 1), author=self.author2,
+            )
+        url = reverse('api:book-list')
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'page_size': 100, 'count': 'none'})
+        self.assertEqual(len(response.data['results']), 23)
+        with self.assertNumQueries(2):
+            self.client.get(url, {'include_books': 'false', 'count': 'none'})
+
+    def test_repeated_author_is_rendered_once(self):
+        """Books by the same author share one memoized author representation."""
+        books = list(Book.objects.filter(author=self.author1).select_related('author'))
+        data = BookSerializer(books, many=True).data
+        self.assertIs(data[0]['author'], data[1]['author'])
+        self.assertEqual(data[0]['author']['name'], 'Jane Austen')
+
+        plain = BookSerializer(books, many=True, context={REPRESENTATION_CACHE: None}).data
+        self.assertIsNot(plain[0]['author'], plain[1]['author'])
+        self.assertEqual(plain[0]['author'], data[0]['author'])
+
+    def test_memoization_is_keyed_on_pk(self):
+        """Different authors never share a cached representation."""
+        context = {}
+        rep = AuthorSerializer(context=context).to_representation(self.author1)
+        self.assertIs(AuthorSerializer(context=context).to_representation(self.author1), rep)
+        other = AuthorSerializer(context=context).to_representation(self.author2)
+        self.assertEqual(other['name'], 'Charles Dickens')
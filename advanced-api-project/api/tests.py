@@ -1,3 +1,91 @@
+"""
+Tests for the api management commands (endpoint tests live in api/test_views.py).
+
+Run tests: python manage.py test api.tests
+"""
+import io
+import json
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from api.models import Author, Book
+
+
+class ImportCatalogTests(TestCase):
+    """Tests for `manage.py import_catalog`."""
+
+    def setUp(self):
+        self.austen = Author.objects.create(name='Jane Austen')
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, text):
+        path = Path(self.tmp.name) / name
+        path.write_text(text, encoding='utf-8')
+        return str(path)
+
+    def test_csv_import_resolves_and_creates_authors(self):
+        """Known names reuse the author; new names are created once."""
+        path = self.write('books.csv', (
+            'title,publication_year,author\n'
+            'Emma,1815,Jane Austen\n'
+            'Bleak House,1853-03-01,Charles Dickens\n'
+            'Hard Times,1854,Charles Dickens\n'
+        ))
+        out = io.StringIO()
+        # Author map, then one chunk: create authors, create books, bump the
+        # catalog version (+ savepoint).
+        with self.assertNumQueries(6):
+            call_command('import_catalog', path, chunk_size=10, stdout=out)
+        self.assertIn('Imported 3 of 3 rows', out.getvalue())
+        self.assertEqual(Book.objects.get(title='Emma').author, self.austen)
+        dickens = Author.objects.get(name='Charles Dickens')
+        self.assertEqual(dickens.Books.count(), 2)
+        self.assertEqual(
+            Book.objects.get(title='Hard Times').publication_year, date(1854, 1, 1)
+        )
+
+    def test_rejects_are_reported_and_skipped(self):
+        """Invalid rows are written to --rejects; their new authors aren't created."""
+        path = self.write('books.ndjson', '\n'.join([
+            json.dumps({'title': 'Persuasion', 'publication_year': '1817', 'author': 'Jane Austen'}),
+            json.dumps({'title': 'Later', 'publication_year': '2999-01-01', 'author': 'Nobody'}),
+            'not json',
+            json.dumps({'title': 'Anonymous', 'publication_year': '1900'}),
+        ]))
+        rejects = Path(self.tmp.name) / 'rejects.ndjson'
+        call_command(
+            'import_catalog', path, rejects=str(rejects), chunk_size=2, stdout=io.StringIO(),
+        )
+        lines = [json.loads(line) for line in rejects.read_text().splitlines()]
+        self.assertEqual([line['line'] for line in lines], [2, 3, 4])
+        self.assertIn('publication_year', lines[0]['errors'])
+        self.assertEqual(list(Book.objects.values_list('title', flat=True)), ['Persuasion'])
+        self.assertFalse(Author.objects.filter(name='Nobody').exists())
+
+    def test_overlong_author_name_is_rejected(self):
+        """A new name longer than Author.name allows rejects its row only."""
+        path = self.write('books.csv', (
+            'title,publication_year,author\n'
+            f'Long,1900,{"x" * 101}\n'
+            'Emma,1815,Jane Austen\n'
+        ))
+        rejects = Path(self.tmp.name) / 'rejects.ndjson'
+        call_command('import_catalog', path, rejects=str(rejects), stdout=io.StringIO())
+        [line] = [json.loads(text) for text in rejects.read_text().splitlines()]
+        self.assertEqual(line['line'], 2)
+        self.assertIn('author', line['errors'])
+        self.assertEqual(list(Book.objects.values_list('title', flat=True)), ['Emma'])
+        self.assertEqual(Author.objects.count(), 1)
+
+    def test_dry_run_writes_nothing(self):
+        path = self.write('books.csv', 'title,publication_year,author\nX,1900,New Author\n')
+        out = io.StringIO()
+        call_command('import_catalog', path, dry_run=True, stdout=out)
+        self.assertIn('Validated 1 of 1 rows (0 rejected, 1 new authors)', out.getvalue())
+        self.assertFalse(Book.objects.exists())
+        self.assertEqual(Author.objects.count(), 1)
@@ -6,8 +6,14 @@ app_name = 'api'
 
 urlpatterns = [
     path('books/', views.ListView.as_view(), name='book-list'),
+    path('books/facets/', views.BookFacetsView.as_view(), name='book-facets'),
     path('books/create/', views.CreateView.as_view(), name='book-create'),
     path('books/<int:pk>/', views.DetailView.as_view(), name='book-detail'),
-    path('books/update/', views.UpdateView.as_view(), name='book-update'),
-    path('books/delete/', views.DeleteView.as_view(), name='book-delete'),
+    path('books/<int:pk>/update/', views.UpdateView.as_view(), name='book-update'),
+    path('books/<int:pk>/delete/', views.DeleteView.as_view(), name='book-delete'),
+    # Batch update: PUT/PATCH a list of books with ids
+    path('books/update/', views.UpdateView.as_view(), name='book-batch-update'),
+    path('authors/', views.AuthorListView.as_view(), name='author-list'),
+    path('authors/<int:pk>/', views.AuthorDetailView.as_view(), name='author-detail'),
+    path('autocomplete/', views.AutocompleteView.as_view(), name='autocomplete'),
 ]
@@ -7,26 +7,87 @@ so that read operations (list, detail) are public, while write operations
 
 Filtering, Search, and Ordering (ListView):
 - DjangoFilterBackend: Filter by title, author, author__name, publication_year
-- SearchFilter: Text search across title and author name (?search=...)
+- IndexedSearchFilter: Text search across title and author name (?search=...)
+  through the trigram / FTS5 substring index (api/search.py)
 - OrderingFilter: Sort by title, publication_year, author (?ordering=...)
+
+Facets (BookFacetsView):
+- GET /books/facets/ takes the same filters and ?search= as the list and
+  returns counts per decade and per author, cached per filter set.
+
+Autocomplete (AutocompleteView):
+- GET /autocomplete/?q= returns title / author-name suggestions from an
+  in-memory prefix index, without touching the database (api/autocomplete.py).
+
+Conditional GET and caching (all read views, CatalogCacheMixin):
+- ETag / Last-Modified from the catalog version; matching requests get 304.
+- Response data cached per catalog version and normalized params. Writes
+  bump the version (api/caching.py).
+
+Nested authors (all read views):
+- Every book embeds its author, and every author embeds their books. The
+  books are prefetched once per page, and each author is rendered once per
+  response. ?include_books=false leaves the bibliography out entirely.
 """
-from rest_framework import generics
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, IntegerField, prefetch_related_objects
+from django.db.models.functions import Cast, ExtractYear
+from rest_framework import generics, status
 from rest_framework import filters
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import rest_framework
 
-from .filters import BookFilter
-from .models import Book
-from .serializers import BookSerializer
+from . import autocomplete, caching
+from .caching import CatalogCacheMixin
+from .filters import BookFilter, IndexedSearchFilter
+from .models import Author, Book
+from .pagination import AuthorCursorPagination, BookCursorPagination
+from .serializers import AuthorSerializer, BookSerializer
+
+
+# ------------------------------------------------------------------------------
+# Nested author bibliography (shared by the read views)
+# ------------------------------------------------------------------------------
+
+class IncludeBooksMixin:
+    """
+    Handles ?include_books=false and prefetches what the nested author
+    representation reads.
+
+    books_prefetch is the lookup that reaches Author.Books from the view's
+    queryset ('author__Books' for books, 'Books' for authors). It is
+    prefetched with one query for the whole page, and skipped when the
+    caller opted out.
+    """
+    books_prefetch = 'author__Books'
+
+    def include_books(self):
+        value = self.request.query_params.get('include_books', 'true')
+        return value.lower() not in ('false', '0', 'no')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.include_books():
+            queryset = queryset.prefetch_related(self.books_prefetch)
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_books'] = self.include_books()
+        return context
 
 
 # ------------------------------------------------------------------------------
 # Read-only views (public access)
 # ------------------------------------------------------------------------------
 
-class ListView(generics.ListAPIView):
+class ListView(CatalogCacheMixin, IncludeBooksMixin, generics.ListAPIView):
     """
     GET /books/
     List all books with filtering, search, and ordering.
@@ -39,7 +100,7 @@ class ListView(generics.ListAPIView):
     - ?publication_year_after=<YYYY-MM-DD> - Published on or after
     - ?publication_year_before=<YYYY-MM-DD> - Published on or before
 
-    Search (SearchFilter):
+    Search (IndexedSearchFilter):
     - ?search=<query> - Searches title and author name
 
     Ordering (OrderingFilter):
@@ -49,28 +110,164 @@ class ListView(generics.ListAPIView):
     - ?ordering=-publication_year - Sort by date (desc)
     - ?ordering=author - Sort by author name (asc)
     - ?ordering=-author - Sort by author name (desc)
+
+    Nested author:
+    - ?include_books=false - Omit each author's list of books
+
+    Pagination (BookCursorPagination):
+    - ?page_size=<n> - Books per page (default 20, max 100)
+    - ?cursor=<opaque> - Follow the "next" / "previous" links
+    - ?count=exact|estimate|none - How "count" is computed
     """
     serializer_class = BookSerializer
     permission_classes = [AllowAny]
     queryset = Book.objects.all().select_related('author')
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, filters.OrderingFilter]
+    pagination_class = BookCursorPagination
     filterset_class = BookFilter
     search_fields = ['title', 'author__name']
     ordering_fields = ['title', 'publication_year', 'author__name']
     ordering = ['title']  # Default ordering
 
 
-class DetailView(generics.RetrieveAPIView):
+class DetailView(CatalogCacheMixin, IncludeBooksMixin, generics.RetrieveAPIView):
     """
     GET /books/<pk>/
     Retrieve a single book by primary key.
+    ?include_books=false omits the author's list of books.
     """
     queryset = Book.objects.all().select_related('author')
     serializer_class = BookSerializer
     permission_classes = [AllowAny]
 
 
+class BookFacetsView(CatalogCacheMixin, generics.GenericAPIView):
+    """
+    GET /books/facets/
+    Facet counts for the books matching the same filters and ?search= as
+    GET /books/: the total, books per decade and the top authors.
+
+    Response:
+    {"count": 3,
+     "decades": [{"decade": 1810, "count": 2}, ...],            # oldest first
+     "authors": [{"id": 1, "name": "...", "count": 2}, ...]}    # most books first
+
+    Both facets come from one query grouped by (decade, author). Responses
+    are cached per catalog version and filter set (CatalogCacheMixin); only
+    the filter params count, so ?ordering= or a page param doesn't split it.
+    """
+    permission_classes = [AllowAny]
+    queryset = Book.objects.all()
+
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter]
+    filterset_class = BookFilter
+    search_fields = ['title', 'author__name']
+    author_facet_size = 20
+
+    def get_cache_params(self):
+        names = set(self.filterset_class.base_filters) | {IndexedSearchFilter.search_param}
+        return [(name, value) for name, value in super().get_cache_params() if name in names]
+
+    def get_facets(self, queryset):
+        decade = Cast(ExtractYear('publication_year'), IntegerField()) / 10 * 10
+        rows = (
+            queryset.order_by()
+            .annotate(decade=decade)
+            .values_list('decade', 'author_id', 'author__name')
+            .annotate(n=Count('pk'))
+        )
+        decades = Counter()
+        authors = Counter()
+        names = {}
+        for decade, author_id, name, n in rows:
+            decades[decade] += n
+            authors[author_id] += n
+            names[author_id] = name
+        top = sorted(authors.items(), key=lambda item: (-item[1], names[item[0]], item[0]))
+        return {
+            'count': sum(decades.values()),
+            'decades': [{'decade': d, 'count': decades[d]} for d in sorted(decades)],
+            'authors': [
+                {'id': pk, 'name': names[pk], 'count': n}
+                for pk, n in top[:self.author_facet_size]
+            ],
+        }
+
+    def get_uncached_response(self, request, *args, **kwargs):
+        return Response(self.get_facets(self.filter_queryset(self.get_queryset())))
+
+
+class AuthorListView(CatalogCacheMixin, IncludeBooksMixin, generics.ListAPIView):
+    """
+    GET /authors/
+    List authors with their books, ordered by name, a page at a time
+    (AuthorCursorPagination: ?page_size=, ?cursor=, ?count= as for books).
+    ?include_books=false returns names only.
+    """
+    queryset = Author.objects.all().order_by('name', 'id')
+    serializer_class = AuthorSerializer
+    permission_classes = [AllowAny]
+    pagination_class = AuthorCursorPagination
+    books_prefetch = 'Books'
+
+
+class AuthorDetailView(CatalogCacheMixin, IncludeBooksMixin, generics.RetrieveAPIView):
+    """
+    GET /authors/<pk>/
+    Retrieve a single author with their books.
+    ?include_books=false leaves the books out.
+    """
+    queryset = Author.objects.all()
+    serializer_class = AuthorSerializer
+    permission_classes = [AllowAny]
+    books_prefetch = 'Books'
+
+
+class AutocompleteView(generics.GenericAPIView):
+    """
+    GET /autocomplete/?q=<prefix>
+    Typeahead suggestions: books whose title and authors whose name start
+    with the prefix, or have a later word that does (case-insensitive).
+
+    - ?limit=<n> - Number of suggestions (default 10, max 20)
+    - ?type=book|author - Only one kind
+
+    Response:
+    {"query": "sil",
+     "results": [{"type": "book", "id": 3, "label": "Silver Storm"}, ...]}
+
+    Label-start matches come first, then alphabetical; repeated labels are
+    listed once. Served from the per-process index in api/autocomplete.py,
+    so it isn't routed through CatalogCacheMixin.
+    """
+    permission_classes = [AllowAny]
+    default_limit = 10
+    max_limit = 20
+
+    def get_params(self, request):
+        errors = {}
+        limit = request.query_params.get('limit', self.default_limit)
+        try:
+            limit = max(1, min(int(limit), self.max_limit))
+        except (TypeError, ValueError):
+            errors['limit'] = ['A valid integer is required.']
+        kind = request.query_params.get('type')
+        if kind is not None and kind not in autocomplete.Autocomplete.sources:
+            errors['type'] = [f'Must be one of: {", ".join(autocomplete.Autocomplete.sources)}.']
+        if errors:
+            raise ValidationError(errors)
+        return limit, [kind] if kind else None
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '')
+        limit, kinds = self.get_params(request)
+        return Response({
+            'query': query,
+            'results': autocomplete.index.suggest(query, limit, kinds),
+        })
+
+
 # ------------------------------------------------------------------------------
 # Write views (authenticated users only)
 # ------------------------------------------------------------------------------
@@ -78,17 +275,36 @@ class DetailView(generics.RetrieveAPIView):
 class CreateView(generics.CreateAPIView):
     """
     POST /books/create/
-    Create a new book. Requires authentication.
+    Create a new book, or a batch of books. Requires authentication.
 
     Request body (JSON): {"title": "...", "publication_year": "YYYY-MM-DD", "author": <author_id>}
+    or a list of such objects (at most max_batch_size). A list is validated as
+    a whole by BookBulkListSerializer (all author ids in one query; errors are
+    keyed by item index) and inserted with bulk_create in one transaction.
     Data validation is performed by BookSerializer (e.g., publication_year not in future).
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+    max_batch_size = 1000
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=self.max_batch_size
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            self.perform_create(serializer)
+            # bulk_create sends no post_save signals.
+            caching.touch()
+        # The response embeds each author's books: one query for the batch.
+        prefetch_related_objects(serializer.instance, 'author__Books')
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def perform_create(self, serializer):
-        """Save the book. Override for logging, notifications, etc."""
+        """Save the book(s). Override for logging, notifications, etc."""
         serializer.save()
 
 
@@ -96,13 +312,44 @@ class UpdateView(generics.RetrieveUpdateAPIView):
     """
     GET/PUT/PATCH /books/<pk>/update/
     Retrieve (GET) or update (PUT/PATCH) a book. Requires authentication for writes.
+
+    PUT/PATCH /books/update/  (name 'book-batch-update')
+    Batch update: a list of objects, each with the "id" of the book it
+    changes (at most max_batch_size). Validated as a whole by
+    BookBulkListSerializer and written with bulk_update in one transaction.
     """
     queryset = Book.objects.all().select_related('author')
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+    max_batch_size = 1000
+
+    def get(self, request, *args, **kwargs):
+        if 'pk' not in kwargs:
+            return self.http_method_not_allowed(request, *args, **kwargs)
+        return super().get(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        if 'pk' in kwargs:
+            return super().update(request, *args, **kwargs)
+        if not isinstance(request.data, list):
+            return Response(
+                {'detail': 'Expected a list of books, each with an "id".'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # The serializer checks the batch size before loading the listed books.
+        serializer = self.get_serializer(
+            self.get_queryset(), data=request.data, many=True,
+            partial=kwargs.get('partial', False), max_length=self.max_batch_size,
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            self.perform_update(serializer)
+            caching.touch()
+        prefetch_related_objects(serializer.instance, 'author__Books')
+        return Response(serializer.data)
 
     def perform_update(self, serializer):
-        """Save the updated book. Override for auditing, etc."""
+        """Save the updated book(s). Override for auditing, etc."""
         serializer.save()
 
 
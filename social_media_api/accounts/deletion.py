@@ -0,0 +1,54 @@
+"""
+Account deletion for users with a lot of content.
+
+User.delete() would collect the user's posts, comments, likes and
+notifications in memory before cascading.  delete_user() removes them in
+chunks first (see posts.deletion), so the final delete only touches the user
+row and a handful of one-to-one rows.  The user's comments and likes on
+other people's posts are taken back from those posts' counters, trending
+scores and authors' stats as they go.
+"""
+from django.db import transaction
+
+from notifications.models import Notification
+from posts.deletion import CHUNK_SIZE, pk_chunks, delete_comments, delete_likes, delete_posts
+from .models import Profile
+
+
+def _delete_in_chunks(queryset, stage, chunk_size, progress):
+    total = 0
+    model = queryset.model
+    for pks in pk_chunks(queryset, chunk_size):
+        model.objects.filter(pk__in=pks).delete()
+        total += len(pks)
+        if progress:
+            progress(stage, total)
+    return total
+
+
+def delete_user(user, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Delete ``user`` and everything they own, chunk by chunk.
+
+    ``progress`` is an optional callable receiving ``(stage, count)``.
+    Each chunk commits on its own, so an interrupted run can simply be
+    started again.
+    """
+    delete_posts(user.posts.all(), chunk_size, progress)
+    delete_comments(user.comments.all(), chunk_size, progress)
+    delete_likes(user.likes.all(), chunk_size, progress)
+    _delete_in_chunks(
+        Notification.objects.filter(recipient=user), 'notifications', chunk_size, progress
+    )
+    _delete_in_chunks(
+        Notification.objects.filter(actor=user), 'sent notifications', chunk_size, progress
+    )
+
+    follows = Profile.followers.through.objects
+    _delete_in_chunks(follows.filter(user=user), 'following', chunk_size, progress)
+    _delete_in_chunks(follows.filter(profile__user=user), 'followers', chunk_size, progress)
+
+    with transaction.atomic():
+        user.delete()
+    if progress:
+        progress('user', 1)
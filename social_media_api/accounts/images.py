@@ -0,0 +1,153 @@
+"""
+Profile picture pipeline.
+
+ProfileView only hashes the upload and stores the raw bytes; resizing runs
+on a small thread pool after the request has committed (Pillow releases the
+GIL while decoding, resampling and encoding).  For every distinct image we
+keep a set of WebP variants under a content-addressed directory:
+
+    profile_pictures/<h[:2]>/<sha256>/64.webp
+                                     /128.webp
+                                     /256.webp
+                                     /full.webp    (longest side <= AVATAR_MAX_SIZE)
+
+Re-encoding drops EXIF/GPS and any other metadata.  Identical uploads map
+to the same directory, so they are stored and processed once, and because a
+path never changes content the files can be served with a far-future
+Cache-Control header (see serve_avatar in accounts.views).
+
+full.webp is written last, so its existence means the set is complete.
+Each upload is stored next to the variants under its own
+``source-<random>`` name until they are written, so concurrent uploads of
+the same image never delete each other's input.  The source still carries
+the original metadata, so it is deleted whether processing succeeds or fails
+and serve_avatar never hands it out.
+"""
+import hashlib
+import logging
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .models import Profile
+
+SIZES = tuple(getattr(settings, 'AVATAR_THUMBNAIL_SIZES', (64, 128, 256)))
+MAX_SIZE = getattr(settings, 'AVATAR_MAX_SIZE', 1024)
+WEBP_QUALITY = 85
+
+# Anything under a content-addressed directory: variants and the raw source
+PIPELINE_RE = re.compile(r'^profile_pictures/[0-9a-f]{2}/')
+# profile_pictures/ab/<64 hex chars>/<variant>.webp
+VARIANT_RE = re.compile(r'^profile_pictures/[0-9a-f]{2}/[0-9a-f]{64}/\w+\.webp$')
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'AVATAR_WORKERS', 2),
+            thread_name_prefix='avatar',
+        )
+    return _executor
+
+
+def avatar_dir(digest):
+    return f'profile_pictures/{digest[:2]}/{digest}'
+
+
+def variant_urls(name):
+    """
+    Map of variant label -> URL for a processed profile picture name, or
+    an empty dict for pictures uploaded before the pipeline existed.
+    """
+    if not name or not VARIANT_RE.match(name):
+        return {}
+    base = name.rsplit('/', 1)[0]
+    labels = [str(size) for size in SIZES] + ['full']
+    return {label: default_storage.url(f'{base}/{label}.webp') for label in labels}
+
+
+def schedule_avatar(profile, upload):
+    """
+    Store ``upload`` and queue it for processing.  The profile keeps its
+    current picture until the variants are ready; a re-upload of an image
+    that was already processed is applied immediately.
+    """
+    data = upload.read()
+    base = avatar_dir(hashlib.sha256(data).hexdigest())
+    full = f'{base}/full.webp'
+
+    if default_storage.exists(full):
+        Profile.objects.filter(pk=profile.pk).update(profile_picture=full)
+        profile.profile_picture.name = full
+        return
+
+    # Its own name per upload: another job on the same image deletes only its own.
+    source = default_storage.save(f'{base}/source-{uuid.uuid4().hex}', ContentFile(data))
+    transaction.on_commit(lambda: submit_avatar(profile.pk, source, base))
+
+
+def submit_avatar(profile_id, source, base):
+    """Queue process_avatar on the pool, logging any exception it raises."""
+    def log_failure(future):
+        if future.exception() is not None:
+            logger.error(
+                'Processing profile picture %s for profile %s failed', source, profile_id,
+                exc_info=future.exception(),
+            )
+
+    get_executor().submit(process_avatar, profile_id, source, base).add_done_callback(log_failure)
+
+
+def _encode(image):
+    buffer = BytesIO()
+    image.save(buffer, 'WEBP', quality=WEBP_QUALITY)   # no exif= -> metadata dropped
+    return ContentFile(buffer.getvalue())
+
+
+def process_avatar(profile_id, source, base):
+    """
+    Build the variants for ``source``, point the profile at them and delete
+    the source, which is also deleted if processing fails.
+    """
+    full = f'{base}/full.webp'
+    try:
+        if default_storage.exists(full):
+            # Another upload of the same image finished first.
+            Profile.objects.filter(pk=profile_id).update(profile_picture=full)
+            return
+        with default_storage.open(source) as fp:
+            image = Image.open(fp)
+            # Let the JPEG decoder downscale while decoding instead of
+            # materialising a full-resolution bitmap first.
+            image.draft('RGB', (MAX_SIZE, MAX_SIZE))
+            image = ImageOps.exif_transpose(image)
+            image.load()
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+        image.thumbnail((MAX_SIZE, MAX_SIZE), Image.LANCZOS)
+        for size in SIZES:
+            name = f'{base}/{size}.webp'
+            if not default_storage.exists(name):
+                thumb = ImageOps.fit(image, (size, size), Image.LANCZOS)
+                default_storage.save(name, _encode(thumb))
+
+        if not default_storage.exists(full):
+            default_storage.save(full, _encode(image))
+        Profile.objects.filter(pk=profile_id).update(profile_picture=full)
+    finally:
+        # This runs on a pool thread, which owns its own DB connection.
+        close_old_connections()
+        default_storage.delete(source)
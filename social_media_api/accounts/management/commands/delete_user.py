@@ -0,0 +1,52 @@
+"""
+Management command to delete a user and all of their content in chunks.
+
+Meant for large accounts, where a request-time User.delete() would load
+every post, comment, like and notification into memory.  Run it out of band
+(e.g. a one-off dyno) and watch the progress output.
+
+Usage:
+    python manage.py delete_user <username> [--chunk-size 1000] [--yes]
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.deletion import delete_user
+from posts.deletion import CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Deletes a user and all of their posts, comments, likes and notifications in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Rows deleted per transaction (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--yes',
+            action='store_true',
+            help='Do not ask for confirmation',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist.")
+
+        if not options['yes']:
+            answer = input(f"Delete '{user.username}' and all of their content? [y/N] ")
+            if answer.lower() != 'y':
+                self.stdout.write('Aborted.')
+                return
+
+        def progress(stage, count):
+            self.stdout.write(f'  {stage}: {count} deleted')
+
+        delete_user(user, chunk_size=options['chunk_size'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(f"Deleted user '{options['username']}'."))
@@ -26,3 +26,42 @@ def create_user_profile(sender, instance, created, **kwargs):
 def save_user_profile(sender, instance, **kwargs):
     instance.profile.save()
 
+
+class UserStats(models.Model):
+    """
+    Running engagement totals for a user, maintained by accounts.stats and
+    reconciled by `python manage.py rebuild_user_stats`.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    posts = models.IntegerField(default=0)
+    likes_received = models.IntegerField(default=0)
+    comments_received = models.IntegerField(default=0)
+    followers = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id} stats"
+
+
+class DailyUserStats(models.Model):
+    """
+    One row per user per day with activity.  Posts, likes and comments are
+    bucketed by when they were created, so taking one back (unlike, delete)
+    decrements the day it was counted on.  Follows are bucketed by when they
+    happened and kept as separate gained / lost counts.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    posts = models.IntegerField(default=0)
+    likes_received = models.IntegerField(default=0)
+    comments_received = models.IntegerField(default=0)
+    followers_gained = models.IntegerField(default=0)
+    followers_lost = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index behind the stats endpoint's date-range read.
+            models.UniqueConstraint(fields=['user', 'day'], name='unique_user_day_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} stats for {self.day}"
@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from rest_framework.authtoken.models import Token
+from .images import variant_urls
 from .models import Profile
 import re
 
@@ -47,10 +48,18 @@ class UserProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField()
     email = serializers.EmailField(source='user.email', read_only=True)
     followers_count = serializers.SerializerMethodField()
+    profile_picture_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
-        fields = ['username', 'email', 'bio', 'profile_picture', 'followers_count']
+        fields = [
+            'username', 'email', 'bio', 'profile_picture',
+            'profile_picture_variants', 'followers_count',
+        ]
 
     def get_followers_count(self, obj):
         return obj.followers.count()
+
+    def get_profile_picture_variants(self, obj):
+        """Resized WebP copies keyed by size ('64', '128', '256', 'full')."""
+        return variant_urls(obj.profile_picture.name)
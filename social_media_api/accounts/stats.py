@@ -0,0 +1,182 @@
+"""
+Per-user engagement statistics.
+
+Aggregating likes, comments and followers per request gets slower with
+every row, so the counts are rolled up as events happen instead: the views
+call record_event() on post / like / comment / follow changes and the stats
+endpoint reads at most one UserStats row and one DailyUserStats row per day
+in the requested window.
+
+The chunked deletions in posts.deletion (used by the post and comment
+views and by delete_user) take their rows back as they go, but deletes that
+bypass them - Django's cascade after User.delete() in the admin, raw
+queryset deletes - are not tracked; `python manage.py rebuild_user_stats`
+recomputes everything from the source tables and is meant to run nightly.  Daily follower gains and losses
+can't be rebuilt (follows carry no timestamp), so the rebuild leaves those
+two columns alone.
+"""
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from posts.models import Comment, Like, Post
+from .models import DailyUserStats, Profile, UserStats
+
+# kind -> (UserStats field, sign, DailyUserStats field)
+KINDS = {
+    'post': ('posts', 1, 'posts'),
+    'like': ('likes_received', 1, 'likes_received'),
+    'comment': ('comments_received', 1, 'comments_received'),
+    'follow': ('followers', 1, 'followers_gained'),
+    'unfollow': ('followers', -1, 'followers_lost'),
+}
+
+DAILY_FIELDS = ['posts', 'likes_received', 'comments_received']
+TOTAL_FIELDS = ['posts', 'likes_received', 'comments_received', 'followers']
+
+
+def _bump(model, lookup, field, count):
+    """F() increment of one counter, creating the row on first use."""
+    if model.objects.filter(**lookup).update(**{field: F(field) + count}):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **{field: count})
+    except IntegrityError:
+        # Another request created the row in the meantime.
+        model.objects.filter(**lookup).update(**{field: F(field) + count})
+
+
+def record_event(user_id, kind, count=1, at=None):
+    """
+    Count ``count`` events of ``kind`` for ``user_id`` (the author who
+    received the like / comment, the user who gained the follower).  Pass a
+    negative ``count`` to take events back; ``at`` (a datetime or date) is
+    the day they were counted on, today by default.
+    """
+    total_field, sign, daily_field = KINDS[kind]
+    if isinstance(at, datetime):
+        day = timezone.localdate(at)
+    else:
+        day = at or timezone.localdate()
+    _bump(UserStats, {'user_id': user_id}, total_field, sign * count)
+    daily_count = count if kind == 'unfollow' else sign * count
+    _bump(DailyUserStats, {'user_id': user_id, 'day': day}, daily_field, daily_count)
+
+
+def take_back(kind, queryset, user_field):
+    """
+    record_event() with a negative count for the rows in ``queryset``
+    (about to be deleted), grouped by ``user_field`` and the day they were
+    created.
+    """
+    counts = (
+        queryset.order_by()
+        .annotate(day=TruncDate('created_at'))
+        .values_list(user_field, 'day')
+        .annotate(n=Count('pk'))
+    )
+    for user_id, day, n in counts:
+        record_event(user_id, kind, -n, at=day)
+
+
+def get_stats(user_id, days):
+    """
+    Totals plus a dense day-by-day series for the last ``days`` days
+    (oldest first).  ``followers`` in the series is the count at the end of
+    each day, worked back from the current total.
+    """
+    totals = UserStats.objects.filter(user_id=user_id).values(*TOTAL_FIELDS).first()
+    totals = totals or dict.fromkeys(TOTAL_FIELDS, 0)
+
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    rows = {
+        row['day']: row
+        for row in DailyUserStats.objects.filter(user_id=user_id, day__gte=start).values(
+            'day', *DAILY_FIELDS, 'followers_gained', 'followers_lost'
+        )
+    }
+
+    series = []
+    followers = totals['followers']
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        row = rows.get(day, {})
+        point = {'date': day.isoformat(), 'followers': followers}
+        for field in DAILY_FIELDS + ['followers_gained', 'followers_lost']:
+            point[field] = row.get(field, 0)
+        followers -= point['followers_gained'] - point['followers_lost']
+        series.append(point)
+    series.reverse()
+    return {'totals': totals, 'series': series}
+
+
+def rebuild(since=None, batch_size=1000):
+    """
+    Recompute UserStats for every user, and the post / like / comment
+    columns of DailyUserStats from ``since`` (a date) on, or for all days.
+    Returns (users, daily rows) written.
+    """
+    totals = {}
+    sources = [
+        ('posts', Post.objects.values_list('author_id')),
+        ('likes_received', Like.objects.values_list('post__author_id')),
+        ('comments_received', Comment.objects.values_list('post__author_id')),
+        ('followers', Profile.followers.through.objects.values_list('profile__user_id')),
+    ]
+    for field, queryset in sources:
+        for user_id, n in queryset.order_by().annotate(n=Count('pk')):
+            totals.setdefault(user_id, dict.fromkeys(TOTAL_FIELDS, 0))[field] = n
+
+    daily = {}
+    sources = [
+        ('posts', Post.objects, 'author_id'),
+        ('likes_received', Like.objects, 'post__author_id'),
+        ('comments_received', Comment.objects, 'post__author_id'),
+    ]
+    for field, manager, user_field in sources:
+        queryset = manager.all()
+        if since is not None:
+            queryset = queryset.filter(created_at__date__gte=since)
+        counts = (
+            queryset.order_by()
+            .annotate(day=TruncDate('created_at'))
+            .values_list(user_field, 'day')
+            .annotate(n=Count('pk'))
+        )
+        for user_id, day, n in counts:
+            daily.setdefault((user_id, day), dict.fromkeys(DAILY_FIELDS, 0))[field] = n
+
+    with transaction.atomic():
+        stats = (
+            UserStats(user_id=user_id, **totals.get(user_id, dict.fromkeys(TOTAL_FIELDS, 0)))
+            for user_id in User.objects.values_list('pk', flat=True).iterator()
+        )
+        users = 0
+        while batch := list(islice(stats, batch_size)):
+            UserStats.objects.bulk_create(
+                batch, update_conflicts=True, unique_fields=['user'], update_fields=TOTAL_FIELDS,
+            )
+            users += len(batch)
+
+        stale = DailyUserStats.objects.all()
+        if since is not None:
+            stale = stale.filter(day__gte=since)
+        stale.update(**dict.fromkeys(DAILY_FIELDS, 0))
+        DailyUserStats.objects.bulk_create(
+            [
+                DailyUserStats(user_id=user_id, day=day, **counts)
+                for (user_id, day), counts in daily.items()
+            ],
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['user', 'day'],
+            update_fields=DAILY_FIELDS,
+        )
+    return users, len(daily)
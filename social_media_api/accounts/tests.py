@@ -1,3 +1,254 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from social_media_api.throttling import parse_rate
+from .images import process_avatar, schedule_avatar, variant_urls
+
+
+class LoginThrottleTests(APITestCase):
+    """Tests for the token-bucket throttle in front of POST /api/accounts/login/."""
+
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username='alice', password='pass12345')
+
+    def test_parse_rate(self):
+        """Rates accept an optional burst size."""
+        self.assertEqual(parse_rate('30/min'), (0.5, 30))
+        self.assertEqual(parse_rate('5/min burst 10'), (5 / 60, 10))
+        self.assertIsNone(parse_rate(None))
+
+    def test_burst_then_throttled(self):
+        """Ten quick attempts are allowed (burst), the eleventh gets 429."""
+        url = '/api/accounts/login/'
+        for _ in range(10):
+            response = self.client.post(url, {'username': 'alice', 'password': 'wrong'})
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(url, {'username': 'alice', 'password': 'pass12345'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+    def test_username_bucket_spans_clients(self):
+        """Attempts on one account from different IPs share a bucket."""
+        url = '/api/accounts/login/'
+        for i in range(10):
+            self.client.post(url, {'username': 'alice', 'password': 'x'}, REMOTE_ADDR=f'10.0.0.{i}')
+        response = self.client.post(url, {'username': 'alice', 'password': 'x'}, REMOTE_ADDR='10.0.1.1')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class AvatarPipelineTests(APITestCase):
+    """Tests for the profile picture pipeline in accounts.images."""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        self.settings_override = override_settings(MEDIA_ROOT=self.media)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.user = User.objects.create_user(username='alice', password='pass12345')
+
+    def upload(self):
+        image = Image.new('RGB', (1600, 900), 'red')
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera maker'
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', exif=exif)
+        return SimpleUploadedFile('me.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def pending(self):
+        """(base, [source names]) of the one image uploaded so far."""
+        prefix = default_storage.listdir('profile_pictures')[0][0]
+        digest = default_storage.listdir(f'profile_pictures/{prefix}')[0][0]
+        base = f'profile_pictures/{prefix}/{digest}'
+        files = default_storage.listdir(base)[1]
+        return base, [f'{base}/{name}' for name in files if name.startswith('source')]
+
+    def test_variants_are_resized_and_stripped(self):
+        """Processing writes square WebP thumbnails without metadata."""
+        profile = self.user.profile
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            schedule_avatar(profile, self.upload())
+        self.assertEqual(len(callbacks), 1)
+
+        base, [source] = self.pending()
+        process_avatar(profile.pk, source, base)
+
+        profile.refresh_from_db()
+        self.assertEqual(profile.profile_picture.name, f'{base}/full.webp')
+        self.assertEqual(self.pending()[1], [])
+        with default_storage.open(f'{base}/64.webp') as fp:
+            thumb = Image.open(fp)
+            self.assertEqual(thumb.size, (64, 64))
+            self.assertFalse(thumb.getexif())
+        with default_storage.open(f'{base}/full.webp') as fp:
+            self.assertEqual(max(Image.open(fp).size), 1024)
+
+    def test_duplicate_upload_is_applied_immediately(self):
+        """A second upload of the same bytes reuses the existing variants."""
+        other = User.objects.create_user(username='bob', password='pass12345')
+        with self.captureOnCommitCallbacks(execute=False):
+            schedule_avatar(self.user.profile, self.upload())
+        base, [source] = self.pending()
+        process_avatar(self.user.profile.pk, source, base)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            schedule_avatar(other.profile, self.upload())
+        self.assertEqual(callbacks, [])
+        other.profile.refresh_from_db()
+        self.assertEqual(other.profile.profile_picture.name, f'{base}/full.webp')
+        self.assertIn('128', variant_urls(other.profile.profile_picture.name))
+
+    def test_source_is_never_served(self):
+        """serve_avatar hands out variants but 404s on the raw upload next to them."""
+        from django.http import Http404
+        from django.test import RequestFactory
+        from .views import serve_avatar
+
+        with self.captureOnCommitCallbacks(execute=False):
+            schedule_avatar(self.user.profile, self.upload())
+        base, [source] = self.pending()
+        default_storage.save(f'{base}/64.webp', io.BytesIO(b'x'))
+
+        request = RequestFactory().get('/media/')
+        with self.assertRaises(Http404):
+            serve_avatar(request, source)
+        self.assertIn('immutable', serve_avatar(request, f'{base}/64.webp')['Cache-Control'])
+
+    def test_failed_processing_is_logged_and_drops_the_source(self):
+        """An undecodable upload is logged from the pool and its source deleted."""
+        from concurrent.futures import ThreadPoolExecutor
+        from unittest import mock
+        from . import images
+
+        base = 'profile_pictures/ab/' + 'a' * 64
+        default_storage.save(f'{base}/source', io.BytesIO(b'not an image'))
+        executor = ThreadPoolExecutor(max_workers=1)
+        with mock.patch.object(images, '_executor', executor):
+            with self.assertLogs('accounts.images', 'ERROR') as logs:
+                images.submit_avatar(self.user.profile.pk, f'{base}/source', base)
+                executor.shutdown(wait=True)   # returns after the done-callbacks ran
+        self.assertIn('failed', logs.output[0])
+        self.assertFalse(default_storage.exists(f'{base}/source'))
+
+    def test_concurrent_uploads_of_one_image_keep_their_own_source(self):
+        """Two pending jobs on the same image each process and delete their own input."""
+        other = User.objects.create_user(username='bob', password='pass12345')
+        with self.captureOnCommitCallbacks(execute=False):
+            schedule_avatar(self.user.profile, self.upload())
+            schedule_avatar(other.profile, self.upload())
+        base, sources = self.pending()
+        self.assertEqual(len(sources), 2)
+
+        with self.assertNoLogs('accounts.images', 'ERROR'):
+            process_avatar(self.user.profile.pk, sources[0], base)
+            process_avatar(other.profile.pk, sources[1], base)
+        other.profile.refresh_from_db()
+        self.assertEqual(other.profile.profile_picture.name, f'{base}/full.webp')
+        self.assertEqual(self.pending()[1], [])
+
+
+class UserStatsTests(APITestCase):
+    """Tests for the engagement rollups behind /api/accounts/<id>/stats/."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pass12345')
+        self.fan = User.objects.create_user(username='fan', password='pass12345')
+        self.url = f'/api/accounts/{self.author.pk}/stats/'
+
+    def engage(self):
+        self.client.force_authenticate(self.author)
+        post_id = self.client.post('/api/posts/', {'title': 't', 'content': 'c'}).data['id']
+        self.client.force_authenticate(self.fan)
+        self.client.post(f'/api/{post_id}/like/')
+        self.client.post(f'/api/posts/{post_id}/comments/', {'content': 'nice'})
+        self.client.post(f'/api/accounts/follow/{self.author.pk}/')
+        return post_id
+
+    def test_events_update_totals_and_today(self):
+        """Posts, likes, comments and follows show up in totals and today's bucket."""
+        post_id = self.engage()
+        self.client.delete(f'/api/{post_id}/like/')
+        body = self.client.get(f'{self.url}?days=7').json()
+        self.assertEqual(
+            body['totals'],
+            {'posts': 1, 'likes_received': 0, 'comments_received': 1, 'followers': 1},
+        )
+        self.assertEqual(len(body['series']), 7)
+        today = body['series'][-1]
+        self.assertEqual((today['posts'], today['comments_received']), (1, 1))
+        self.assertEqual((today['followers_gained'], today['followers']), (1, 1))
+        self.assertEqual(body['series'][0]['followers'], 0)
+
+    def test_window_size_does_not_change_query_count(self):
+        """A year of buckets costs the same queries as a week."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.engage()
+        with CaptureQueriesContext(connection) as week:
+            self.client.get(f'{self.url}?days=7')
+        with CaptureQueriesContext(connection) as year:
+            self.client.get(f'{self.url}?days=365')
+        self.assertEqual(len(week), len(year))
+
+    def test_rebuild_reconciles_untracked_changes(self):
+        """rebuild_user_stats recomputes from source rows, keeping follow history."""
+        from django.core.management import call_command
+        from posts.models import Like, Post
+
+        self.engage()
+        Like.objects.all().delete()   # bypasses record_event
+        Post.objects.create(author=self.author, title='x', content='y')
+        call_command('rebuild_user_stats', stdout=io.StringIO())
+
+        body = self.client.get(self.url).json()
+        self.assertEqual(
+            body['totals'],
+            {'posts': 2, 'likes_received': 0, 'comments_received': 1, 'followers': 1},
+        )
+        self.assertEqual(body['series'][-1]['followers_gained'], 1)
+        self.assertEqual(body['series'][-1]['likes_received'], 0)
+        self.assertEqual(body['series'][-1]['posts'], 2)
+
+    def test_interrupted_post_deletion_takes_comments_back_once(self):
+        """A delete_posts run that fails midway can be run again without double counting."""
+        from unittest import mock
+        from posts import deletion
+        from posts.models import Comment, Post
+
+        post_id = self.engage()
+        self.client.post(f'/api/posts/{post_id}/comments/', {'content': 'again'})
+        purge = deletion.purge_notifications
+        calls = []
+
+        def fail_on_second_comment_chunk(model, object_ids):
+            if model is Comment:
+                calls.append(object_ids)
+                if len(calls) == 2:
+                    raise RuntimeError('interrupted')
+            return purge(model, object_ids)
+
+        posts = Post.objects.filter(pk=post_id)
+        with mock.patch.object(deletion, 'purge_notifications', fail_on_second_comment_chunk):
+            with self.assertRaises(RuntimeError):
+                deletion.delete_posts(posts, chunk_size=1)
+        self.assertEqual(Comment.objects.count(), 1)
+        deletion.delete_posts(posts)
+
+        body = self.client.get(self.url).json()
+        self.assertEqual(
+            body['totals'],
+            {'posts': 0, 'likes_received': 0, 'comments_received': 0, 'followers': 1},
+        )
@@ -6,6 +6,7 @@ from .views import (
     ProfileView,
     FollowView,
     UnfollowView,
+    UserStatsView,
 )
 
 urlpatterns = [
@@ -15,4 +16,5 @@ urlpatterns = [
     path('profile/', ProfileView.as_view(), name='profile'),
     path('follow/<int:user_id>/', FollowView.as_view(), name='follow'),
     path('unfollow/<int:user_id>/', UnfollowView.as_view(), name='unfollow'),
+    path('<int:user_id>/stats/', UserStatsView.as_view(), name='user-stats'),
 ]
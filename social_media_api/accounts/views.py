@@ -1,17 +1,24 @@
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, generics, permissions
 from rest_framework.authtoken.models import Token
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth import get_user_model
 
 CustomUser = get_user_model()
 
+from . import stats
+from .images import PIPELINE_RE, VARIANT_RE, schedule_avatar
 from .serializers import UserSerializer, UserProfileSerializer
 from notifications.models import Notification
+from social_media_api.throttling import LoginThrottle
 
 
 class RegisterView(APIView):
@@ -20,6 +27,8 @@ class RegisterView(APIView):
     Body: { "username": "...", "password": "...", "email": "..." }
     Returns a token on success.
     """
+    permission_classes = [AllowAny]
+
     def post(self, request):
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
@@ -40,7 +49,11 @@ class LoginView(APIView):
     POST /api/accounts/login/
     Body: { "username": "...", "password": "..." }
     Returns a token on success.
+    Throttled per IP and per username (see LoginThrottle).
     """
+    permission_classes = [AllowAny]
+    throttle_classes = [LoginThrottle]
+
     def post(self, request):
         username = request.data.get('username')
         password = request.data.get('password')
@@ -83,6 +96,9 @@ class ProfileView(APIView):
     GET  /api/accounts/profile/  – retrieve the authenticated user's profile.
     PUT  /api/accounts/profile/  – update bio / profile_picture.
     Requires: Authorization: Token <token>
+
+    A new profile_picture is resized in the background (accounts.images);
+    the profile switches to it once its variants are ready.
     """
     permission_classes = [IsAuthenticated]
 
@@ -95,17 +111,36 @@ class ProfileView(APIView):
             request.user.profile, data=request.data, partial=True
         )
         if serializer.is_valid():
-            serializer.save()
+            upload = serializer.validated_data.pop('profile_picture', None)
+            profile = serializer.save()
+            if upload is not None:
+                schedule_avatar(profile, upload)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def serve_avatar(request, path):
+    """
+    Serve a file under MEDIA_ROOT (development only, see the project urls).
+    Processed profile pictures live at content-addressed paths, so they get a
+    one-year immutable cache header; nothing else in those directories (the
+    raw upload awaiting processing) is ever served.
+    """
+    if PIPELINE_RE.match(path) and not VARIANT_RE.match(path):
+        raise Http404
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if VARIANT_RE.match(path):
+        patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+    return response
+
+
 class FollowView(APIView):
     """
     POST /api/accounts/follow/<user_id>/
     Follows the target user and creates a 'followed you' notification.
     """
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'follows'
 
     def post(self, request, user_id):
         target_user = get_object_or_404(User, pk=user_id)
@@ -126,6 +161,7 @@ class FollowView(APIView):
             )
 
         profile.followers.add(request.user)
+        stats.record_event(target_user.pk, 'follow')
 
         # Notify the followed user
         Notification.objects.create(
@@ -146,6 +182,7 @@ class UnfollowView(APIView):
     Unfollows the target user.
     """
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'follows'
 
     def post(self, request, user_id):
         target_user = get_object_or_404(User, pk=user_id)
@@ -164,12 +201,34 @@ class UnfollowView(APIView):
             )
 
         profile.followers.remove(request.user)
+        stats.record_event(target_user.pk, 'unfollow')
         return Response(
             {'detail': f'You have unfollowed {target_user.username}.'},
             status=status.HTTP_200_OK,
         )
 
 
+class UserStatsView(APIView):
+    """
+    GET /api/accounts/<user_id>/stats/?days=<n>
+    Engagement totals and a day-by-day series for the last n days
+    (default 30, max 365), read from the precomputed rollups in
+    accounts.stats.
+    """
+    permission_classes = [IsAuthenticated]
+    default_days = 30
+    max_days = 365
+
+    def get(self, request, user_id):
+        get_object_or_404(User.objects.only('pk'), pk=user_id)
+        try:
+            days = int(request.query_params.get('days', self.default_days))
+        except ValueError:
+            days = self.default_days
+        days = max(1, min(days, self.max_days))
+        return Response({'user': user_id, 'days': days, **stats.get_stats(user_id, days)})
+
+
 class UserListView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
     queryset = CustomUser.objects.all()
@@ -0,0 +1,25 @@
+"""
+Async (ASGI) variant of the notification list.
+
+GET /api/notifications/async/  – same as GET /api/notifications/ (Token auth)
+"""
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+
+from posts.models import Post, Comment
+from social_media_api.async_api import paginate, token_required
+from .models import Notification
+from .serializers import NotificationSerializer
+
+
+@token_required
+async def notification_list(request):
+    queryset = (
+        Notification.objects.filter(recipient=request.api_user)
+        .select_related('actor', 'recipient')
+        # target_str calls str(target), which reads the target's author
+        .prefetch_related(GenericPrefetch('target', [
+            Post.objects.select_related('author'),
+            Comment.objects.select_related('author', 'post'),
+        ]))
+    )
+    return await paginate(request, queryset, NotificationSerializer)
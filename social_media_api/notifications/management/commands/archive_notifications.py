@@ -0,0 +1,66 @@
+"""
+Management command to archive read notifications past their retention period.
+
+Rows are moved in chunks into the ArchivedNotification table, or appended to
+an NDJSON file with --to-file.  Retention comes from the
+NOTIFICATION_RETENTION_DAYS / NOTIFICATION_RETENTION_BY_VERB settings;
+--days overrides the default for verbs without an explicit policy.
+
+Intended to run from a scheduler (cron, Heroku Scheduler) once a day.
+
+Usage:
+    python manage.py archive_notifications [--days 90] [--to-file archive.ndjson]
+                                           [--chunk-size 1000] [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand
+
+from notifications.retention import CHUNK_SIZE, NDJSONWriter, archive_notifications
+
+
+class Command(BaseCommand):
+    help = 'Archives read notifications older than their retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Retention in days for verbs without a per-verb policy',
+        )
+        parser.add_argument(
+            '--to-file',
+            default=None,
+            help='Append archived rows to this NDJSON file instead of the archive table',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Rows moved per transaction (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many rows would be archived',
+        )
+
+    def handle(self, *args, **options):
+        kwargs = {
+            'default_days': options['days'],
+            'chunk_size': options['chunk_size'],
+            'dry_run': options['dry_run'],
+            'progress': lambda label, n: self.stdout.write(f'  {label}: {n}'),
+        }
+
+        if options['to_file']:
+            with open(options['to_file'], 'a', encoding='utf-8') as fp:
+                counts = archive_notifications(writer=NDJSONWriter(fp), **kwargs)
+        else:
+            counts = archive_notifications(**kwargs)
+
+        action = 'Would archive' if options['dry_run'] else 'Archived'
+        for label, count in counts.items():
+            verb = 'other verbs' if label == '*' else f"'{label}'"
+            self.stdout.write(f'{action} {count} notification(s) for {verb}')
+        self.stdout.write(self.style.SUCCESS(f'{action} {sum(counts.values())} notification(s) in total.'))
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('notifications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('recipient_id', models.BigIntegerField(db_index=True)),
+                ('actor_id', models.BigIntegerField()),
+                ('verb', models.CharField(max_length=255)),
+                ('content_type_id', models.IntegerField(blank=True, null=True)),
+                ('target_object_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('timestamp', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-timestamp'], name='notificatio_recipie_b8fa2a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['is_read', 'timestamp'], name='notificatio_is_read_585adf_idx'),
+        ),
+    ]
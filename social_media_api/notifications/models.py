@@ -25,6 +25,33 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # NotificationListView: recipient=... ORDER BY timestamp DESC
+            models.Index(fields=['recipient', '-timestamp']),
+            # archive_notifications: is_read AND timestamp < cutoff
+            models.Index(fields=['is_read', 'timestamp']),
+        ]
 
     def __str__(self):
         return f"{self.actor.username} {self.verb} → {self.recipient.username}"
+
+
+class ArchivedNotification(models.Model):
+    """
+    Compact copy of a notification moved out of the hot table by
+    ``manage.py archive_notifications``.
+
+    Users are stored as plain ids rather than foreign keys so that archived
+    rows add no cascade work when an account is deleted.
+    """
+    id = models.BigIntegerField(primary_key=True)   # id of the original Notification
+    recipient_id = models.BigIntegerField(db_index=True)
+    actor_id = models.BigIntegerField()
+    verb = models.CharField(max_length=255)
+    content_type_id = models.IntegerField(null=True, blank=True)
+    target_object_id = models.PositiveIntegerField(null=True, blank=True)
+    timestamp = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.id} {self.verb} (archived)"
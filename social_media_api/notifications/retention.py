@@ -0,0 +1,113 @@
+"""
+Retention policy for notifications.
+
+Read notifications older than their retention period are moved out of
+``notifications_notification`` in fixed-size chunks, either into the
+ArchivedNotification table or into an NDJSON file, so the table that
+NotificationListView queries on every request only holds recent rows.
+
+Retention is configured in settings:
+
+    NOTIFICATION_RETENTION_DAYS = 90              # default for every verb
+    NOTIFICATION_RETENTION_BY_VERB = {            # per-verb overrides
+        'liked your post': 30,
+        'followed you': None,                     # None = keep forever
+    }
+
+Unread notifications are never archived.
+"""
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Notification, ArchivedNotification
+
+CHUNK_SIZE = 1000
+
+ARCHIVE_FIELDS = [
+    'id', 'recipient_id', 'actor_id', 'verb',
+    'content_type_id', 'target_object_id', 'timestamp',
+]
+
+
+def get_policy():
+    """Return ``(default_days, {verb: days})`` from settings."""
+    default_days = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90)
+    by_verb = getattr(settings, 'NOTIFICATION_RETENTION_BY_VERB', {})
+    return default_days, dict(by_verb)
+
+
+def expired_querysets(now=None, default_days=None):
+    """
+    Yield ``(label, queryset)`` pairs of read notifications past retention,
+    one per verb override plus one for every other verb.
+    """
+    now = now or timezone.now()
+    policy_default, by_verb = get_policy()
+    if default_days is None:
+        default_days = policy_default
+
+    read = Notification.objects.filter(is_read=True)
+    for verb, days in by_verb.items():
+        if days is not None:
+            yield verb, read.filter(verb=verb, timestamp__lt=now - timedelta(days=days))
+    if default_days is not None:
+        yield '*', read.exclude(verb__in=list(by_verb)).filter(
+            timestamp__lt=now - timedelta(days=default_days)
+        )
+
+
+class TableWriter:
+    """Writes archived rows into the ArchivedNotification table."""
+
+    def write(self, rows):
+        ArchivedNotification.objects.bulk_create(
+            [ArchivedNotification(**row) for row in rows],
+            ignore_conflicts=True,
+        )
+
+
+class NDJSONWriter:
+    """Appends archived rows to an open text file, one JSON object per line."""
+
+    def __init__(self, fp):
+        self.fp = fp
+
+    def write(self, rows):
+        for row in rows:
+            row = dict(row, timestamp=row['timestamp'].isoformat())
+            self.fp.write(json.dumps(row) + '\n')
+        self.fp.flush()
+
+
+def archive_notifications(writer=None, now=None, default_days=None,
+                          chunk_size=CHUNK_SIZE, dry_run=False, progress=None):
+    """
+    Move expired notifications through ``writer`` (TableWriter by default)
+    and delete them from the hot table.  Returns ``{label: count}``.
+
+    Each chunk is written and deleted in its own transaction.
+    """
+    writer = writer or TableWriter()
+    counts = {}
+    for label, queryset in expired_querysets(now, default_days):
+        if dry_run:
+            counts[label] = queryset.count()
+            continue
+
+        total = 0
+        while True:
+            rows = list(queryset.order_by('pk').values(*ARCHIVE_FIELDS)[:chunk_size])
+            if not rows:
+                break
+            with transaction.atomic():
+                writer.write(rows)
+                Notification.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+            total += len(rows)
+            if progress:
+                progress(label, total)
+        counts[label] = total
+    return counts
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from social_media_api.serializers import memoize
 from .models import Notification
 
 
@@ -21,7 +23,15 @@ class NotificationSerializer(serializers.ModelSerializer):
         ]
 
     def get_target_str(self, obj):
-        """Human-readable representation of the target object."""
-        if obj.target:
-            return str(obj.target)
-        return None
+        """
+        Human-readable representation of the target object.  Many
+        notifications usually point at the same few posts, so each target
+        is rendered once per response.
+        """
+        if obj.target_object_id is None:
+            return None
+        return memoize(
+            self,
+            (obj.content_type_id, obj.target_object_id),
+            lambda: str(obj.target) if obj.target else None,
+        )
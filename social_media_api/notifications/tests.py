@@ -1,3 +1,116 @@
-from django.test import TestCase
+import io
+import json
+from datetime import timedelta
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from posts.models import Post
+
+from .models import Notification, ArchivedNotification
+from .retention import NDJSONWriter, archive_notifications
+
+
+@override_settings(
+    NOTIFICATION_RETENTION_DAYS=90,
+    NOTIFICATION_RETENTION_BY_VERB={'liked your post': 30, 'followed you': None},
+)
+class ArchiveNotificationsTests(TestCase):
+    """Tests for the notification retention policy."""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='pass12345')
+        self.bob = User.objects.create_user(username='bob', password='pass12345')
+
+    def make(self, verb, age_days, is_read=True):
+        notification = Notification.objects.create(
+            recipient=self.alice, actor=self.bob, verb=verb, is_read=is_read,
+        )
+        # timestamp is auto_now_add, so backdate it with an update
+        Notification.objects.filter(pk=notification.pk).update(
+            timestamp=timezone.now() - timedelta(days=age_days)
+        )
+        return notification
+
+    def test_per_verb_retention(self):
+        """Overrides apply per verb; None keeps a verb forever; unread rows stay."""
+        expired_like = self.make('liked your post', 40)
+        self.make('liked your post', 10)
+        self.make('commented on your post', 40)
+        expired_comment = self.make('commented on your post', 100)
+        self.make('followed you', 400)
+        self.make('commented on your post', 100, is_read=False)
+
+        counts = archive_notifications(chunk_size=1)
+
+        self.assertEqual(counts, {'liked your post': 1, '*': 1})
+        self.assertEqual(
+            set(ArchivedNotification.objects.values_list('id', flat=True)),
+            {expired_like.pk, expired_comment.pk},
+        )
+        self.assertEqual(Notification.objects.count(), 4)
+
+    def test_ndjson_writer(self):
+        """Rows can be archived to an NDJSON stream instead of the table."""
+        expired = self.make('liked your post', 40)
+        fp = io.StringIO()
+        archive_notifications(writer=NDJSONWriter(fp))
+        rows = [json.loads(line) for line in fp.getvalue().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [expired.pk])
+        self.assertFalse(ArchivedNotification.objects.exists())
+        self.assertFalse(Notification.objects.filter(pk=expired.pk).exists())
+
+
+class AsyncNotificationListTests(TestCase):
+    """GET /api/notifications/async/ renders targets without per-row queries."""
+
+    def test_targets_are_prefetched(self):
+        alice = User.objects.create_user(username='alice', password='pass12345')
+        bob = User.objects.create_user(username='bob', password='pass12345')
+        token = Token.objects.create(user=alice)
+        post = Post.objects.create(author=alice, title='Hello', content='...')
+        for _ in range(3):
+            Notification.objects.create(
+                recipient=alice, actor=bob, verb='liked your post',
+                content_type=ContentType.objects.get_for_model(post),
+                target_object_id=post.pk,
+            )
+
+        response = async_to_sync(self.async_client.get)(
+            '/api/notifications/async/', headers={'Authorization': f'Token {token.key}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 3)
+        self.assertEqual(
+            {n['target_str'] for n in response.json()['results']}, {'Hello by alice'}
+        )
+
+
+class NotificationListTests(TestCase):
+    """GET /api/notifications/ renders repeated targets once."""
+
+    def test_repeated_targets(self):
+        alice = User.objects.create_user(username='alice', password='pass12345')
+        post = Post.objects.create(author=alice, title='Hello', content='...')
+        for i in range(5):
+            actor = User.objects.create_user(username=f'fan{i}', password='pass12345')
+            Notification.objects.create(
+                recipient=alice, actor=actor, verb='liked your post',
+                content_type=ContentType.objects.get_for_model(post),
+                target_object_id=post.pk,
+            )
+        token = Token.objects.create(user=alice)
+
+        # token + user, count, notifications, targets (one per content type)
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                '/api/notifications/', headers={'Authorization': f'Token {token.key}'}
+            )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(len(results), 5)
+        self.assertEqual({n['target_str'] for n in results}, {'Hello by alice'})
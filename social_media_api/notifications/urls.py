@@ -4,9 +4,11 @@ from .views import (
     MarkNotificationReadView,
     MarkAllReadView,
 )
+from . import async_views
 
 urlpatterns = [
     path('', NotificationListView.as_view(), name='notification-list'),
     path('read-all/', MarkAllReadView.as_view(), name='notification-read-all'),
     path('<int:pk>/read/', MarkNotificationReadView.as_view(), name='notification-read'),
+    path('async/', async_views.notification_list, name='notification-list-async'),
 ]
@@ -1,13 +1,16 @@
+from django.contrib.contenttypes.prefetch import GenericPrefetch
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from posts.models import Post, Comment
+from social_media_api.db_router import ReplicaReadMixin
 from .models import Notification
 from .serializers import NotificationSerializer
 
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(ReplicaReadMixin, generics.ListAPIView):
     """
     GET /api/notifications/
     Returns all notifications for the authenticated user, newest first.
@@ -17,9 +20,15 @@ class NotificationListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Notification.objects.filter(
-            recipient=self.request.user
-        ).select_related('actor', 'recipient')
+        return (
+            Notification.objects.filter(recipient=self.request.user)
+            .select_related('actor', 'recipient')
+            # target_str calls str(target), which reads the target's author
+            .prefetch_related(GenericPrefetch('target', [
+                Post.objects.select_related('author'),
+                Comment.objects.select_related('author', 'post'),
+            ]))
+        )
 
 
 class MarkNotificationReadView(APIView):
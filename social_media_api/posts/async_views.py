@@ -0,0 +1,45 @@
+"""
+Async (ASGI) variants of the read-heavy post endpoints.
+
+GET /api/async/posts/          – same as GET /api/posts/ (newest first)
+GET /api/async/posts/<id>/     – same as GET /api/posts/<id>/
+GET /api/async/feed/           – same as GET /api/feed/ (Token auth)
+
+See social_media_api/async_api.py for how these relate to the DRF views.
+"""
+from django.db.models import Count
+from django.http import JsonResponse
+
+from social_media_api.async_api import paginate, token_required
+from .models import Post
+from .serializers import PostSerializer, comment_preview
+
+
+def rendered_posts():
+    """Posts with everything PostSerializer reads loaded in three queries."""
+    return (
+        Post.objects.select_related('author')
+        .annotate(num_likes=Count('likes'))
+        .prefetch_related(comment_preview())
+        .order_by('-created_at')
+    )
+
+
+async def post_list(request):
+    return await paginate(request, rendered_posts(), PostSerializer)
+
+
+async def post_detail(request, pk):
+    try:
+        post = await rendered_posts().aget(pk=pk)
+    except Post.DoesNotExist:
+        return JsonResponse({'detail': 'No Post matches the given query.'}, status=404)
+    return JsonResponse(PostSerializer(post).data)
+
+
+@token_required
+async def feed(request):
+    following_users = request.api_user.following.all().values_list('user', flat=True)
+    return await paginate(
+        request, rendered_posts().filter(author__in=following_users), PostSerializer
+    )
@@ -0,0 +1,57 @@
+"""
+Arithmetic for the time-decayed trending score (see posts/trending.py).
+
+A post's engagement score at time t is
+
+    score(t) = sum(weight_i * 2 ** -((t - t_i) / HALF_LIFE))
+
+Every contribution decays by the same factor, so the *order* of posts never
+changes between events.  We therefore store
+
+    log2(sum(weight_i * 2 ** ((t_i - EPOCH) / HALF_LIFE)))
+
+which only changes when an event happens, and apply the decay lazily when a
+score is displayed (decayed_score()).  Working in log2 space keeps the
+numbers small no matter how far t is from EPOCH.
+"""
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+HALF_LIFE = timedelta(hours=getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 12))
+
+
+def exponent(at):
+    """Number of half-lives between EPOCH and ``at``."""
+    return (at - EPOCH).total_seconds() / HALF_LIFE.total_seconds()
+
+
+def contribution(weight, at):
+    """log2 of ``weight`` units of engagement happening at ``at``."""
+    return math.log2(weight) + exponent(at)
+
+
+def log2_add(a, b):
+    """log2(2**a + 2**b) without overflowing."""
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def log2_sub(a, b, floor):
+    """log2(2**a - 2**b), never going below ``floor``."""
+    if b >= a:
+        return floor
+    return max(a + math.log2(1 - 2 ** (b - a)), floor)
+
+
+def initial_score():
+    """Stored score of a post that was just created (weight 1, now)."""
+    return exponent(timezone.now())
+
+
+def decayed_score(stored, now=None):
+    """The stored score as an engagement value decayed to ``now``."""
+    return 2 ** (stored - exponent(now or timezone.now()))
@@ -0,0 +1,179 @@
+"""
+Chunked deletion for posts, comments and likes.
+
+Post.delete() runs Django's Python-side collector, which loads every row it
+cascades through, and it leaves Notification rows behind because they point
+at their target through a GenericForeignKey.  The helpers below delete
+bottom-up in fixed-size chunks instead: leaf tables (Like, Comment,
+PostHashtag, Mention, Notification) have no dependents of their own, so each
+chunk turns into a few plain DELETE ... WHERE id IN (...) statements and nothing is loaded into
+memory beyond a list of primary keys.
+
+Comments are the exception: replies cascade from their parent through a
+self-referencing key, which the collector would follow one level per query.
+Each chunk is therefore widened up front with the reply subtrees of its
+comments (one prefix match on Comment.path per comment that has replies) and
+deleted deepest first, at most ``chunk_size`` rows per statement, so by the
+time the collector looks for replies it finds nothing new.
+
+Whatever a deleted row contributed - its author's stats, the post's
+counters and trending score - is taken back in the same transaction as the
+DELETE, so an interrupted run can be restarted without counting anything
+twice.
+"""
+from collections import Counter, defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from accounts import stats as user_stats
+from notifications.models import Notification
+from .models import Post, Comment, Like, Mention, PostHashtag
+from .trending import remove_events
+
+CHUNK_SIZE = 1000
+
+
+def pk_chunks(queryset, chunk_size):
+    """
+    Yield lists of primary keys from ``queryset`` until it is exhausted.
+    The caller must delete each chunk before asking for the next one.
+    """
+    while True:
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            return
+        yield pks
+
+
+def purge_notifications(model, object_ids):
+    """Delete notifications whose generic target is one of ``object_ids``."""
+    content_type = ContentType.objects.get_for_model(model)
+    deleted, _ = Notification.objects.filter(
+        content_type=content_type, target_object_id__in=object_ids
+    ).delete()
+    return deleted
+
+
+def with_replies(pks):
+    """
+    ``pks`` plus the ids of every reply below those comments, deepest first
+    (so deleting them in that order never cascades).
+    """
+    prefixes = [
+        comment.subtree_prefix
+        for comment in Comment.objects.filter(pk__in=pks, reply_count__gt=0).only('pk', 'path')
+    ]
+    if not prefixes:
+        return pks
+    below = Q()
+    for prefix in prefixes:
+        below |= Q(path__startswith=prefix)
+    return list(
+        Comment.objects.filter(Q(pk__in=pks) | below)
+        .order_by('-depth', 'pk')
+        .values_list('pk', flat=True)
+    )
+
+
+def take_back_trending(kind, queryset):
+    """remove_events() for the rows in ``queryset``, one write per post."""
+    times = defaultdict(list)
+    for post_id, at in queryset.values_list('post_id', 'created_at'):
+        times[post_id].append(at)
+    for post_id, at in times.items():
+        remove_events(post_id, kind, at)
+
+
+def delete_comments(queryset, chunk_size=CHUNK_SIZE, progress=None, update_counts=True):
+    """
+    Delete the comments in ``queryset``, the replies below them and the
+    notifications about all of those, taking them back from the post
+    authors' stats.  Post.comments_count, Post.top_level_comments_count,
+    the parents' reply_count and the posts' trending scores are updated
+    too, unless ``update_counts`` is False (delete_posts passes False, since
+    the posts are going away as well).
+    """
+    total = 0
+    for pks in pk_chunks(queryset, chunk_size):
+        with transaction.atomic():
+            widened = with_replies(pks)
+            if update_counts:
+                # Only the chunk's own comments can have a parent outside it.
+                members = set(widened)
+                lost_replies = Counter(
+                    parent_id
+                    for parent_id in Comment.objects.filter(pk__in=pks, parent__isnull=False)
+                    .values_list('parent_id', flat=True)
+                    if parent_id not in members
+                )
+                for parent_id, n in lost_replies.items():
+                    Comment.objects.filter(pk=parent_id).update(
+                        reply_count=F('reply_count') - n
+                    )
+            for start in range(0, len(widened), chunk_size):
+                batch = widened[start:start + chunk_size]
+                purge_notifications(Comment, batch)
+                comments = Comment.objects.filter(pk__in=batch).order_by()
+                user_stats.take_back('comment', comments, 'post__author_id')
+                if update_counts:
+                    per_post = comments.values_list('post_id').annotate(
+                        n=Count('pk'), top_level=Count('pk', filter=Q(depth=0))
+                    )
+                    for post_id, n, top_level in per_post:
+                        Post.objects.filter(pk=post_id).update(
+                            comments_count=F('comments_count') - n,
+                            top_level_comments_count=F('top_level_comments_count') - top_level,
+                        )
+                    take_back_trending('comment', comments)
+                comments.delete()
+        total += len(widened)
+        if progress:
+            progress('comments', total)
+    return total
+
+
+def delete_likes(queryset, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Delete the likes in ``queryset`` (say everything an account liked),
+    taking each back from its post's trending score and author's stats.
+    """
+    total = 0
+    for pks in pk_chunks(queryset, chunk_size):
+        with transaction.atomic():
+            likes = Like.objects.filter(pk__in=pks).order_by()
+            user_stats.take_back('like', likes, 'post__author_id')
+            take_back_trending('like', likes)
+            likes.delete()
+        total += len(pks)
+        if progress:
+            progress('likes', total)
+    return total
+
+
+def delete_posts(queryset, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Delete the posts in ``queryset`` together with their comments, likes and
+    any notifications that point at them.
+
+    ``progress`` is an optional callable receiving ``(stage, count)`` after
+    every chunk, where ``count`` is the running total for that stage.
+    """
+    total = 0
+    for pks in pk_chunks(queryset, chunk_size):
+        delete_comments(
+            Comment.objects.filter(post_id__in=pks), chunk_size, update_counts=False
+        )
+        with transaction.atomic():
+            user_stats.take_back('post', Post.objects.filter(pk__in=pks), 'author_id')
+            user_stats.take_back('like', Like.objects.filter(post_id__in=pks), 'post__author_id')
+            Like.objects.filter(post_id__in=pks).delete()
+            PostHashtag.objects.filter(post_id__in=pks).delete()
+            Mention.objects.filter(post_id__in=pks).delete()
+            purge_notifications(Post, pks)
+            Post.objects.filter(pk__in=pks).delete()
+        total += len(pks)
+        if progress:
+            progress('posts', total)
+    return total
@@ -0,0 +1,100 @@
+"""
+Management command to measure database connection churn and per-request
+latency under concurrency, without an HTTP server in the way.
+
+Each worker thread plays gunicorn's role: it fires request_started, runs a
+small feed-sized query, and fires request_finished, exactly as Django does
+around a real request, so CONN_MAX_AGE, CONN_HEALTH_CHECKS and the psycopg
+pool all behave as they would in production.
+
+Connections are counted as the distinct driver connections the requests
+ran on (kept referenced until the end, so none is mistaken for another),
+not with the connection_created signal: Django sends that on every pool
+checkout, so the pooled strategy would look like one connection per
+request. With DB_POOL=django the pool's own count (get_stats()) is
+reported as well.
+
+Compare the connection strategies in settings_production.py:
+
+    DB_CONN_MAX_AGE=0 python manage.py dbconn_bench -c 32 -n 5000      # connect per request
+    DB_POOL=persistent python manage.py dbconn_bench -c 32 -n 5000
+    DB_POOL=django DB_POOL_MAX_SIZE=16 python manage.py dbconn_bench -c 32 -n 5000
+    DB_POOL=pgbouncer DATABASE_URL=postgres://...:6432/... python manage.py dbconn_bench -c 32 -n 5000
+
+(with DJANGO_SETTINGS_MODULE=social_media_api.settings_production).
+"""
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Simulates concurrent requests and reports DB connections opened and latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-c', '--concurrency', type=int, default=16,
+                            help='Worker threads (default: %(default)s)')
+        parser.add_argument('-n', '--requests', type=int, default=1000,
+                            help='Total simulated requests (default: %(default)s)')
+        parser.add_argument('--database', default='default',
+                            help='Database alias to query (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        lock = threading.Lock()
+        # Driver-level connections seen; holding them keeps id()s unique.
+        opened = set()
+
+        def simulate(_):
+            start = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            try:
+                list(
+                    Post.objects.using(alias)
+                    .order_by('-created_at')
+                    .values_list('pk', 'title')[:10]
+                )
+                raw = connections[alias].connection
+                with lock:
+                    opened.add(raw)
+            finally:
+                request_finished.send(sender=self.__class__)
+            return time.perf_counter() - start
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            latencies = sorted(pool.map(simulate, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        settings_dict = connections[alias].settings_dict
+        pool_options = settings_dict.get('OPTIONS', {}).get('pool')
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        self.stdout.write(f"Database:     {alias} ({settings_dict['ENGINE'].rsplit('.', 1)[-1]})")
+        if pool_options:
+            strategy = f'psycopg pool {pool_options}'
+        else:
+            strategy = f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}"
+        self.stdout.write(f'Strategy:     {strategy}')
+        self.stdout.write(f"Concurrency:  {options['concurrency']}")
+        self.stdout.write(f'Requests:     {len(latencies)}')
+        self.stdout.write(
+            f'Connections:  {len(opened)} opened '
+            f'({len(opened) / len(latencies) * 1000:.1f} per 1000 requests)'
+        )
+        if pool_options:
+            stats = connections[alias].pool.get_stats()
+            self.stdout.write(
+                f"Pool:         {stats.get('connections_num', 0)} connections made, "
+                f"{stats.get('pool_size', 0)} open"
+            )
+        self.stdout.write(f'Throughput:   {len(latencies) / elapsed:.1f} req/s')
+        self.stdout.write(f'Latency p50:  {statistics.median(latencies) * 1000:.2f} ms')
+        self.stdout.write(f'Latency p95:  {p95 * 1000:.2f} ms')
+        self.stdout.write(f'Latency max:  {latencies[-1] * 1000:.2f} ms')
@@ -0,0 +1,73 @@
+"""
+Management command to measure throughput and latency of an HTTP endpoint
+under concurrent connections.
+
+Used to compare deployments, e.g. the DRF (WSGI) feed against its async
+(ASGI) variant:
+
+    gunicorn social_media_api.wsgi -w 4 -b :8000
+    gunicorn social_media_api.asgi -w 4 -k uvicorn_worker.UvicornWorker -b :8001
+
+    python manage.py loadtest http://localhost:8000/api/feed/ -c 64 -n 5000 --token <key>
+    python manage.py loadtest http://localhost:8001/api/async/feed/ -c 64 -n 5000 --token <key>
+
+The client uses plain threads and urllib so it adds no dependencies; run it
+from a separate machine (or at least a separate process) from the server.
+"""
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Fires concurrent GET requests at a URL and reports throughput and latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('-c', '--concurrency', type=int, default=32,
+                            help='Concurrent connections (default: %(default)s)')
+        parser.add_argument('-n', '--requests', type=int, default=1000,
+                            help='Total requests (default: %(default)s)')
+        parser.add_argument('--token', default=None,
+                            help='Send Authorization: Token <token>')
+        parser.add_argument('--timeout', type=float, default=30,
+                            help='Per-request timeout in seconds (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options['token']:
+            headers['Authorization'] = f"Token {options['token']}"
+
+        def fetch(_):
+            request = urllib.request.Request(options['url'], headers=headers)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=options['timeout']) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as exc:
+                status = exc.code
+            except OSError:
+                status = None
+            return status, time.perf_counter() - start
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(fetch, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for status, latency in results if status == 200)
+        failures = len(results) - len(latencies)
+        self.stdout.write(f"URL:          {options['url']}")
+        self.stdout.write(f"Concurrency:  {options['concurrency']}")
+        self.stdout.write(f'Requests:     {len(results)} ({failures} failed)')
+        self.stdout.write(f'Throughput:   {len(latencies) / elapsed:.1f} req/s')
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(f'Latency p50:  {statistics.median(latencies) * 1000:.1f} ms')
+            self.stdout.write(f'Latency p95:  {p95 * 1000:.1f} ms')
+            self.stdout.write(f'Latency max:  {latencies[-1] * 1000:.1f} ms')
@@ -0,0 +1,44 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:31
+
+import posts.decay
+from django.db import migrations, models
+
+
+def backfill_trending_score(apps, schema_editor):
+    """Replay existing likes and comments into the new score column."""
+    from posts.decay import contribution, exponent, log2_add
+    from posts.trending import WEIGHTS
+
+    Post = apps.get_model('posts', 'Post')
+    Like = apps.get_model('posts', 'Like')
+    Comment = apps.get_model('posts', 'Comment')
+
+    batch = []
+    for post in Post.objects.only('pk', 'created_at').iterator(chunk_size=1000):
+        score = exponent(post.created_at)
+        for at in Like.objects.filter(post_id=post.pk).values_list('created_at', flat=True):
+            score = log2_add(score, contribution(WEIGHTS['like'], at))
+        for at in Comment.objects.filter(post_id=post.pk).values_list('created_at', flat=True):
+            score = log2_add(score, contribution(WEIGHTS['comment'], at))
+        post.trending_score = score
+        batch.append(post)
+        if len(batch) >= 1000:
+            Post.objects.bulk_update(batch, ['trending_score'])
+            batch = []
+    Post.objects.bulk_update(batch, ['trending_score'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='trending_score',
+            field=models.FloatField(db_index=True, default=posts.decay.initial_score),
+        ),
+        migrations.RunPython(backfill_trending_score, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_tags(apps, schema_editor):
+    """Index existing posts.  No notifications for old mentions."""
+    from posts.tagging import parse
+
+    Post = apps.get_model('posts', 'Post')
+    Hashtag = apps.get_model('posts', 'Hashtag')
+    PostHashtag = apps.get_model('posts', 'PostHashtag')
+    Mention = apps.get_model('posts', 'Mention')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    posts = Post.objects.only('pk', 'content', 'created_at').iterator(chunk_size=1000)
+    for post in posts:
+        tags, usernames = parse(post.content)
+        if tags:
+            Hashtag.objects.bulk_create([Hashtag(name=t) for t in tags], ignore_conflicts=True)
+            PostHashtag.objects.bulk_create([
+                PostHashtag(post_id=post.pk, hashtag_id=pk, created_at=post.created_at)
+                for pk in Hashtag.objects.filter(name__in=tags).values_list('pk', flat=True)
+            ])
+        if usernames:
+            Mention.objects.bulk_create([
+                Mention(post_id=post.pk, user_id=pk, created_at=post.created_at)
+                for pk in User.objects.filter(username__in=usernames).values_list('pk', flat=True)
+            ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_comment_replies'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Hashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Mention',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mention_links', to='posts.post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mention_links', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='mentions',
+            field=models.ManyToManyField(blank=True, related_name='mentioned_in', through='posts.Mention', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='PostHashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_links', to='posts.hashtag')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hashtag_links', to='posts.post')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='hashtags',
+            field=models.ManyToManyField(blank=True, related_name='posts', through='posts.PostHashtag', to='posts.hashtag'),
+        ),
+        migrations.AddIndex(
+            model_name='mention',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='mention_user_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='mention',
+            constraint=models.UniqueConstraint(fields=('post', 'user'), name='unique_post_mention'),
+        ),
+        migrations.AddIndex(
+            model_name='posthashtag',
+            index=models.Index(fields=['hashtag', '-created_at', '-id'], name='posthashtag_tag_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='posthashtag',
+            constraint=models.UniqueConstraint(fields=('post', 'hashtag'), name='unique_post_hashtag'),
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('posts', '0005_hashtags_mentions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedAffinity',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_affinity', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('author_ids', models.JSONField(default=list)),
+                ('weights', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:42
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_top_level_comments_count(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    counts = (
+        Comment.objects.filter(post_id=OuterRef('pk'), depth=0)
+        .order_by()
+        .values('post_id')
+        .annotate(n=Count('pk'))
+        .values('n')
+    )
+    Post.objects.update(top_level_comments_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_feedaffinity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='top_level_comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_top_level_comments_count, migrations.RunPython.noop),
+    ]
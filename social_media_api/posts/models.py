@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from .decay import initial_score
+
 
 class Post(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
@@ -8,6 +10,20 @@ class Post(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # log2 time-decayed engagement, maintained by posts.trending.record_event
+    trending_score = models.FloatField(default=initial_score, db_index=True)
+    # Denormalized Comment count, kept in step by the comment views and
+    # posts.deletion so listings never run COUNT(*) over a large thread.
+    comments_count = models.PositiveIntegerField(default=0)
+    # Of those, the ones that aren't replies: the total of the comment listing
+    top_level_comments_count = models.PositiveIntegerField(default=0)
+    # Extracted from content on every write by posts.tagging.sync_tags
+    hashtags = models.ManyToManyField(
+        'Hashtag', through='PostHashtag', related_name='posts', blank=True
+    )
+    mentions = models.ManyToManyField(
+        User, through='Mention', related_name='mentioned_in', blank=True
+    )
 
     class Meta:
         ordering = ['-created_at']
@@ -16,19 +32,48 @@ class Post(models.Model):
         return f"{self.title} by {self.author.username}"
 
 
+PATH_STEP = 10            # digits per id in Comment.path
+MAX_COMMENT_DEPTH = 20    # replies nest at most this many levels
+
+
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
+    parent = models.ForeignKey(
+        'self', null=True, blank=True, on_delete=models.CASCADE, related_name='replies'
+    )
+    # Materialized path of the ancestors, root first, each id zero-padded
+    # and '/'-terminated: '0000000012/0000000034/'.  Empty for top-level
+    # comments.  A whole subtree is one indexed prefix match on
+    # subtree_prefix, and depth bounds how far down it goes.
+    path = models.CharField(
+        max_length=(PATH_STEP + 1) * MAX_COMMENT_DEPTH,
+        blank=True, default='', editable=False, db_index=True,
+    )
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Direct replies, kept in step by CommentViewSet and posts.deletion
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Keyset pagination of a post's top-level comments (posts.pagination)
+            models.Index(
+                fields=['post', 'depth', 'created_at', 'id'], name='comment_post_depth_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author.username} on '{self.post.title}'"
 
+    @property
+    def subtree_prefix(self):
+        """Path shared by every reply below this comment."""
+        return f'{self.path}{self.pk:0{PATH_STEP}d}/'
+
 
 class Like(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='likes')
@@ -40,3 +85,55 @@ class Like(models.Model):
 
     def __str__(self):
         return f"{self.user.username} likes '{self.post.title}'"
+
+
+class FeedAffinity(models.Model):
+    # How much the user engages with other authors' posts, precomputed by
+    # `manage.py compute_feed_affinity` for the ranked feed (posts.ranking):
+    # author ids in ascending order and their log1p weights, index-aligned.
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='feed_affinity'
+    )
+    author_ids = models.JSONField(default=list)
+    weights = models.JSONField(default=list)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Feed affinity of user {self.user_id}"
+
+
+class Hashtag(models.Model):
+    name = models.CharField(max_length=100, unique=True)   # lowercased, without '#'
+
+    def __str__(self):
+        return f"#{self.name}"
+
+
+class PostHashtag(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='hashtag_links')
+    hashtag = models.ForeignKey(Hashtag, on_delete=models.CASCADE, related_name='post_links')
+    # Copy of post.created_at so a tag's posts page straight off the index
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'hashtag'], name='unique_post_hashtag'),
+        ]
+        indexes = [
+            models.Index(fields=['hashtag', '-created_at', '-id'], name='posthashtag_tag_created_idx'),
+        ]
+
+
+class Mention(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='mention_links')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mention_links')
+    # Copy of post.created_at so a user's mentions page straight off the index
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'user'], name='unique_post_mention'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='mention_user_created_idx'),
+        ]
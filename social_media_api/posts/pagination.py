@@ -0,0 +1,161 @@
+"""
+Keyset (seek) pagination.
+
+Page-number pagination makes the database count and skip every row before
+the requested page, so deep pages of a large thread get slower and slower,
+and rows inserted while a client is paging shift everything by one.  A
+keyset page instead starts right after the last row the client saw:
+
+    WHERE (created_at, id) > (<cursor created_at>, <cursor id>)
+    ORDER BY created_at, id
+    LIMIT page_size + 1
+
+which is a range scan on an index over (<parent>, created_at, id), however
+deep the page.  The cursor is opaque to clients.
+
+Responses look like:
+
+    {
+        "count":   1234,        # from a denormalized counter, not COUNT(*)
+        "next":    "...",       # next page, or null when caught up
+        "newer":   "...",       # always set; poll it for rows added later
+        "results": [...]
+    }
+
+``newer`` points past the most recent row the client has seen, so a client
+following a live listing keeps polling it and only ever receives new rows.
+Oldest-first listings (comments) read forward, so it is simply the cursor
+after the last row of the page.  Newest-first listings (hashtags, mentions)
+have the most recent row at the top: their ``newer`` cursor is built from
+the first row and flagged to scan the other way, returning the rows just
+above it (still shown newest first, and without a ``next`` link, since
+everything below them has been seen).  An empty page keeps the request's
+cursor, or the first page when there is nothing to anchor on.
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over ``(field, id)``.  ``ordering`` is ``field`` for
+    oldest-first or ``-field`` for newest-first.  The total comes from
+    ``view.get_total_count()`` when the view defines it and it isn't None.
+    """
+    ordering = 'created_at'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.view = view
+        field = self.ordering.lstrip('-')
+        descending = self.ordering.startswith('-')
+        page_size = self.get_page_size(request)
+
+        self.cursor = request.query_params.get(self.cursor_query_param)
+        self.newer = False
+        if self.cursor:
+            value, pk, self.newer = self.decode_cursor(self.cursor)
+        # A newer cursor on a newest-first listing scans towards recent rows.
+        self.upwards = descending and self.newer
+        scan_descending = descending and not self.upwards
+        if self.cursor:
+            op = 'lt' if scan_descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'pk__{op}': pk})
+            )
+
+        order = [f'-{field}', '-pk'] if scan_descending else [field, 'pk']
+        rows = list(queryset.order_by(*order)[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        if self.upwards:
+            self.page.reverse()
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, obj, newer=False):
+        field = self.ordering.lstrip('-')
+        raw = f'{getattr(obj, field).isoformat()}|{obj.pk}'
+        if newer:
+            raw += '|newer'
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """(value, pk, newer) from a cursor made by encode_cursor()."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            value, pk, *flag = raw.split('|')
+            if flag not in ([], ['newer']):
+                raise ValueError(raw)
+            return datetime.fromisoformat(value), int(pk), bool(flag)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def newer_cursor(self):
+        """Cursor for rows added after everything the client has seen so far."""
+        if not self.ordering.startswith('-'):
+            return self.encode_cursor(self.page[-1]) if self.page else self.cursor
+        if self.page:
+            return self.encode_cursor(self.page[0], newer=True)
+        return self.cursor if self.newer else None
+
+    def cursor_url(self, cursor):
+        url = self.request.build_absolute_uri()
+        if cursor is None:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        payload = {}
+        get_total_count = getattr(self.view, 'get_total_count', None)
+        count = get_total_count() if get_total_count is not None else None
+        if count is not None:
+            payload['count'] = count
+        if self.has_next and not self.upwards:
+            payload['next'] = self.cursor_url(self.encode_cursor(self.page[-1]))
+        else:
+            payload['next'] = None
+        payload['newer'] = self.cursor_url(self.newer_cursor())
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['next', 'newer', 'results'],
+            'properties': {
+                'count': {'type': 'integer'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'newer': {'type': 'string', 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class CommentPagination(KeysetPagination):
+    """Comments on a post, oldest first (the thread reading order)."""
+    ordering = 'created_at'
+    page_size = 20
+
+
+class TaggedPostPagination(KeysetPagination):
+    """PostHashtag / Mention rows, newest post first."""
+    ordering = '-created_at'
+    page_size = 10
@@ -11,4 +11,5 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
         # SAFE_METHODS: GET, HEAD, OPTIONS
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.author == request.user
+        # Compare keys so the author row is never loaded just for this.
+        return obj.author_id == request.user.pk
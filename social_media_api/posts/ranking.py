@@ -0,0 +1,190 @@
+"""
+Ranked feed (GET /api/feed/?mode=ranked).
+
+1. Candidates: the FEED_CANDIDATES most recent posts from followed authors
+   (no older than FEED_CANDIDATE_DAYS) plus the cached trending posts.
+   Their features are read in one query into NumPy columns (Candidates).
+2. Scoring: every scorer in FEED_SCORERS ("dotted.path": weight) takes the
+   whole batch and returns one float per candidate.  Each scorer's output is
+   scaled to [0, 1] by its batch maximum, so the weights are comparable, and
+   the weighted sum orders the feed.  A scorer is any callable
+   ``scorer(candidates) -> np.ndarray``; add one by listing its path.
+3. The ranked id list is cached per user for FEED_RANKED_CACHE_SECONDS so
+   later pages are as cheap as the chronological feed.
+
+Author affinity (how much a user engages with an author's posts) needs the
+user's whole like/comment history, which is too slow to aggregate per
+request.  `python manage.py compute_feed_affinity` precomputes it for every
+user into the FeedAffinity table (one row per user, read with one primary
+key lookup per ranking); run it from cron (e.g. hourly).  It is stored in
+the database rather than the cache because the command runs in its own
+process, and the default cache may be per-process memory.  A user with no
+row, or one older than FEED_AFFINITY_MAX_AGE_SECONDS (the cron stopped),
+just gets zeros from that scorer.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import decay
+from .models import Comment, FeedAffinity, Like, Post
+from .trending import WEIGHTS, top_post_ids
+
+RANKED_KEY = 'feed:ranked:{}'
+
+
+class Candidates:
+    """Feature columns for a batch of candidate posts, one row per post."""
+
+    def __init__(self, user, rows, now):
+        self.user = user
+        self.now = now
+        ids, authors, created, scores = zip(*rows) if rows else ((), (), (), ())
+        self.ids = np.array(ids, dtype=np.int64)
+        self.author_ids = np.array(authors, dtype=np.int64)
+        self.timestamps = np.array([at.timestamp() for at in created], dtype=np.float64)
+        self.trending_scores = np.array(scores, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+# ── Scorers ──────────────────────────────────────────────────────────────────
+
+def recency(candidates):
+    """Halves every FEED_RECENCY_HALF_LIFE_HOURS of post age."""
+    half_life = getattr(settings, 'FEED_RECENCY_HALF_LIFE_HOURS', 24) * 3600
+    age = candidates.now.timestamp() - candidates.timestamps
+    return np.exp2(-np.maximum(age, 0) / half_life)
+
+
+def engagement(candidates):
+    """Time-decayed likes and comments, from the stored trending score."""
+    now = decay.exponent(candidates.now)
+    return np.log1p(np.exp2(candidates.trending_scores - now))
+
+
+def affinity(candidates):
+    """The user's precomputed affinity for each candidate's author."""
+    max_age = getattr(settings, 'FEED_AFFINITY_MAX_AGE_SECONDS', 6 * 3600)
+    stored = (
+        FeedAffinity.objects
+        .filter(user=candidates.user,
+                computed_at__gte=candidates.now - timedelta(seconds=max_age))
+        .values_list('author_ids', 'weights')
+        .first()
+    )
+    if not stored or not stored[0]:
+        return np.zeros(len(candidates))
+    authors, weights = np.asarray(stored[0]), np.asarray(stored[1])
+    # authors is sorted, so one searchsorted looks up the whole batch.
+    idx = np.clip(np.searchsorted(authors, candidates.author_ids), 0, len(authors) - 1)
+    return np.where(authors[idx] == candidates.author_ids, weights[idx], 0.0)
+
+
+def get_scorers():
+    return [(import_string(path), weight) for path, weight in settings.FEED_SCORERS.items()]
+
+
+# ── Ranking ──────────────────────────────────────────────────────────────────
+
+def get_candidates(user, now=None):
+    now = now or timezone.now()
+    fields = ('pk', 'author_id', 'created_at', 'trending_score')
+    followed = user.following.values_list('user', flat=True)
+    since = now - timedelta(days=getattr(settings, 'FEED_CANDIDATE_DAYS', 7))
+    rows = list(
+        Post.objects.filter(author__in=followed, created_at__gte=since)
+        .order_by('-created_at')
+        .values_list(*fields)[:getattr(settings, 'FEED_CANDIDATES', 500)]
+    )
+    seen = {row[0] for row in rows}
+    top_k = getattr(settings, 'TRENDING_TOP_K', 100)
+    trending = [pk for pk in top_post_ids(top_k) if pk not in seen]
+    if trending:
+        rows += (
+            Post.objects.filter(pk__in=trending)
+            .exclude(author=user)
+            .order_by()
+            .values_list(*fields)
+        )
+    return Candidates(user, rows, now)
+
+
+def rank(candidates):
+    """Candidate ids, best first."""
+    if not len(candidates):
+        return []
+    total = np.zeros(len(candidates))
+    for scorer, weight in get_scorers():
+        scores = np.asarray(scorer(candidates), dtype=np.float64)
+        top = scores.max()
+        if top > 0:
+            total += weight * scores / top
+    # Stable sort on -score keeps the (newest first) candidate order for ties.
+    order = np.argsort(-total, kind='stable')
+    return candidates.ids[order].tolist()
+
+
+def ranked_post_ids(user):
+    """The user's ranked feed, cached briefly so pagination is consistent."""
+    key = RANKED_KEY.format(user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = rank(get_candidates(user))
+        cache.set(key, ids, getattr(settings, 'FEED_RANKED_CACHE_SECONDS', 60))
+    return ids
+
+
+# ── Affinity precomputation ──────────────────────────────────────────────────
+
+def compute_affinity(since):
+    """
+    {user_id: {author_id: weight}} from the likes and comments each user
+    gave other authors' posts since ``since``, weighted like trending.
+    """
+    affinity = defaultdict(Counter)
+    sources = [
+        (Like.objects.filter(created_at__gte=since).exclude(post__author=F('user')),
+         'user_id', WEIGHTS['like']),
+        (Comment.objects.filter(created_at__gte=since).exclude(post__author=F('author')),
+         'author_id', WEIGHTS['comment']),
+    ]
+    for queryset, user_field, weight in sources:
+        counts = (
+            queryset.order_by()
+            .values_list(user_field, 'post__author_id')
+            .annotate(n=Count('pk'))
+        )
+        for user_id, author_id, n in counts.iterator():
+            affinity[user_id][author_id] += weight * n
+    return affinity
+
+
+def store_affinity(affinity):
+    """
+    Replace every FeedAffinity row with ``affinity``, as sorted author ids
+    and log1p weights per user, in one transaction (rankings never see a
+    half-written set).
+    """
+    now = timezone.now()
+    rows = []
+    for user_id, authors in affinity.items():
+        author_ids = sorted(authors)
+        rows.append(FeedAffinity(
+            user_id=user_id,
+            author_ids=author_ids,
+            weights=[float(np.log1p(authors[a])) for a in author_ids],
+            computed_at=now,
+        ))
+    with transaction.atomic():
+        FeedAffinity.objects.all().delete()
+        FeedAffinity.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
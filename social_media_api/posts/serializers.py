@@ -1,22 +1,117 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Post, Comment, Like
+from django.db.models import Prefetch
+from .models import MAX_COMMENT_DEPTH, Post, Comment, Like
+
+# Top-level comments embedded in each post; the rest are paged through
+# /api/posts/<pk>/comments/.
+COMMENT_PREVIEW_SIZE = 3
+
+
+def comment_preview():
+    """
+    Prefetch for PostSerializer.comments: the first COMMENT_PREVIEW_SIZE
+    top-level comments of every post, in one query for the whole page.
+    """
+    queryset = (
+        Comment.objects.filter(depth=0)
+        .select_related('author')
+        .order_by('created_at', 'pk')[:COMMENT_PREVIEW_SIZE]
+    )
+    return Prefetch('comments', queryset=queryset, to_attr='comment_preview')
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """
+    Used for batch writes (a JSON list POSTed to a viewset).
+    The whole batch is validated first and then inserted with bulk_create,
+    so N items cost a handful of INSERTs instead of N round-trips.
+    """
+    batch_size = 500
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objs = [model(**attrs) for attrs in validated_data]
+        return model.objects.bulk_create(objs, batch_size=self.batch_size)
+
+
+class CommentListSerializer(BulkCreateListSerializer):
+    """
+    Batch comment creates: every parent the batch refers to is loaded in one
+    query and handed to ParentField through the context, so N replies don't
+    cost N lookups.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and (self.max_length is None or len(data) <= self.max_length):
+            ids = set()
+            for item in data:
+                try:
+                    ids.add(int(item['parent']))
+                except (KeyError, TypeError, ValueError):
+                    pass
+            self.context['parents'] = (
+                Comment.objects.only('pk', 'post_id', 'path', 'depth').in_bulk(ids)
+            )
+        # Otherwise super() rejects the payload before any item is looked at.
+        return super().to_internal_value(data)
+
+
+class ParentField(serializers.PrimaryKeyRelatedField):
+    """Parent comment by id, from the context's 'parents' map when there is one."""
+
+    def to_internal_value(self, data):
+        parents = self.context.get('parents')
+        if parents is not None and not isinstance(data, bool):
+            try:
+                return parents[int(data)]
+            except (TypeError, ValueError):
+                pass
+            except KeyError:
+                # The map holds every parent the batch refers to.
+                self.fail('does_not_exist', pk_value=data)
+        return super().to_internal_value(data)
 
 
 class CommentSerializer(serializers.ModelSerializer):
     author_username = serializers.ReadOnlyField(source='author.username')
+    parent = ParentField(queryset=Comment.objects.all(), required=False, allow_null=True)
 
     class Meta:
         model = Comment
-        fields = ['id', 'post', 'author', 'author_username', 'content', 'created_at', 'updated_at']
-        read_only_fields = ['author', 'created_at', 'updated_at']
+        fields = [
+            'id', 'post', 'parent', 'depth', 'reply_count',
+            'author', 'author_username', 'content', 'created_at', 'updated_at',
+        ]
+        # post always comes from the URL (see CommentViewSet.perform_create)
+        read_only_fields = ['post', 'depth', 'reply_count', 'author', 'created_at', 'updated_at']
+        list_serializer_class = CommentListSerializer
+
+    def validate(self, attrs):
+        if self.instance is not None:
+            attrs.pop('parent', None)   # a reply can't be moved to another thread
+            return attrs
+        parent = attrs.get('parent')
+        if parent is None:
+            return attrs
+        view = self.context.get('view')
+        post_pk = view.kwargs.get('post_pk') if view else None
+        if post_pk is not None and str(parent.post_id) != str(post_pk):
+            raise serializers.ValidationError({'parent': 'Parent comment is on a different post.'})
+        if parent.depth >= MAX_COMMENT_DEPTH:
+            raise serializers.ValidationError({'parent': 'This thread is nested too deeply.'})
+        # Filled in here rather than in Comment.save() so batch creates
+        # (bulk_create skips save()) get them too.
+        attrs['path'] = parent.subtree_prefix
+        attrs['depth'] = parent.depth + 1
+        return attrs
 
 
 class PostSerializer(serializers.ModelSerializer):
     author_username = serializers.ReadOnlyField(source='author.username')
     likes_count = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
-    comments = CommentSerializer(many=True, read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
+    comments = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
@@ -27,12 +122,23 @@ class PostSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at',
         ]
         read_only_fields = ['author', 'created_at', 'updated_at']
+        list_serializer_class = BulkCreateListSerializer
 
     def get_likes_count(self, obj):
-        return obj.likes.count()
+        # Views that annotate num_likes (e.g. posts.async_views) skip the query.
+        num_likes = getattr(obj, 'num_likes', None)
+        return num_likes if num_likes is not None else obj.likes.count()
 
-    def get_comments_count(self, obj):
-        return obj.comments.count()
+    def get_comments(self, obj):
+        # Views prefetch comment_preview(); a lone post costs one query.
+        comments = getattr(obj, 'comment_preview', None)
+        if comments is None:
+            comments = (
+                obj.comments.filter(depth=0)
+                .select_related('author')
+                .order_by('created_at', 'pk')[:COMMENT_PREVIEW_SIZE]
+            )
+        return CommentSerializer(comments, many=True, context=self.context).data
 
 
 class LikeSerializer(serializers.ModelSerializer):
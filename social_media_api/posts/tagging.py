@@ -0,0 +1,116 @@
+"""
+#hashtag and @mention extraction.
+
+Post content is parsed when a post is written (PostViewSet create, update
+and batch create) and the results are stored in two join tables,
+PostHashtag and Mention.  Each carries a copy of the post's created_at and
+is indexed on (hashtag | user, created_at, id), so "posts tagged #x" and
+"posts mentioning me" are keyset-paginated index scans instead of a LIKE
+over every post.
+
+sync_tags() works on a batch: however many posts it is given, it issues a
+fixed number of queries, and it only creates "mentioned you" notifications
+for mentions that are new to a post, so editing a post doesn't notify the
+same people twice.
+"""
+import re
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+
+from notifications.models import Notification
+from .models import Hashtag, Mention, Post, PostHashtag
+
+# A tag or mention must not be glued to a preceding word character, so
+# e-mail addresses and URL fragments like page#anchor don't count.
+HASHTAG_RE = re.compile(r'(?<![\w#&])#(\w{1,100})')
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.+-]{1,150})')
+
+MENTION_VERB = 'mentioned you'
+
+
+def parse(text):
+    """Return (hashtags, usernames) found in ``text`` as two sets."""
+    hashtags = {tag.lower() for tag in HASHTAG_RE.findall(text)}
+    # Usernames may contain dots, but a trailing one ends the sentence.
+    usernames = {name.rstrip('.') for name in MENTION_RE.findall(text)}
+    usernames.discard('')
+    return hashtags, usernames
+
+
+def _sync_links(model, field, posts, wanted):
+    """
+    Make ``model`` rows for ``posts`` match ``wanted`` ({post: {id, ...}}).
+    Returns the (post_id, id) pairs that were added.
+    """
+    existing = set(
+        model.objects.filter(post__in=posts).values_list('post_id', f'{field}_id')
+    )
+    target = {(post.pk, other) for post in posts for other in wanted[post]}
+    stale = existing - target
+    added = target - existing
+    if stale:
+        match = Q()
+        for post_id, other in stale:
+            match |= Q(post_id=post_id, **{f'{field}_id': other})
+        model.objects.filter(match).delete()
+    created_at = {post.pk: post.created_at for post in posts}
+    model.objects.bulk_create(
+        [
+            model(post_id=post_id, created_at=created_at[post_id], **{f'{field}_id': other})
+            for post_id, other in added
+        ],
+        ignore_conflicts=True,
+    )
+    return added
+
+
+def sync_tags(posts, notify=True):
+    """
+    Re-extract hashtags and mentions from the content of ``posts`` and
+    update the join tables to match.  New mentions notify the mentioned
+    user unless ``notify`` is False or they mentioned themselves.
+    """
+    posts = list(posts)
+    if not posts:
+        return
+    parsed = {post: parse(post.content) for post in posts}
+
+    names = set().union(*(tags for tags, _ in parsed.values()))
+    if names:
+        Hashtag.objects.bulk_create(
+            [Hashtag(name=name) for name in names], ignore_conflicts=True
+        )
+    tag_ids = dict(Hashtag.objects.filter(name__in=names).values_list('name', 'pk'))
+    _sync_links(
+        PostHashtag, 'hashtag', posts,
+        {post: {tag_ids[tag] for tag in tags} for post, (tags, _) in parsed.items()},
+    )
+
+    usernames = set().union(*(users for _, users in parsed.values()))
+    user_ids = dict(
+        User.objects.filter(username__in=usernames).values_list('username', 'pk')
+    )
+    added = _sync_links(
+        Mention, 'user', posts,
+        {
+            post: {user_ids[name] for name in users if name in user_ids}
+            for post, (_, users) in parsed.items()
+        },
+    )
+
+    if notify and added:
+        authors = {post.pk: post.author_id for post in posts}
+        content_type = ContentType.objects.get_for_model(Post)
+        Notification.objects.bulk_create([
+            Notification(
+                recipient_id=user_id,
+                actor_id=authors[post_id],
+                verb=MENTION_VERB,
+                content_type=content_type,
+                target_object_id=post_id,
+            )
+            for post_id, user_id in added
+            if user_id != authors[post_id]
+        ])
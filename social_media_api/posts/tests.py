@@ -1,3 +1,574 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from notifications.models import Notification
+from social_media_api import db_router
+from .models import Post, Comment, FeedAffinity, Like
+
+
+class PostsAPITestCase(APITestCase):
+    """Base test case with two users and one post."""
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='pass12345')
+        self.reader = User.objects.create_user(username='reader', password='pass12345')
+        self.post = Post.objects.create(author=self.author, title='Hello', content='World')
+
+
+class BulkCreateTests(PostsAPITestCase):
+    """Tests for POSTing a list to /api/posts/ and /api/posts/<pk>/comments/."""
+
+    def test_bulk_create_posts(self):
+        """A list of posts is created in one request and returned in order."""
+        self.client.force_authenticate(self.reader)
+        data = [{'title': f'Post {i}', 'content': 'body'} for i in range(5)]
+        response = self.client.post('/api/posts/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([p['title'] for p in response.data], [d['title'] for d in data])
+        self.assertEqual(Post.objects.filter(author=self.reader).count(), 5)
+
+    def test_bulk_create_reports_per_item_errors(self):
+        """One invalid item rejects the batch with errors keyed by item index."""
+        self.client.force_authenticate(self.reader)
+        data = [{'title': 'ok', 'content': 'body'}, {'title': 'missing content'}]
+        response = self.client.post('/api/posts/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.data), [1])
+        self.assertIn('content', response.data[1])
+        self.assertFalse(Post.objects.filter(author=self.reader).exists())
+
+    def test_bulk_create_comments_notifies_in_bulk(self):
+        """Batch comments create one notification per comment for the post author."""
+        self.client.force_authenticate(self.reader)
+        url = f'/api/posts/{self.post.pk}/comments/'
+        data = [{'content': f'comment {i}'} for i in range(3)]
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Comment.objects.filter(post=self.post).count(), 3)
+        self.assertEqual(
+            Notification.objects.filter(recipient=self.author, verb='commented on your post').count(),
+            3,
+        )
+
+
+class DeletionTests(PostsAPITestCase):
+    """Tests for post / user deletion cleaning up dependent rows."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.reader)
+        self.client.post(f'/api/posts/{self.post.pk}/comments/', {'content': 'hi'}, format='json')
+        self.client.post(f'/api/{self.post.pk}/like/')
+
+    def test_delete_post_removes_comments_likes_and_notifications(self):
+        """Deleting a post leaves no orphaned notifications behind."""
+        self.assertEqual(Notification.objects.filter(recipient=self.author).count(), 2)
+        self.client.force_authenticate(self.author)
+        response = self.client.delete(f'/api/posts/{self.post.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Like.objects.exists())
+        self.assertFalse(Notification.objects.exists())
+
+    def test_delete_user_reports_progress(self):
+        """delete_user removes the account and everything it owns."""
+        from accounts.deletion import delete_user
+
+        stages = []
+        delete_user(self.reader, chunk_size=1, progress=lambda stage, n: stages.append(stage))
+        self.assertFalse(User.objects.filter(username='reader').exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Like.objects.exists())
+        self.assertIn('comments', stages)
+        self.assertEqual(stages[-1], 'user')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
+
+    def test_delete_user_takes_back_trending_on_other_posts(self):
+        """The deleted account's likes and comments no longer lift other posts."""
+        from accounts.deletion import delete_user
+
+        cache.clear()   # the writes throttle
+        other = Post.objects.create(author=self.author, title='Other', content='...')
+        before = Post.objects.get(pk=other.pk).trending_score
+        self.client.post(f'/api/{other.pk}/like/')
+        response = self.client.post(
+            f'/api/posts/{other.pk}/comments/', {'content': 'a'}, format='json'
+        )
+        root = response.data['id']
+        # A reply by someone else goes with the thread, and counts as well.
+        self.client.force_authenticate(self.author)
+        self.client.post(
+            f'/api/posts/{other.pk}/comments/', {'content': 'b', 'parent': root}, format='json'
+        )
+
+        delete_user(self.reader)
+        other.refresh_from_db()
+        self.assertAlmostEqual(other.trending_score, before, places=6)
+        self.assertEqual((other.comments_count, other.top_level_comments_count), (0, 0))
+
+    def test_comment_subtrees_are_deleted_in_bounded_statements(self):
+        """A chunk widened with a deep thread still deletes chunk_size rows at a time."""
+        from .deletion import delete_comments
+
+        parent = None
+        for i in range(5):
+            parent = Comment.objects.create(
+                post=self.post, author=self.reader, content=f'level {i}',
+                parent_id=parent and parent.pk,
+                path=parent.subtree_prefix if parent else '', depth=i,
+            )
+            if i:
+                Comment.objects.filter(pk=parent.parent_id).update(reply_count=1)
+        Post.objects.filter(pk=self.post.pk).update(comments_count=6, top_level_comments_count=2)
+        roots = Comment.objects.filter(post=self.post, depth=0)
+        with CaptureQueriesContext(connection) as queries:
+            delete_comments(roots, chunk_size=2)
+        deletes = [
+            q['sql'] for q in queries if q['sql'].startswith('DELETE FROM "posts_comment"')
+        ]
+        # One chunk of both top-level comments, widened to 6 rows: 3 statements.
+        self.assertEqual(len(deletes), 3)
+        self.assertFalse(Comment.objects.exists())
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.comments_count, self.post.top_level_comments_count), (0, 0))
+
+
+class CommentPaginationTests(PostsAPITestCase):
+    """Tests for keyset-paginated GET /api/posts/<pk>/comments/."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.reader)
+        self.url = f'/api/posts/{self.post.pk}/comments/'
+        data = [{'content': f'comment {i}'} for i in range(5)]
+        self.client.post(self.url, data, format='json')
+
+    def test_pages_follow_the_cursor_without_gaps(self):
+        """Walking the next links returns every comment once, oldest first."""
+        seen, url = [], f'{self.url}?page_size=2'
+        while url:
+            body = self.client.get(url).json()
+            self.assertEqual(body['count'], 5)
+            seen += [c['content'] for c in body['results']]
+            url = body['next']
+        self.assertEqual(seen, [f'comment {i}' for i in range(5)])
+
+    def test_newer_link_returns_only_new_comments(self):
+        """Polling the newer link after catching up yields just the new comment."""
+        body = self.client.get(self.url).json()
+        self.assertIsNone(body['next'])
+        newer = body['newer']
+        self.assertEqual(self.client.get(newer).json()['results'], [])
+
+        self.client.post(self.url, {'content': 'late'}, format='json')
+        body = self.client.get(newer).json()
+        self.assertEqual([c['content'] for c in body['results']], ['late'])
+        self.assertEqual(body['count'], 6)
+
+    def test_counter_follows_deletes(self):
+        """Deleting a comment decrements Post.comments_count."""
+        comment = Comment.objects.filter(post=self.post).first()
+        self.client.delete(f'{self.url}{comment.pk}/')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 4)
+        response = self.client.get(f'/api/posts/{self.post.pk}/')
+        self.assertEqual(response.json()['comments_count'], 4)
+
+    def test_invalid_cursor_is_404(self):
+        """A cursor that does not decode is rejected."""
+        response = self.client.get(f'{self.url}?cursor=garbage')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CommentThreadTests(PostsAPITestCase):
+    """Tests for reply threading on /api/posts/<pk>/comments/."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.reader)
+        self.url = f'/api/posts/{self.post.pk}/comments/'
+
+    def reply_chain(self, length, parent=None):
+        """Post ``length`` comments, each replying to the previous one."""
+        ids = []
+        for i in range(length):
+            response = self.client.post(
+                self.url, {'content': f'level {i}', 'parent': parent}, format='json'
+            )
+            parent = response.data['id']
+            ids.append(parent)
+        return ids
+
+    def test_replies_are_lazy_and_depth_limited(self):
+        """Top level lists roots only; ?parent&depth loads a bounded subtree."""
+        root, child, grandchild, _ = self.reply_chain(4)
+        body = self.client.get(self.url).json()
+        self.assertEqual([c['id'] for c in body['results']], [root])
+        self.assertEqual(body['results'][0]['reply_count'], 1)
+        self.assertEqual(body['count'], 1)
+
+        body = self.client.get(f'{self.url}?parent={root}&depth=2').json()
+        self.assertEqual([c['id'] for c in body['results']], [child, grandchild])
+        self.assertEqual([c['depth'] for c in body['results']], [1, 2])
+
+    def test_top_level_count_excludes_replies(self):
+        """The listing total counts top-level comments, through creates and deletes."""
+        root = self.reply_chain(3)[0]
+        self.client.post(self.url, [{'content': 'a'}, {'content': 'b', 'parent': root}], format='json')
+        self.assertEqual(self.client.get(self.url).json()['count'], 2)
+        self.client.delete(f'{self.url}{root}/')
+        self.assertEqual(self.client.get(self.url).json()['count'], 1)
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.comments_count, self.post.top_level_comments_count), (1, 1))
+
+    def test_posts_embed_a_bounded_preview(self):
+        """Post payloads carry the first few top-level comments, not the thread."""
+        from .serializers import COMMENT_PREVIEW_SIZE
+
+        root = self.reply_chain(2)[0]
+        self.client.post(self.url, [{'content': f'c{i}'} for i in range(5)], format='json')
+        for url in (f'/api/posts/{self.post.pk}/', '/api/posts/'):
+            body = self.client.get(url).json()
+            post = body if 'comments' in body else body['results'][0]
+            self.assertEqual(len(post['comments']), COMMENT_PREVIEW_SIZE)
+            self.assertEqual(post['comments'][0]['id'], root)
+            self.assertEqual(post['comments_count'], 7)
+
+    def test_subtree_loads_in_constant_queries(self):
+        """A deeper thread doesn't cost more queries to load."""
+        shallow = self.reply_chain(3)[0]
+        deep = self.reply_chain(8)[0]
+        with CaptureQueriesContext(connection) as shallow_queries:
+            self.client.get(f'{self.url}?parent={shallow}&depth=20')
+        with CaptureQueriesContext(connection) as deep_queries:
+            body = self.client.get(f'{self.url}?parent={deep}&depth=20').json()
+        self.assertEqual(len(body['results']), 7)
+        self.assertEqual(len(shallow_queries), len(deep_queries))
+
+    def test_deleting_a_thread_takes_back_every_reply(self):
+        """Removing a comment subtracts the trending contribution of each reply too."""
+        before = Post.objects.get(pk=self.post.pk).trending_score
+        root = self.reply_chain(4)[0]
+        self.client.delete(f'{self.url}{root}/')
+        after = Post.objects.get(pk=self.post.pk).trending_score
+        self.assertAlmostEqual(before, after, places=6)
+
+    def test_batch_replies_resolve_parents_in_one_query(self):
+        """A batch naming several parents looks them up together."""
+        parents = [self.reply_chain(1)[0] for _ in range(4)]
+        data = [{'content': f'reply {i}', 'parent': pk} for i, pk in enumerate(parents)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([c['depth'] for c in response.data], [1] * 4)
+        lookups = [
+            q['sql'] for q in queries
+            if q['sql'].startswith('SELECT') and 'FROM "posts_comment"' in q['sql']
+        ]
+        self.assertEqual(len(lookups), 1)
+
+    def test_reply_must_be_on_the_same_post(self):
+        """A parent from another post is rejected."""
+        other = Post.objects.create(author=self.author, title='Other', content='x')
+        parent = Comment.objects.create(post=other, author=self.author, content='x')
+        response = self.client.post(self.url, {'content': 'hi', 'parent': parent.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('parent', response.data)
+
+    def test_delete_removes_subtree_and_updates_counters(self):
+        """Deleting a reply removes its subtree in constant queries."""
+        root, child, *_ = self.reply_chain(3)
+        deep_child = self.reply_chain(8, parent=root)[0]
+        with CaptureQueriesContext(connection) as short:
+            self.client.delete(f'{self.url}{child}/')
+        with CaptureQueriesContext(connection) as long:
+            self.client.delete(f'{self.url}{deep_child}/')
+        self.assertEqual(len(short), len(long))
+        self.assertEqual(list(Comment.objects.values_list('pk', flat=True)), [root])
+        self.assertEqual(Comment.objects.get(pk=root).reply_count, 0)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+
+
+class HashtagMentionTests(PostsAPITestCase):
+    """Tests for #hashtag / @mention extraction and their listings."""
+
+    def test_parse_ignores_emails_and_anchors(self):
+        """Only free-standing #tags and @names are extracted."""
+        from .tagging import parse
+
+        tags, names = parse('#Django rocks, mail me@example.com or see page#top, @reader.')
+        self.assertEqual(tags, {'django'})
+        self.assertEqual(names, {'reader'})
+
+    def test_posts_by_hashtag_are_keyset_paginated(self):
+        """GET /api/hashtags/<tag>/ pages newest first without gaps."""
+        self.client.force_authenticate(self.author)
+        data = [{'title': f'Post {i}', 'content': f'#Python number {i}'} for i in range(3)]
+        self.client.post('/api/posts/', data, format='json')
+
+        seen, url = [], '/api/hashtags/python/?page_size=2'
+        while url:
+            body = self.client.get(url).json()
+            seen += [p['title'] for p in body['results']]
+            url = body['next']
+        self.assertEqual(seen, ['Post 2', 'Post 1', 'Post 0'])
+
+    def test_hashtag_newer_link_returns_only_new_posts(self):
+        """On a newest-first listing, polling the newer link yields just the new posts."""
+        self.client.force_authenticate(self.author)
+        data = [{'title': f'Post {i}', 'content': f'#Python number {i}'} for i in range(3)]
+        self.client.post('/api/posts/', data, format='json')
+
+        body = self.client.get('/api/hashtags/python/?page_size=2').json()
+        newer = body['newer']
+        self.assertEqual(self.client.get(newer).json()['results'], [])
+
+        late = [{'title': f'Late {i}', 'content': f'#python late {i}'} for i in range(3)]
+        self.client.post('/api/posts/', late, format='json')
+        body = self.client.get(newer).json()
+        self.assertEqual([p['title'] for p in body['results']], ['Late 1', 'Late 0'])
+        self.assertIsNone(body['next'])
+        body = self.client.get(body['newer']).json()
+        self.assertEqual([p['title'] for p in body['results']], ['Late 2'])
+        self.assertEqual(self.client.get(body['newer']).json()['results'], [])
+
+    def test_mentions_notify_once_and_follow_edits(self):
+        """A mention notifies once; editing it away removes it from /api/mentions/."""
+        self.client.force_authenticate(self.author)
+        response = self.client.post(
+            '/api/posts/', {'title': 'Hi', 'content': 'hey @reader'}, format='json'
+        )
+        url = f"/api/posts/{response.data['id']}/"
+        self.client.patch(url, {'content': 'hey again @reader'}, format='json')
+        self.assertEqual(
+            Notification.objects.filter(recipient=self.reader, verb='mentioned you').count(), 1
+        )
+
+        self.client.force_authenticate(self.reader)
+        body = self.client.get('/api/mentions/').json()
+        self.assertEqual([p['title'] for p in body['results']], ['Hi'])
+
+        self.client.force_authenticate(self.author)
+        self.client.patch(url, {'content': 'never mind'}, format='json')
+        self.client.force_authenticate(self.reader)
+        self.assertEqual(self.client.get('/api/mentions/').json()['results'], [])
+
+
+class AuthorWriteTests(PostsAPITestCase):
+    """Tests for conditional author-only update / delete."""
+
+    def setUp(self):
+        super().setUp()
+        self.comment = Comment.objects.create(post=self.post, author=self.reader, content='hi')
+        self.url = f'/api/posts/{self.post.pk}/comments/{self.comment.pk}/'
+
+    def test_update_is_one_conditional_write(self):
+        """The author's edit is an UPDATE followed by the re-read for the response."""
+        self.client.force_authenticate(self.reader)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, {'content': 'edited'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['content'], 'edited')
+        sql = [q['sql'] for q in queries if 'posts_comment' in q['sql']]
+        self.assertEqual(len(sql), 2)
+        self.assertTrue(sql[0].startswith('UPDATE'))
+
+    def test_update_leaves_counters_alone(self):
+        """Editing a post doesn't write back a stale comments_count."""
+        self.client.force_authenticate(self.author)
+        Post.objects.filter(pk=self.post.pk).update(comments_count=7)
+        self.client.patch(f'/api/posts/{self.post.pk}/', {'title': 'New'}, format='json')
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.title, self.post.comments_count), ('New', 7))
+
+    def test_non_author_gets_403_and_missing_gets_404(self):
+        """Nothing is written for other users; unknown ids are 404."""
+        self.client.force_authenticate(self.author)
+        response = self.client.patch(self.url, {'content': 'hijack'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.content, 'hi')
+
+        response = self.client.delete(f'/api/posts/{self.post.pk}/comments/999999/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class RankedFeedTests(PostsAPITestCase):
+    """Tests for GET /api/feed/?mode=ranked."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.friend = User.objects.create_user(username='friend', password='pass12345')
+        self.author.profile.followers.add(self.reader)
+        self.friend.profile.followers.add(self.reader)
+        self.old_friend_post = Post.objects.create(author=self.friend, title='Old', content='x')
+        self.newest = Post.objects.create(author=self.author, title='New', content='x')
+        self.client.force_authenticate(self.reader)
+
+    def test_affinity_outranks_recency(self):
+        """Precomputed affinity lifts an author the user engages with."""
+        from django.core.management import call_command
+
+        friend_posts = [
+            Post.objects.create(author=self.friend, title=f'f{i}', content='x') for i in range(3)
+        ]
+        Like.objects.bulk_create([Like(post=p, user=self.reader) for p in friend_posts])
+        call_command('compute_feed_affinity', stdout=StringIO())
+        # The scores live in the database, not in the command's cache.
+        cache.clear()
+
+        body = self.client.get('/api/feed/?mode=ranked').json()
+        titles = [p['title'] for p in body['results']]
+        self.assertLess(titles.index('Old'), titles.index('New'))
+        self.assertIn('Hello', titles)
+
+    def test_stale_affinity_is_ignored(self):
+        """Rows older than FEED_AFFINITY_MAX_AGE_SECONDS don't count."""
+        from django.core.management import call_command
+
+        liked = Post.objects.create(author=self.friend, title='Liked', content='x')
+        Like.objects.create(post=liked, user=self.reader)
+        call_command('compute_feed_affinity', stdout=StringIO())
+        FeedAffinity.objects.update(computed_at=timezone.now() - timedelta(days=1))
+
+        body = self.client.get('/api/feed/?mode=ranked').json()
+        titles = [p['title'] for p in body['results']]
+        self.assertLess(titles.index('New'), titles.index('Old'))
+
+    def test_ranking_is_reused_across_pages(self):
+        """Later pages come from the cached ranking, without re-scoring."""
+        first = self.client.get('/api/feed/?mode=ranked&page_size=2').json()
+        Post.objects.create(author=self.author, title='Newer', content='x')
+        second = self.client.get(first['next']).json()
+        titles = [p['title'] for p in first['results'] + second['results']]
+        self.assertEqual(sorted(titles), ['Hello', 'New', 'Old'])
+
+
+class TrendingTests(PostsAPITestCase):
+    """Tests for GET /api/posts/trending/."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.newer = Post.objects.create(author=self.author, title='Newer', content='...')
+
+    def test_engagement_outranks_recency(self):
+        """A liked and commented post ranks above a newer post without activity."""
+        self.client.force_authenticate(self.reader)
+        self.client.post(f'/api/{self.post.pk}/like/')
+        self.client.post(f'/api/posts/{self.post.pk}/comments/', {'content': 'hi'}, format='json')
+        cache.clear()
+        response = self.client.get('/api/posts/trending/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['id'] for p in response.data], [self.post.pk, self.newer.pk])
+
+    def test_unlike_takes_back_the_contribution(self):
+        """Removing a like restores the previous score."""
+        before = Post.objects.get(pk=self.post.pk).trending_score
+        self.client.force_authenticate(self.reader)
+        self.client.post(f'/api/{self.post.pk}/like/')
+        self.client.delete(f'/api/{self.post.pk}/like/')
+        after = Post.objects.get(pk=self.post.pk).trending_score
+        self.assertAlmostEqual(before, after, places=6)
+
+    def test_concurrent_unlike_is_taken_back_once(self):
+        """An unlike whose row was deleted by another request changes nothing."""
+        from django.db.models.query import QuerySet
+
+        self.client.force_authenticate(self.reader)
+        self.client.post(f'/api/{self.post.pk}/like/')
+        before = Post.objects.get(pk=self.post.pk).trending_score
+        first = QuerySet.first
+
+        def first_then_race(queryset):
+            row = first(queryset)
+            # The other request's unlike lands between our read and our delete.
+            Like.objects.filter(post=self.post, user=self.reader).delete()
+            return row
+
+        with mock.patch.object(QuerySet, 'first', first_then_race):
+            response = self.client.delete(f'/api/{self.post.pk}/like/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertAlmostEqual(Post.objects.get(pk=self.post.pk).trending_score, before, places=6)
+
+
+class AsyncViewTests(PostsAPITestCase):
+    """The async read endpoints return the same payload as their DRF counterparts."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        Comment.objects.create(post=self.post, author=self.reader, content='hi')
+        Like.objects.create(post=self.post, user=self.reader)
+        self.author.profile.followers.add(self.reader)
+        self.token = Token.objects.create(user=self.reader)
+
+    def test_post_list_matches_drf(self):
+        """GET /api/async/posts/ mirrors GET /api/posts/."""
+        expected = self.client.get('/api/posts/').json()
+        response = async_to_sync(self.async_client.get)('/api/async/posts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected)
+
+    def test_feed_requires_token(self):
+        """The async feed authenticates with the same tokens as the API."""
+        anonymous = async_to_sync(self.async_client.get)('/api/async/feed/')
+        self.assertEqual(anonymous.status_code, 401)
+        response = async_to_sync(self.async_client.get)(
+            '/api/async/feed/', headers={'Authorization': f'Token {self.token.key}'}
+        )
+        self.assertEqual([p['id'] for p in response.json()['results']], [self.post.pk])
+        self.assertEqual(response.json()['results'][0]['likes_count'], 1)
+
+
+@skipUnless('replica' in settings.DATABASES, 'needs the second database from settings_test')
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(PostsAPITestCase):
+    """
+    Read routing with two databases: the test writes only to the primary,
+    so anything read from the (empty) replica comes back empty.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        db_router._health.clear()
+        self.client.force_authenticate(self.reader)
+
+    def test_list_reads_from_replica(self):
+        """Safe requests to list views are served by the replica."""
+        response = self.client.get('/api/posts/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 0)
+
+    def test_pinned_to_primary_after_own_write(self):
+        """After a write the user reads from the primary for a short window."""
+        self.client.post('/api/posts/', {'title': 'Mine', 'content': '...'}, format='json')
+        response = self.client.get('/api/posts/')
+        self.assertEqual(response.data['count'], 2)
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        """A replica whose last probe failed is skipped."""
+        db_router._health['replica'] = (False, time.monotonic())
+        response = self.client.get('/api/posts/')
+        self.assertEqual(response.data['count'], 1)
@@ -0,0 +1,77 @@
+"""
+Trending posts.
+
+Post.trending_score is updated incrementally on every like / comment event
+(record_event) and is indexed, so ranking is an index scan rather than an
+aggregate over the likes and comments tables.  The top-K post ids are cached
+and refreshed every TRENDING_CACHE_SECONDS.
+"""
+from functools import reduce
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from . import decay
+from .models import Post
+
+WEIGHTS = {
+    'like': 1.0,
+    'comment': 3.0,
+}
+
+CACHE_KEY = 'posts:trending:top'
+
+
+def record_event(post_id, kind, count=1, at=None, remove=False):
+    """
+    Add (or with ``remove=True`` take back) ``count`` events of ``kind`` on a
+    post.  ``at`` is when the event happened; pass the original timestamp
+    when removing so the same contribution is subtracted.
+    """
+    weight = WEIGHTS[kind] * count
+    if weight <= 0:
+        return
+    _apply_change(post_id, decay.contribution(weight, at or timezone.now()), remove)
+
+
+def remove_events(post_id, kind, times):
+    """
+    Take back one event of ``kind`` per timestamp in ``times`` (say a
+    deleted comment and each reply that went with it) in a single write.
+    """
+    changes = [decay.contribution(WEIGHTS[kind], at) for at in times]
+    if changes:
+        _apply_change(post_id, reduce(decay.log2_add, changes), remove=True)
+
+
+def _apply_change(post_id, change, remove):
+    """Add (or subtract) a log2 ``change`` to the post's stored score."""
+    with transaction.atomic():
+        row = (
+            Post.objects.select_for_update()
+            .filter(pk=post_id)
+            .values('trending_score', 'created_at')
+            .first()
+        )
+        if row is None:
+            return
+        if remove:
+            floor = decay.exponent(row['created_at'])
+            score = decay.log2_sub(row['trending_score'], change, floor)
+        else:
+            score = decay.log2_add(row['trending_score'], change)
+        Post.objects.filter(pk=post_id).update(trending_score=score)
+
+
+def top_post_ids(limit):
+    """Ids of the ``limit`` highest-scoring posts, best first."""
+    ids = cache.get(CACHE_KEY)
+    if ids is None:
+        top_k = getattr(settings, 'TRENDING_TOP_K', 100)
+        ids = list(
+            Post.objects.order_by('-trending_score').values_list('pk', flat=True)[:top_k]
+        )
+        cache.set(CACHE_KEY, ids, getattr(settings, 'TRENDING_CACHE_SECONDS', 60))
+    return ids[:limit]
@@ -1,6 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PostViewSet, CommentViewSet, LikeView, FeedView
+from .views import (
+    PostViewSet, CommentViewSet, LikeView, FeedView, HashtagPostsView, MentionsView,
+)
+from . import async_views
 
 router = DefaultRouter()
 router.register(r'posts', PostViewSet, basename='post')
@@ -11,4 +14,10 @@ urlpatterns = [
     path('feed/', FeedView.as_view(), name='post-feed'),
     path('<int:pk>/like/', LikeView.as_view(), name='post-like'),
     path('<int:pk>/unlike/', LikeView.as_view(), name='post-unlike'),
+    path('hashtags/<str:tag>/', HashtagPostsView.as_view(), name='hashtag-posts'),
+    path('mentions/', MentionsView.as_view(), name='mentions'),
+    # Async (ASGI) variants of the read endpoints
+    path('async/posts/', async_views.post_list, name='async-post-list'),
+    path('async/posts/<int:pk>/', async_views.post_detail, name='async-post-detail'),
+    path('async/feed/', async_views.feed, name='async-post-feed'),
 ]
@@ -1,16 +1,31 @@
+from collections import Counter
+
 from rest_framework import viewsets, generics, status, filters, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.pagination import PageNumberPagination
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import F, prefetch_related_objects
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
-from .models import Post, Comment, Like
-from .serializers import PostSerializer, CommentSerializer
+from .models import MAX_COMMENT_DEPTH, Post, Comment, Like, Mention, PostHashtag
+from .serializers import PostSerializer, CommentSerializer, comment_preview
+from .pagination import CommentPagination, TaggedPostPagination
 from .permissions import IsAuthorOrReadOnly
+from .deletion import delete_comments, delete_posts
+from .ranking import ranked_post_ids
+from .tagging import sync_tags
+from .trending import record_event, top_post_ids
+from accounts import stats as user_stats
 from notifications.models import Notification
+from social_media_api.db_router import ReplicaReadMixin
 
 
 # ──────────────────────────────────────────────────────────
@@ -23,18 +38,109 @@ class PostPagination(PageNumberPagination):
     max_page_size = 100
 
 
+# ──────────────────────────────────────────────────────────
+# Batch create  (POST a JSON list instead of a single object)
+# ──────────────────────────────────────────────────────────
+
+class BulkCreateMixin:
+    """
+    Lets a ModelViewSet accept a JSON list on POST.
+
+    The batch is validated as a whole (errors come back keyed by the index
+    of the offending item) and written in a single transaction through the
+    serializer's BulkCreateListSerializer.  A single object still goes
+    through the normal create() path.
+    """
+    max_batch_size = 1000
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=self.max_batch_size
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            self.perform_bulk_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_bulk_create(self, serializer):
+        serializer.save()
+
+
+# ──────────────────────────────────────────────────────────
+# Author-only writes  (ownership checked inside the UPDATE / DELETE)
+# ──────────────────────────────────────────────────────────
+
+class AuthorWriteMixin:
+    """
+    update / destroy for models with an ``author`` without fetch-check-save.
+
+    The ownership check is part of the write itself,
+    UPDATE ... WHERE id = %s AND author_id = %s, so there is no window
+    between checking and writing, and only the submitted fields are written
+    (instance.save() would also write back counters such as comments_count
+    that other requests keep changing with F()).  Only when nothing matched
+    does one more query tell 404 from 403.
+
+    Hooks: after_update(instance) runs with the re-read object, and
+    destroy_owned(queryset) deletes the (0 or 1) rows in ``queryset`` and
+    returns how many there were.
+    """
+
+    def get_owned_queryset(self):
+        try:
+            pk = int(self.kwargs['pk'])
+        except ValueError:
+            raise Http404
+        return self.get_queryset().filter(pk=pk, author_id=self.request.user.pk)
+
+    def not_owned(self):
+        if self.get_queryset().filter(pk=self.kwargs['pk']).exists():
+            self.permission_denied(self.request)
+        raise Http404
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        # An unsaved stand-in is enough for validation to treat this as an update.
+        stand_in = self.get_queryset().model(pk=self.kwargs['pk'])
+        serializer = self.get_serializer(stand_in, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+
+        changes = dict(serializer.validated_data, updated_at=timezone.now())
+        if not self.get_owned_queryset().update(**changes):
+            self.not_owned()
+        instance = self.get_queryset().get(pk=self.kwargs['pk'])
+        self.after_update(instance)
+        return Response(self.get_serializer(instance).data)
+
+    def after_update(self, instance):
+        pass
+
+    def destroy(self, request, *args, **kwargs):
+        if not self.destroy_owned(self.get_owned_queryset()):
+            self.not_owned()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def destroy_owned(self, queryset):
+        deleted, _ = queryset.delete()
+        return deleted
+
+
 # ──────────────────────────────────────────────────────────
 # Post ViewSet  (list / create / retrieve / update / destroy)
 # ──────────────────────────────────────────────────────────
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ReplicaReadMixin, BulkCreateMixin, AuthorWriteMixin, viewsets.ModelViewSet):
     """
     GET    /api/posts/           – paginated list; searchable by title & content
-    POST   /api/posts/           – create (authenticated)
+    POST   /api/posts/           – create (authenticated); accepts a list for batch create
     GET    /api/posts/<id>/      – detail
     PUT    /api/posts/<id>/      – update (author only)
     PATCH  /api/posts/<id>/      – partial update (author only)
     DELETE /api/posts/<id>/      – delete (author only)
+    GET    /api/posts/trending/  – top posts by time-decayed likes & comments
     """
     queryset = Post.objects.all().select_related('author')
     serializer_class = PostSerializer
@@ -44,34 +150,139 @@ class PostViewSet(viewsets.ModelViewSet):
     search_fields = ['title', 'content']
     ordering_fields = ['created_at', 'updated_at']
     ordering = ['-created_at']
+    throttle_scope = 'writes'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method == 'GET':
+            queryset = queryset.prefetch_related(comment_preview())
+        return queryset
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        sync_tags([post])
+        user_stats.record_event(self.request.user.pk, 'post')
+
+    def after_update(self, instance):
+        sync_tags([instance])
+
+    def perform_bulk_create(self, serializer):
+        posts = serializer.save(author=self.request.user)
+        sync_tags(posts)
+        user_stats.record_event(self.request.user.pk, 'post', count=len(posts))
+        # Two queries for the whole batch instead of three per post when
+        # PostSerializer renders likes_count / comments_count / comments.
+        prefetch_related_objects(posts, 'likes', comment_preview())
+
+    def destroy_owned(self, queryset):
+        # Also removes notifications that point at the post or its comments.
+        return delete_posts(queryset)
+
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        """?limit=<n> (default 20, max 100)"""
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            limit = 20
+        limit = max(1, min(limit, PostPagination.max_page_size))
+
+        ids = top_post_ids(limit)
+        posts = self.get_queryset().in_bulk(ids)
+        ranked = [posts[pk] for pk in ids if pk in posts]
+        serializer = self.get_serializer(ranked, many=True)
+        return Response(serializer.data)
 
 
 # ──────────────────────────────────────────────────────────
 # Comment ViewSet  (nested under posts)
 # ──────────────────────────────────────────────────────────
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadMixin, BulkCreateMixin, AuthorWriteMixin, viewsets.ModelViewSet):
     """
-    GET    /api/posts/<post_pk>/comments/        – list comments for a post
-    POST   /api/posts/<post_pk>/comments/        – create comment (authenticated)
+    GET    /api/posts/<post_pk>/comments/        – top-level comments, oldest first
+                                                   (keyset pages; ?cursor=, ?page_size=)
+    GET    /api/posts/<post_pk>/comments/?parent=<id>[&depth=<n>]
+                                                 – replies below a comment, n levels
+                                                   deep (default 1), in one query
+    POST   /api/posts/<post_pk>/comments/        – create comment (authenticated); accepts a list;
+                                                   "parent": <id> makes it a reply
     GET    /api/posts/<post_pk>/comments/<id>/   – comment detail
     PUT    /api/posts/<post_pk>/comments/<id>/   – update (author only)
-    DELETE /api/posts/<post_pk>/comments/<id>/   – delete (author only)
+    DELETE /api/posts/<post_pk>/comments/<id>/   – delete with its replies (author only)
     """
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+    pagination_class = CommentPagination
+    filter_backends = []   # the keyset defines the order
+    throttle_scope = 'writes'
 
     def get_queryset(self):
         post_pk = self.kwargs.get('post_pk')
-        return Comment.objects.filter(post_id=post_pk).select_related('author')
+        queryset = Comment.objects.filter(post_id=post_pk).select_related('author')
+        if self.action != 'list':
+            return queryset
+        parent = self.get_parent()
+        if parent is None:
+            return queryset.filter(depth=0)
+        return queryset.filter(
+            path__startswith=parent.subtree_prefix,
+            depth__lte=parent.depth + self.get_depth(),
+        )
+
+    def get_parent(self):
+        """The comment named by ?parent=, or None for the top level."""
+        if not hasattr(self, '_parent'):
+            parent_pk = self.request.query_params.get('parent')
+            self._parent = None
+            if parent_pk is not None:
+                if not parent_pk.isdigit():
+                    raise NotFound('No Comment matches the given query.')
+                self._parent = get_object_or_404(
+                    Comment.objects.only('pk', 'path', 'depth', 'reply_count'),
+                    pk=parent_pk, post_id=self.kwargs.get('post_pk'),
+                )
+        return self._parent
+
+    def get_depth(self):
+        try:
+            depth = int(self.request.query_params.get('depth', 1))
+        except ValueError:
+            depth = 1
+        return max(1, min(depth, MAX_COMMENT_DEPTH))
+
+    def get_total_count(self):
+        """
+        Top level: the post's top-level comments (Post.top_level_comments_count).
+        Replies: the parent's reply_count when one level is requested, else
+        omitted.
+        """
+        parent = self.get_parent()
+        if parent is not None:
+            return parent.reply_count if self.get_depth() == 1 else None
+        count = (
+            Post.objects.filter(pk=self.kwargs['post_pk'])
+            .values_list('top_level_comments_count', flat=True)
+            .first()
+        )
+        return count or 0
 
     def perform_create(self, serializer):
         post = get_object_or_404(Post, pk=self.kwargs['post_pk'])
         comment = serializer.save(author=self.request.user, post=post)
+        if comment.parent_id:
+            Post.objects.filter(pk=post.pk).update(comments_count=F('comments_count') + 1)
+            Comment.objects.filter(pk=comment.parent_id).update(
+                reply_count=F('reply_count') + 1
+            )
+        else:
+            Post.objects.filter(pk=post.pk).update(
+                comments_count=F('comments_count') + 1,
+                top_level_comments_count=F('top_level_comments_count') + 1,
+            )
+        record_event(post.pk, 'comment')
+        user_stats.record_event(post.author_id, 'comment')
 
         # Notify the post author (unless they commented on their own post)
         if post.author != self.request.user:
@@ -83,6 +294,39 @@ class CommentViewSet(viewsets.ModelViewSet):
                 target_object_id=comment.pk,
             )
 
+    def perform_bulk_create(self, serializer):
+        post = get_object_or_404(Post, pk=self.kwargs['post_pk'])
+        comments = serializer.save(author=self.request.user, post=post)
+        replies = Counter(comment.parent_id for comment in comments if comment.parent_id)
+        Post.objects.filter(pk=post.pk).update(
+            comments_count=F('comments_count') + len(comments),
+            top_level_comments_count=(
+                F('top_level_comments_count') + len(comments) - replies.total()
+            ),
+        )
+        for parent_id, n in replies.items():
+            Comment.objects.filter(pk=parent_id).update(reply_count=F('reply_count') + n)
+        record_event(post.pk, 'comment', count=len(comments))
+        user_stats.record_event(post.author_id, 'comment', count=len(comments))
+
+        if post.author_id != self.request.user.pk:
+            content_type = ContentType.objects.get_for_model(Comment)
+            Notification.objects.bulk_create([
+                Notification(
+                    recipient_id=post.author_id,
+                    actor=self.request.user,
+                    verb='commented on your post',
+                    content_type=content_type,
+                    target_object_id=comment.pk,
+                )
+                for comment in comments
+            ])
+
+    def destroy_owned(self, queryset):
+        # Also removes the replies and takes every one of them back from the
+        # post's counters and trending score.
+        return delete_comments(queryset)
+
 
 # ──────────────────────────────────────────────────────────
 # Like / Unlike  (single resource, not a viewset)
@@ -94,6 +338,7 @@ class LikeView(APIView):
     DELETE /api/posts/<pk>/like/    – unlike a post
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'likes'
 
     def post(self, request, pk):
         post = generics.get_object_or_404(Post, pk=pk)
@@ -103,6 +348,8 @@ class LikeView(APIView):
                 {'detail': 'You have already liked this post.'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        record_event(post.pk, 'like')
+        user_stats.record_event(post.author_id, 'like')
 
         # Notify the post author (not if they liked their own post)
         if post.author != request.user:
@@ -118,12 +365,18 @@ class LikeView(APIView):
 
     def delete(self, request, pk):
         post = generics.get_object_or_404(Post, pk=pk)
-        deleted, _ = Like.objects.filter(post=post, user=request.user).delete()
+        likes = Like.objects.filter(post=post, user=request.user)
+        liked_at = likes.values_list('created_at', flat=True).first()
+        # Only the request whose DELETE removed the row takes the like back,
+        # so concurrent unlikes can't decrement twice.
+        deleted, _ = likes.delete()
         if not deleted:
             return Response(
                 {'detail': 'You have not liked this post.'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        record_event(post.pk, 'like', at=liked_at, remove=True)
+        user_stats.record_event(post.author_id, 'like', -1, at=liked_at)
         return Response({'detail': 'Post unliked.'}, status=status.HTTP_204_NO_CONTENT)
 
 
@@ -131,11 +384,15 @@ class LikeView(APIView):
 # Feed — posts from followed users
 # ──────────────────────────────────────────────────────────
 
-class FeedView(generics.ListAPIView):
+class FeedView(ReplicaReadMixin, generics.ListAPIView):
     """
     GET /api/posts/feed/
     Returns posts from all users that the current user follows,
     ordered newest-first, paginated.
+
+    GET /api/posts/feed/?mode=ranked
+    Followed authors' recent posts plus trending posts, ordered by the
+    scorers in FEED_SCORERS (see posts/ranking.py), paginated.
     """
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticated]
@@ -143,4 +400,62 @@ class FeedView(generics.ListAPIView):
 
     def get_queryset(self):
         following_users = self.request.user.following.all().values_list('user', flat=True)
-        return Post.objects.filter(author__in=following_users).order_by('-created_at')
+        return (
+            Post.objects.filter(author__in=following_users)
+            .prefetch_related(comment_preview())
+            .order_by('-created_at')
+        )
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('mode') != 'ranked':
+            return super().list(request, *args, **kwargs)
+        ids = self.paginate_queryset(ranked_post_ids(request.user))
+        posts = Post.objects.select_related('author').in_bulk(ids)
+        ranked = [posts[pk] for pk in ids if pk in posts]
+        prefetch_related_objects(ranked, 'likes', comment_preview())
+        serializer = self.get_serializer(ranked, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+# ──────────────────────────────────────────────────────────
+# Hashtags & mentions  (keyset pages over the join tables)
+# ──────────────────────────────────────────────────────────
+
+class TaggedPostListView(ReplicaReadMixin, generics.ListAPIView):
+    """
+    Base for listings whose queryset is PostHashtag / Mention rows: the rows
+    are paginated on their own (…, created_at, id) index and the posts they
+    point at are rendered.
+    """
+    serializer_class = PostSerializer
+    pagination_class = TaggedPostPagination
+    filter_backends = []   # the keyset defines the order
+
+    def list(self, request, *args, **kwargs):
+        links = self.paginate_queryset(self.get_queryset().select_related('post__author'))
+        posts = [link.post for link in links]
+        prefetch_related_objects(posts, 'likes', comment_preview())
+        serializer = self.get_serializer(posts, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class HashtagPostsView(TaggedPostListView):
+    """
+    GET /api/hashtags/<tag>/
+    Posts tagged #<tag> (case-insensitive), newest first.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        return PostHashtag.objects.filter(hashtag__name=self.kwargs['tag'].lower())
+
+
+class MentionsView(TaggedPostListView):
+    """
+    GET /api/mentions/
+    Posts that @mention the current user, newest first.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Mention.objects.filter(user=self.request.user)
@@ -0,0 +1,85 @@
+"""
+Helpers for the async (ASGI) read endpoints.
+
+DRF views are synchronous, so the async variants of the read-heavy endpoints
+(posts.async_views, notifications.async_views) are plain Django async views.
+They load everything they render up front with the async ORM and then hand
+the objects to the existing DRF serializers, which never touch the database
+once their relations are prefetched.  Responses therefore have the same
+shape as the DRF endpoints they mirror.
+
+Run under an ASGI server to get the benefit, e.g.:
+
+    gunicorn social_media_api.asgi -k uvicorn_worker.UvicornWorker
+"""
+from functools import wraps
+
+from django.http import JsonResponse
+from rest_framework.authtoken.models import Token
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+
+async def get_token_user(request):
+    """The user for an 'Authorization: Token <key>' header, or None."""
+    header = request.headers.get('Authorization', '')
+    keyword, _, key = header.partition(' ')
+    if keyword != 'Token' or not key:
+        return None
+    try:
+        token = await Token.objects.select_related('user').aget(key=key.strip())
+    except Token.DoesNotExist:
+        return None
+    return token.user if token.user.is_active else None
+
+
+def token_required(view):
+    """Async counterpart of IsAuthenticated + TokenAuthentication."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await get_token_user(request)
+        if user is None:
+            return JsonResponse(
+                {'detail': 'Authentication credentials were not provided.'}, status=401
+            )
+        request.api_user = user
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def _int_param(request, name, default):
+    try:
+        return max(1, int(request.GET.get(name, default)))
+    except ValueError:
+        return default
+
+
+async def paginate(request, queryset, serializer_class):
+    """
+    Page-number pagination with the same envelope as PageNumberPagination:
+    {"count", "next", "previous", "results"}.
+    """
+    page = _int_param(request, 'page', 1)
+    page_size = min(_int_param(request, 'page_size', PAGE_SIZE), MAX_PAGE_SIZE)
+    count = await queryset.acount()
+
+    offset = (page - 1) * page_size
+    objects = [obj async for obj in queryset[offset:offset + page_size]]
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page + 1) if offset + page_size < count else None
+    if page <= 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', page - 1)
+
+    return JsonResponse({
+        'count': count,
+        'next': next_url,
+        'previous': previous_url,
+        'results': serializer_class(objects, many=True).data,
+    })
@@ -0,0 +1,110 @@
+"""
+Primary / read-replica routing.
+
+Writes always go to ``default``.  Read-heavy views (feed, lists,
+notifications) opt in with ReplicaReadMixin: for a GET/HEAD request the
+mixin picks one healthy replica from DATABASE_REPLICAS and every read in
+that request is routed there.  Everything else reads from the primary.
+
+Read-your-writes: after a user's successful write, ReplicaPinMiddleware
+pins that user to the primary for REPLICA_PIN_SECONDS (longer than the
+usual replication lag), so they never see a replica that hasn't caught up
+with their own post / comment / follow yet.  The pin lives in the default
+cache, which must be shared between workers (Redis) in production.
+
+Health: a replica is probed with SELECT 1 at most once every
+REPLICA_HEALTH_CHECK_SECONDS per process; one that fails is skipped until
+the next probe succeeds.  With no healthy replica, reads use the primary.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from rest_framework import permissions
+
+_read_alias = ContextVar('replica_read_alias', default=None)
+_health = {}   # alias -> (healthy, monotonic time of last probe)
+
+
+def pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def replica_is_healthy(alias):
+    healthy, checked_at = _health.get(alias, (False, None))
+    now = time.monotonic()
+    interval = getattr(settings, 'REPLICA_HEALTH_CHECK_SECONDS', 5)
+    if checked_at is not None and now - checked_at < interval:
+        return healthy
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+        healthy = True
+    except DatabaseError:
+        healthy = False
+    _health[alias] = (healthy, now)
+    return healthy
+
+
+def pick_replica():
+    """A random healthy replica alias, or None to read from the primary."""
+    healthy = [
+        alias for alias in getattr(settings, 'DATABASE_REPLICAS', [])
+        if replica_is_healthy(alias)
+    ]
+    return random.choice(healthy) if healthy else None
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+
+class ReplicaReadMixin:
+    """
+    For DRF views: serve safe requests from a replica unless the user is
+    pinned to the primary after a recent write.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in permissions.SAFE_METHODS:
+            return
+        user = request.user
+        if user and user.is_authenticated and cache.get(pin_key(user.pk)):
+            return
+        _read_alias.set(pick_replica())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        _read_alias.set(None)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReplicaPinMiddleware:
+    """Pin a user to the primary for a few seconds after a successful write."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        if (
+            request.method not in permissions.SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+            and getattr(settings, 'DATABASE_REPLICAS', [])
+        ):
+            cache.set(pin_key(user.pk), True, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+        return response
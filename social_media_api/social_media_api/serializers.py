@@ -0,0 +1,38 @@
+"""
+Per-response serialization cache.
+
+A list response often renders the same object many times: a page of
+notifications about one popular post renders that post's target_str once
+per notification.  Representations are pure functions of the object and
+the serializer, so the first one can be reused for the rest of the
+response.
+
+The cache is a dict in the serializer context, keyed on
+(serializer class, model, pk).  DRF builds a fresh context for every
+request (GenericAPIView.get_serializer_context) and shares it with every
+nested and child serializer, so the cache lives exactly as long as one
+response and is never shared between users.  Pass
+``context={REPRESENTATION_CACHE: None}`` to turn it off.
+
+Only NotificationSerializer.target_str uses it: posts and comments appear
+once per page and carry just their author's id and username, so there is
+nothing repeated worth caching there.
+"""
+
+REPRESENTATION_CACHE = 'representation_cache'
+
+
+def memoize(serializer, key, render):
+    """
+    Return ``render()``, computed once per response for ``key`` (a tuple
+    identifying the object, e.g. (model label, pk)) and ``serializer``'s
+    class.
+    """
+    cache = serializer.context.setdefault(REPRESENTATION_CACHE, {})
+    if cache is None:
+        return render()
+    key = (type(serializer), *key)
+    if key not in cache:
+        cache[key] = render()
+    return cache[key]
+
@@ -50,6 +50,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'social_media_api.db_router.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -88,6 +89,14 @@ DATABASES = {
     }
 }
 
+# Read replicas (see social_media_api/db_router.py).  Aliases listed here
+# must also be in DATABASES; settings_production.py fills both from the
+# environment.
+DATABASE_ROUTERS = ['social_media_api.db_router.PrimaryReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_PIN_SECONDS = 5            # read-your-writes window after a write
+REPLICA_HEALTH_CHECK_SECONDS = 5   # how often a replica is probed
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -129,6 +138,11 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Profile picture variants (see accounts/images.py)
+AVATAR_THUMBNAIL_SIZES = (64, 128, 256)
+AVATAR_MAX_SIZE = 1024   # longest side of the full-size variant
+AVATAR_WORKERS = 2       # threads per process doing the resizing
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -146,7 +160,50 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Token buckets, see social_media_api/throttling.py
+    'DEFAULT_THROTTLE_CLASSES': [
+        'social_media_api.throttling.AnonTokenBucketThrottle',
+        'social_media_api.throttling.UserTokenBucketThrottle',
+        'social_media_api.throttling.ScopedWriteThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '60/min burst 120',
+        'user': '600/min',
+        'writes': '60/min',
+        'likes': '30/min',
+        'follows': '30/min',
+        'login': '5/min burst 10',
+    },
+}
+
+# Cache alias holding throttle buckets; point it at Redis in production.
+THROTTLE_CACHE_ALIAS = 'default'
+
+# Notification retention (see notifications/retention.py)
+# Read notifications older than this are moved out of the hot table by
+# `python manage.py archive_notifications`.  None keeps them forever.
+NOTIFICATION_RETENTION_DAYS = 90
+NOTIFICATION_RETENTION_BY_VERB = {
+    'liked your post': 30,
+}
+
+# Trending posts (see posts/trending.py)
+TRENDING_HALF_LIFE_HOURS = 12   # engagement loses half its weight every 12h
+TRENDING_TOP_K = 100            # how many post ids the cached ranking holds
+TRENDING_CACHE_SECONDS = 60     # how often the cached ranking is refreshed
+
+# Ranked feed, GET /api/feed/?mode=ranked (see posts/ranking.py)
+FEED_SCORERS = {                # scorer path -> weight
+    'posts.ranking.recency': 1.0,
+    'posts.ranking.engagement': 1.0,
+    'posts.ranking.affinity': 2.0,
 }
+FEED_CANDIDATES = 500           # recent posts from followed authors to rank
+FEED_CANDIDATE_DAYS = 7
+FEED_RECENCY_HALF_LIFE_HOURS = 24
+FEED_RANKED_CACHE_SECONDS = 60  # a ranking is reused across pages this long
+FEED_AFFINITY_DAYS = 30         # history used by `compute_feed_affinity`
+FEED_AFFINITY_MAX_AGE_SECONDS = 6 * 3600   # older FeedAffinity rows are ignored
 
 SECURE_BROWSER_XSS_FILTER = True
 X_FRAME_OPTIONS = 'DENY'
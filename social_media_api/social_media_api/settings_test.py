@@ -0,0 +1,28 @@
+"""
+Settings for running the test suite without a PostgreSQL server:
+
+    python manage.py test --settings=social_media_api.settings_test
+
+Two SQLite databases stand in for the primary and a read replica, so the
+replica router (db_router.py) can be exercised against a real second
+database.  Replica routing itself is off by default and switched on by the
+tests that need it (override_settings(DATABASE_REPLICAS=['replica'])).
+"""
+
+from .settings import *   # noqa: F401, F403 – inherit everything from base
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test_primary.sqlite3',   # noqa: F405
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test_replica.sqlite3',   # noqa: F405
+    },
+}
+
+DATABASE_REPLICAS = []
+
+# Hashing passwords with PBKDF2 dominates the run time of API tests.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -0,0 +1,153 @@
+"""
+Token-bucket throttles for the REST API.
+
+Each client gets a bucket of ``burst`` tokens that refills at ``rate`` tokens
+per period; a request spends one token.  Compared with DRF's built-in
+SimpleRateThrottle (which keeps a list of request timestamps per client) a
+bucket is two numbers, so checking it is one cache get and one cache set.
+
+Rates live in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] like DRF's own
+throttles, with an optional burst size:
+
+    'likes': '30/min'            # 30 per minute, bursts of up to 30
+    'login': '5/min burst 10'    # 5 per minute, bursts of up to 10
+
+Buckets are stored in the cache named by THROTTLE_CACHE_ALIAS ('default'
+unless set).  That is LocMemCache in development and tests; production
+points it at Redis (see settings_production.py) so that all workers share
+the same counters.  The read-modify-write is not atomic, so under heavy
+concurrency a client can occasionally get a request or two more than its
+budget; that is an acceptable trade for not taking a lock per request.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import permissions
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    Parse '<n>/<period>[ burst <b>]' into (tokens per second, bucket size).
+    Returns None for a missing rate, which disables the throttle.
+    """
+    if rate is None:
+        return None
+    parts = rate.split()
+    num, period = parts[0].split('/')
+    refill = int(num) / PERIODS[period[0]]
+    burst = int(parts[2]) if len(parts) == 3 and parts[1] == 'burst' else int(num)
+    return refill, burst
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Base class.  Subclasses set ``scope`` (or override get_scope) and
+    implement get_cache_key(); a key of None means "don't throttle".
+    """
+    scope = None
+    timer = time.time
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+        self.wait_time = None
+
+    def get_scope(self, request, view):
+        return self.scope
+
+    def get_cache_key(self, request, view):
+        raise NotImplementedError('.get_cache_key() must be overridden')
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        bucket = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(scope)) if scope else None
+        if bucket is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        return self.consume(self.cache_format % {'scope': scope, 'ident': key}, *bucket)
+
+    def consume(self, key, refill, burst):
+        """Take one token from the bucket at ``key``; False if it is empty."""
+        now = self.timer()
+        tokens, stamp = self.cache.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - stamp) * refill)
+        if tokens < 1:
+            self.wait_time = (1 - tokens) / refill
+            return False
+        # The bucket is full again after burst / refill seconds; drop it then.
+        self.cache.set(key, (tokens - 1, now), int(burst / refill) + 1)
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class AnonTokenBucketThrottle(TokenBucketThrottle):
+    """All requests from anonymous clients, keyed by IP ('anon' rate)."""
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.get_ident(request)
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """All requests from authenticated users, keyed by user id ('user' rate)."""
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+
+class ScopedWriteThrottle(TokenBucketThrottle):
+    """
+    Write requests (POST/PUT/PATCH/DELETE) to views that set
+    ``throttle_scope``, keyed by user id or IP.
+    """
+
+    def get_scope(self, request, view):
+        if request.method in permissions.SAFE_METHODS:
+            return None
+        return getattr(view, 'throttle_scope', None)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return self.get_ident(request)
+
+
+class LoginThrottle(TokenBucketThrottle):
+    """
+    Login attempts ('login' rate).  Two buckets must both have a token: one
+    per client IP and one per submitted username, so neither a single
+    client nor a distributed attempt on one account gets more than the
+    configured burst.
+    """
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        return self.get_ident(request)
+
+    def allow_request(self, request, view):
+        if not super().allow_request(request, view):
+            return False
+        username = request.data.get('username') if hasattr(request, 'data') else None
+        if not username:
+            return True
+        bucket = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(self.scope))
+        if bucket is None:
+            return True
+        ident = hashlib.sha256(str(username).lower().encode()).hexdigest()
+        key = self.cache_format % {'scope': 'login-user', 'ident': ident}
+        return self.consume(key, *bucket)